@@ -0,0 +1,242 @@
+"""
+Allocation and memory regression checks for response handling.
+
+Measures, per call and per document, the peak memory allocated while a
+call runs, the memory and allocated blocks its result keeps alive, and the
+wall-clock time, for:
+
+- retrieve: ``TatryRetriever.retrieve``
+- batch: ``TatryRetriever.batch_retrieve`` with the documents spread over
+  several queries
+- langchain: the LangChain retriever's ``invoke``
+- validate: ``DocumentResponse.model_validate_json`` on the raw body
+
+Responses are stub-server payloads returned by an in-process transport
+adapter. Each body is served as a stream of its own, so only client-side
+work is measured and reading the body counts towards it. Memory is traced
+with ``tracemalloc``; time is the best of ``--repeat`` untraced runs.
+
+Results are compared with a baseline file, and the script exits with status
+1 if any metric exceeds its baseline by more than the given tolerance. The
+baseline holds memory metrics and, so that it does not depend on the
+machine, time relative to the validate case with the same document count:
+
+    python benchmarks/bench_allocations.py --write-baseline
+    python benchmarks/bench_allocations.py --memory-tolerance 0.1 --time-tolerance 0.5
+"""
+
+import argparse
+import gc
+import io
+import json
+import os
+import sys
+import time
+import tracemalloc
+from typing import Any, Callable, Dict, List
+
+import requests
+from requests.adapters import BaseAdapter
+from stub_server import route
+
+from tatry import TatryRetriever
+from tatry.models.retrieve import DocumentResponse
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+BASE_URL = "http://bench.invalid"
+CASES = ("retrieve", "batch", "langchain", "validate")
+# Metrics compared with the baseline, and whether each is a timing.
+METRICS = {
+    "peak_bytes_per_doc": False,
+    "kept_bytes_per_doc": False,
+    "kept_blocks_per_doc": False,
+    "time_vs_validate": True,
+}
+
+
+class CannedAdapter(BaseAdapter):
+    """Answers requests in-process with stub server payloads."""
+
+    def __init__(self, content_size: int) -> None:
+        super().__init__()
+        self.content_size = content_size
+
+    def send(self, request: requests.PreparedRequest, **kwargs: Any) -> Any:
+        payload = json.loads(request.body) if request.body else {}
+        path = (request.path_url or "").split("?")[0]
+        status, body = route(request.method or "GET", path, payload, self.content_size)
+        response = requests.Response()
+        response.status_code = status
+        response.headers["Content-Type"] = "application/json"
+        # The stub caches its bodies; the client reads each response from a
+        # stream of its own, allocating the body as it would off a socket.
+        response.raw = io.BytesIO(body)
+        response.url = request.url or ""
+        response.request = request
+        return response
+
+    def close(self) -> None:
+        pass
+
+
+def make_call(case: str, count: int, content_size: int, queries: int) -> Callable:
+    adapter = CannedAdapter(content_size)
+    client = TatryRetriever(api_key="bench", base_url=BASE_URL, adapter=adapter)
+
+    if case == "retrieve":
+        return lambda: client.retrieve("bench", max_results=count)
+    if case == "batch":
+        queries = min(queries, count)
+        sizes = [count // queries + (i < count % queries) for i in range(queries)]
+        batch = [{"query": f"bench {i}", "max_results": n} for i, n in enumerate(sizes)]
+        return lambda: client.batch_retrieve(batch)
+    if case == "langchain":
+        from tatry.integrations.langchain import TatryRetriever as LangChainRetriever
+
+        retriever = LangChainRetriever(
+            api_key="bench", base_url=BASE_URL, max_results=count
+        )
+        retriever._client.session.mount(BASE_URL, adapter)
+        return lambda: retriever.invoke("bench")
+    if case == "validate":
+        _, body = route("POST", "/v1/retrieve", {"max_results": count}, content_size)
+        return lambda: DocumentResponse.model_validate_json(body)
+    raise ValueError(f"Unknown case: {case}")
+
+
+def measure(call: Callable, count: int, repeat: int) -> Dict[str, float]:
+    call()  # warm up caches and lazy imports
+    gc.collect()
+
+    blocks = sys.getallocatedblocks()
+    tracemalloc.start()
+    result = call()
+    kept, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    gc.collect()
+    kept_blocks = sys.getallocatedblocks() - blocks
+    del result
+
+    best = float("inf")
+    for _ in range(repeat):
+        gc.collect()
+        started = time.perf_counter()
+        call()
+        best = min(best, time.perf_counter() - started)
+
+    return {
+        "peak_bytes_per_doc": peak / count,
+        "kept_bytes_per_doc": kept / count,
+        "kept_blocks_per_doc": max(kept_blocks, 0) / count,
+        "us_per_doc": best / count * 1e6,
+    }
+
+
+def regressions(
+    results: Dict[str, Dict[str, float]],
+    baseline: Dict[str, Dict[str, float]],
+    memory_tolerance: float,
+    time_tolerance: float,
+) -> List[str]:
+    """Describe every metric exceeding its baseline by more than the tolerance."""
+    found = []
+    for key, metrics in results.items():
+        expected = baseline.get(key)
+        if expected is None:
+            continue
+        for metric, timing in METRICS.items():
+            if metric not in metrics or metric not in expected:
+                continue
+            limit = expected[metric] * (
+                1 + (time_tolerance if timing else memory_tolerance)
+            )
+            if metrics[metric] > limit:
+                found.append(
+                    f"{key} {metric}: {metrics[metric]:.1f} > {limit:.1f} "
+                    f"(baseline {expected[metric]:.1f})"
+                )
+    return found
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument(
+        "--counts", type=int, nargs="+", default=[10, 100, 1000, 10000, 100000]
+    )
+    parser.add_argument("--cases", nargs="+", choices=CASES, default=list(CASES))
+    parser.add_argument("--content-size", type=int, default=256)
+    parser.add_argument(
+        "--batch-queries", type=int, default=10, help="queries per batch call"
+    )
+    parser.add_argument("--repeat", type=int, default=5, help="timed runs per case")
+    parser.add_argument(
+        "--baseline", default=os.path.join(HERE, "allocation_baseline.json")
+    )
+    parser.add_argument(
+        "--write-baseline",
+        action="store_true",
+        help="store the results as the new baseline instead of comparing",
+    )
+    parser.add_argument(
+        "--memory-tolerance",
+        type=float,
+        default=0.10,
+        help="allowed relative growth of memory metrics",
+    )
+    parser.add_argument(
+        "--time-tolerance",
+        type=float,
+        default=0.50,
+        help="allowed relative growth of time compared with validation",
+    )
+    args = parser.parse_args()
+
+    print(
+        f"{'case':>9} {'documents':>9} {'peak B/doc':>11} {'kept B/doc':>11} "
+        f"{'blocks/doc':>11} {'us/doc':>8}"
+    )
+    # The validate case is the reference for relative timings.
+    cases = list(dict.fromkeys(args.cases + ["validate"]))
+    results: Dict[str, Dict[str, float]] = {}
+    for case in cases:
+        for count in args.counts:
+            call = make_call(case, count, args.content_size, args.batch_queries)
+            metrics = results[f"{case}/{count}"] = measure(call, count, args.repeat)
+            print(
+                f"{case:>9} {count:>9} {metrics['peak_bytes_per_doc']:>11.0f} "
+                f"{metrics['kept_bytes_per_doc']:>11.0f} "
+                f"{metrics['kept_blocks_per_doc']:>11.1f} "
+                f"{metrics['us_per_doc']:>8.1f}",
+                flush=True,
+            )
+    for key, metrics in results.items():
+        case, count = key.split("/")
+        if case != "validate":
+            reference = results[f"validate/{count}"]["us_per_doc"]
+            metrics["time_vs_validate"] = metrics["us_per_doc"] / reference
+
+    if args.write_baseline:
+        baseline = {}
+        if os.path.exists(args.baseline):
+            with open(args.baseline) as f:
+                baseline = json.load(f)
+        for key, metrics in results.items():
+            baseline[key] = {m: round(v, 3) for m, v in metrics.items() if m in METRICS}
+        with open(args.baseline, "w") as f:
+            json.dump(baseline, f, indent=2, sort_keys=True)
+            f.write("\n")
+        print(f"Baseline written to {args.baseline}")
+        return
+
+    if not os.path.exists(args.baseline):
+        sys.exit(f"No baseline at {args.baseline}; run with --write-baseline first")
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    found = regressions(results, baseline, args.memory_tolerance, args.time_tolerance)
+    for line in found:
+        print(f"REGRESSION {line}")
+    sys.exit(1 if found else 0)
+
+
+if __name__ == "__main__":
+    main()
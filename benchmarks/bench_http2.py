@@ -0,0 +1,125 @@
+"""
+HTTP/1.1 connection pooling against HTTP/2 multiplexing.
+
+Runs ``retrieve`` calls from a thread pool at several concurrency levels
+against the stub server, once over HTTP/1.1 with a ``requests`` pool sized
+to the concurrency and once through ``HTTP2Adapter`` over h2c. Each server
+runs in its own process so it does not compete with the client for the
+GIL. Reports throughput, client-side latency and the TCP connections the
+client opened.
+
+    python benchmarks/bench_http2.py --concurrency 1 16 64 256 --latency 0.005
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import Dict, Iterator, List
+
+from requests.adapters import BaseAdapter, HTTPAdapter
+
+from tatry import HTTP2Adapter, TatryRetriever
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+PROTOCOLS = ("http1", "http2")
+
+
+@contextmanager
+def stub_server(http2: bool, latency: float, content_size: int) -> Iterator[str]:
+    command = [
+        sys.executable,
+        os.path.join(HERE, "stub_server.py"),
+        "--port",
+        "0",
+        "--latency",
+        str(latency),
+        "--content-size",
+        str(content_size),
+    ]
+    server = subprocess.Popen(
+        command + (["--http2"] if http2 else []), stdout=subprocess.PIPE, text=True
+    )
+    try:
+        yield server.stdout.readline().split()[-1]  # type: ignore[union-attr]
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def connections(client: TatryRetriever) -> int:
+    return int(client._request("GET", "/_stats")["connections"])
+
+
+def run_case(
+    protocol: str, url: str, concurrency: int, total: int, max_results: int
+) -> Dict[str, float]:
+    if protocol == "http2":
+        adapter: BaseAdapter = HTTP2Adapter(max_connections=1)
+    else:
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=concurrency)
+    client = TatryRetriever(api_key="bench", base_url=url, adapter=adapter)
+    before = connections(client)
+
+    def call(_: int) -> float:
+        started = time.perf_counter()
+        client.retrieve("bench", max_results=max_results)
+        return time.perf_counter() - started
+
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(call, range(concurrency)))  # warm up connections
+        started = time.perf_counter()
+        latencies: List[float] = sorted(pool.map(call, range(total)))
+        elapsed = time.perf_counter() - started
+
+    opened = connections(client) - before
+    adapter.close()
+    return {
+        "rps": total / elapsed,
+        "p50_ms": latencies[len(latencies) // 2] * 1000,
+        "p99_ms": latencies[int(len(latencies) * 0.99)] * 1000,
+        "connections": opened,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 16, 64, 256])
+    parser.add_argument(
+        "--protocols", nargs="+", choices=PROTOCOLS, default=list(PROTOCOLS)
+    )
+    parser.add_argument(
+        "--requests",
+        type=int,
+        default=2000,
+        help="calls per case (at least 8 per thread)",
+    )
+    parser.add_argument(
+        "--latency", type=float, default=0.005, help="server-side delay in seconds"
+    )
+    parser.add_argument("--max-results", type=int, default=5)
+    parser.add_argument("--content-size", type=int, default=1024)
+    args = parser.parse_args()
+
+    print(
+        f"{'protocol':>8} {'conc':>5} {'req/s':>9} {'p50 ms':>8} "
+        f"{'p99 ms':>8} {'conns':>6}"
+    )
+    for protocol in args.protocols:
+        with stub_server(protocol == "http2", args.latency, args.content_size) as url:
+            for concurrency in args.concurrency:
+                total = max(args.requests, concurrency * 8)
+                result = run_case(protocol, url, concurrency, total, args.max_results)
+                print(
+                    f"{protocol:>8} {concurrency:>5} {result['rps']:>9.0f} "
+                    f"{result['p50_ms']:>8.1f} {result['p99_ms']:>8.1f} "
+                    f"{result['connections']:>6.0f}",
+                    flush=True,
+                )
+
+
+if __name__ == "__main__":
+    main()
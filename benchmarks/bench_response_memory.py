@@ -0,0 +1,129 @@
+"""
+Peak memory of parsing large retrieve responses.
+
+Compares three response paths against the stub server, each in a fresh
+process so peak RSS is not polluted by earlier runs:
+
+- dict: ``response.json()`` followed by ``DocumentResponse.model_validate``
+- model: ``stream_threshold=None``, validating the buffered body with
+  pydantic, as the client does for responses below the default threshold
+- stream: ``stream_threshold=0``, validating one document at a time from
+  the socket
+
+    python benchmarks/bench_response_memory.py --counts 1000 10000 100000
+"""
+
+import argparse
+import gc
+import json
+import os
+import resource
+import subprocess
+import sys
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+MODES = ("dict", "model", "stream")
+
+
+def current_rss() -> int:
+    """Resident set size of this process in bytes."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except OSError:
+        return peak_rss()
+
+
+def peak_rss() -> int:
+    """Peak resident set size of this process in bytes."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def run_child(mode: str, count: int, url: str) -> None:
+    from tatry import TatryRetriever
+    from tatry.models.retrieve import DocumentResponse
+
+    client = TatryRetriever(
+        api_key="bench",
+        base_url=url,
+        stream_threshold=0 if mode == "stream" else None,
+    )
+    client.check_health()
+    gc.collect()
+
+    before = current_rss()
+    started = time.perf_counter()
+    if mode == "dict":
+        body = client._request(
+            "POST", "/v1/retrieve", json={"query": "bench", "max_results": count}
+        )
+        response = DocumentResponse.model_validate(body)
+        del body
+    else:
+        response = client.retrieve("bench", max_results=count)
+    elapsed = time.perf_counter() - started
+
+    assert len(response.documents) == count
+    print(
+        json.dumps(
+            {
+                "mode": mode,
+                "count": count,
+                "peak_mb": (peak_rss() - before) / 2**20,
+                "retained_mb": (current_rss() - before) / 2**20,
+                "seconds": elapsed,
+            }
+        )
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--counts", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--modes", nargs="+", choices=MODES, default=list(MODES))
+    parser.add_argument("--content-size", type=int, default=1024)
+    parser.add_argument("--child", nargs=3, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        mode, count, url = args.child
+        run_child(mode, int(count), url)
+        return
+
+    server = subprocess.Popen(
+        [
+            sys.executable,
+            os.path.join(HERE, "stub_server.py"),
+            "--port",
+            "0",
+            "--content-size",
+            str(args.content_size),
+        ],
+        stdout=subprocess.PIPE,
+        text=True,
+    )
+    try:
+        url = server.stdout.readline().split()[-1]  # type: ignore[union-attr]
+        print(f"{'documents':>10} {'mode':>7} {'peak MB':>9} {'kept MB':>9} {'sec':>7}")
+        for count in args.counts:
+            for mode in args.modes:
+                output = subprocess.run(
+                    [sys.executable, __file__, "--child", mode, str(count), url],
+                    check=True,
+                    capture_output=True,
+                    text=True,
+                ).stdout
+                result = json.loads(output)
+                print(
+                    f"{count:>10} {mode:>7} {result['peak_mb']:>9.1f} "
+                    f"{result['retained_mb']:>9.1f} {result['seconds']:>7.2f}"
+                )
+    finally:
+        server.terminate()
+        server.wait()
+
+
+if __name__ == "__main__":
+    main()
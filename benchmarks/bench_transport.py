@@ -0,0 +1,88 @@
+"""
+Client-side overhead of each transport per request.
+
+Sends sequential ``retrieve`` calls over keep-alive connections to the stub
+server, which runs in its own process, and reports wall-clock and CPU time
+per call for each transport. With a local server and small responses, the
+CPU time is almost entirely the client's own work: request preparation,
+header handling, JSON encoding and response parsing.
+
+    python benchmarks/bench_transport.py --requests 5000 --max-results 1
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator
+
+from tatry import TatryRetriever
+from tatry.retrievers.tatry.transport import TRANSPORTS
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+
+@contextmanager
+def stub_server(content_size: int) -> Iterator[str]:
+    server = subprocess.Popen(
+        [
+            sys.executable,
+            os.path.join(HERE, "stub_server.py"),
+            "--port",
+            "0",
+            "--content-size",
+            str(content_size),
+        ],
+        stdout=subprocess.PIPE,
+        text=True,
+    )
+    try:
+        yield server.stdout.readline().split()[-1]  # type: ignore[union-attr]
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def run_case(
+    transport: str, url: str, total: int, max_results: int
+) -> Dict[str, float]:
+    client = TatryRetriever(
+        api_key="bench", base_url=url, max_retries=1, transport=transport
+    )
+    for _ in range(100):  # warm up the connection and caches
+        client.retrieve("bench", max_results=max_results)
+
+    wall = time.perf_counter()
+    cpu = time.process_time()
+    for _ in range(total):
+        client.retrieve("bench", max_results=max_results)
+    cpu = time.process_time() - cpu
+    wall = time.perf_counter() - wall
+    client.transport.close()
+    return {"wall_us": wall / total * 1e6, "cpu_us": cpu / total * 1e6}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument(
+        "--transports", nargs="+", choices=TRANSPORTS, default=list(TRANSPORTS)
+    )
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--max-results", type=int, default=1)
+    parser.add_argument("--content-size", type=int, default=256)
+    args = parser.parse_args()
+
+    print(f"{'transport':>9} {'wall us/call':>13} {'cpu us/call':>12}")
+    with stub_server(args.content_size) as url:
+        for transport in args.transports:
+            result = run_case(transport, url, args.requests, args.max_results)
+            print(
+                f"{transport:>9} {result['wall_us']:>13.0f} {result['cpu_us']:>12.0f}",
+                flush=True,
+            )
+
+
+if __name__ == "__main__":
+    main()
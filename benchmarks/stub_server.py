@@ -0,0 +1,276 @@
+"""
+Stub Tatry API server for benchmarks.
+
+Serves deterministic ``/v1/retrieve``, ``/v1/retrieve/batch`` and
+``/v1/health`` responses so client benchmarks can run without network
+access. ``max_results`` controls how many documents a response carries.
+The server speaks HTTP/1.1, or cleartext HTTP/2 (h2c, prior knowledge)
+with ``--http2``, which needs the ``h2`` package. ``--latency`` delays each
+response to mimic server-side work.
+
+    python benchmarks/stub_server.py --port 8765 --content-size 1024
+"""
+
+import argparse
+import asyncio
+import json
+import threading
+import time
+from functools import lru_cache
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, Tuple
+
+
+def make_document(index: int, content_size: int) -> dict:
+    return {
+        "id": f"doc-{index:08d}",
+        "content": ("lorem ipsum " * (content_size // 12 + 1))[:content_size],
+        "metadata": {
+            "source": f"source-{index % 4}",
+            "published_date": "2024-01-01",
+            "citation": f"Document {index}",
+        },
+        "relevance_score": round(1.0 - (index % 1000) / 1000, 3),
+    }
+
+
+@lru_cache(maxsize=8)
+def retrieve_body(count: int, content_size: int) -> bytes:
+    documents = [make_document(i, content_size) for i in range(count)]
+    return json.dumps({"documents": documents, "total": count}).encode()
+
+
+@lru_cache(maxsize=8)
+def batch_body(counts: Tuple[int, ...], content_size: int) -> bytes:
+    results = [
+        {
+            "query_id": query_id,
+            "documents": [make_document(i, content_size) for i in range(count)],
+        }
+        for query_id, count in enumerate(counts)
+    ]
+    return json.dumps({"results": results}).encode()
+
+
+def route(
+    method: str, path: str, payload: dict, content_size: int
+) -> Tuple[int, bytes]:
+    """Status and body of the stub response to a request."""
+    if method == "GET" and path == "/v1/health":
+        return 200, b'{"status":"success","data":{"status":"healthy"}}'
+    if method == "POST" and path == "/v1/retrieve":
+        return 200, retrieve_body(payload.get("max_results", 5), content_size)
+    if method == "POST" and path == "/v1/retrieve/batch":
+        counts = tuple(q.get("max_results", 5) for q in payload["queries"])
+        return 200, batch_body(counts, content_size)
+    return 404, b'{"error":"not found"}'
+
+
+# Reports the number of accepted connections; not part of the Tatry API.
+STATS_PATH = "/_stats"
+
+
+def stats(server: Any) -> Tuple[int, bytes]:
+    return 200, json.dumps({"connections": server.connections}).encode()
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # Headers and body are written separately; avoid Nagle/delayed-ACK stalls.
+    disable_nagle_algorithm = True
+    content_size = 1024
+    latency = 0.0
+
+    def log_message(self, format: str, *args: object) -> None:
+        pass
+
+    def _handle(self, method: str) -> None:
+        length = int(self.headers.get("Content-Length", 0))
+        payload = json.loads(self.rfile.read(length)) if length else {}
+        if self.path == STATS_PATH:
+            status, body = stats(self.server)
+        else:
+            if self.latency:
+                time.sleep(self.latency)
+            status, body = route(method, self.path, payload, self.content_size)
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self) -> None:
+        self._handle("GET")
+
+    def do_POST(self) -> None:
+        self._handle("POST")
+
+
+class StubServer(ThreadingHTTPServer):
+    daemon_threads = True
+    # Accepted TCP connections, to compare connection reuse.
+    connections = 0
+
+    def get_request(self) -> Any:
+        request = super().get_request()
+        self.connections += 1
+        return request
+
+
+def make_server(
+    port: int = 0, content_size: int = 1024, latency: float = 0.0
+) -> StubServer:
+    handler = type(
+        "Handler", (StubHandler,), {"content_size": content_size, "latency": latency}
+    )
+    return StubServer(("127.0.0.1", port), handler)
+
+
+def serve_in_thread(
+    content_size: int = 1024, latency: float = 0.0
+) -> Tuple[StubServer, str]:
+    """Start a stub server on a free port and return it with its base URL."""
+    server = make_server(content_size=content_size, latency=latency)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+class H2StubProtocol(asyncio.Protocol):
+    """One h2c connection of the HTTP/2 stub server."""
+
+    def __init__(self, server: "H2StubServer") -> None:
+        import h2.config
+        import h2.connection
+
+        self.server = server
+        self.conn = h2.connection.H2Connection(
+            h2.config.H2Configuration(client_side=False, header_encoding="utf-8")
+        )
+        self.requests: Dict[int, Tuple[Dict[str, str], bytearray]] = {}
+        self.outgoing: Dict[int, memoryview] = {}
+
+    def connection_made(self, transport: Any) -> None:
+        from h2.settings import SettingCodes
+
+        self.transport = transport
+        self.server.connections += 1
+        self.conn.initiate_connection()
+        self.conn.update_settings({SettingCodes.MAX_CONCURRENT_STREAMS: 1024})
+        self.transport.write(self.conn.data_to_send())
+
+    def data_received(self, data: bytes) -> None:
+        import h2.events
+
+        for event in self.conn.receive_data(data):
+            if isinstance(event, h2.events.RequestReceived):
+                self.requests[event.stream_id] = (dict(event.headers), bytearray())
+            elif isinstance(event, h2.events.DataReceived):
+                self.requests[event.stream_id][1].extend(event.data)
+                self.conn.acknowledge_received_data(
+                    event.flow_controlled_length, event.stream_id
+                )
+            elif isinstance(event, h2.events.StreamEnded):
+                headers = self.requests[event.stream_id][0]
+                delay = 0 if headers[":path"] == STATS_PATH else self.server.latency
+                loop = asyncio.get_running_loop()
+                loop.call_later(delay, self.respond, event.stream_id)
+            elif isinstance(event, h2.events.WindowUpdated):
+                streams = (
+                    list(self.outgoing) if event.stream_id == 0 else [event.stream_id]
+                )
+                for stream_id in streams:
+                    self.flush(stream_id)
+            elif isinstance(event, h2.events.StreamReset):
+                self.outgoing.pop(event.stream_id, None)
+        self.transport.write(self.conn.data_to_send())
+
+    def respond(self, stream_id: int) -> None:
+        headers, raw = self.requests.pop(stream_id)
+        payload = json.loads(raw) if raw else {}
+        if headers[":path"] == STATS_PATH:
+            status, body = stats(self.server)
+        else:
+            status, body = route(
+                headers[":method"], headers[":path"], payload, self.server.content_size
+            )
+        self.conn.send_headers(
+            stream_id,
+            [
+                (":status", str(status)),
+                ("content-type", "application/json"),
+                ("content-length", str(len(body))),
+            ],
+        )
+        self.outgoing[stream_id] = memoryview(body)
+        self.flush(stream_id)
+        self.transport.write(self.conn.data_to_send())
+
+    def flush(self, stream_id: int) -> None:
+        """Send as much of a response body as flow control allows."""
+        body = self.outgoing.get(stream_id)
+        while body is not None:
+            window = min(
+                self.conn.local_flow_control_window(stream_id),
+                self.conn.max_outbound_frame_size,
+            )
+            if not body:
+                self.conn.end_stream(stream_id)
+                del self.outgoing[stream_id]
+                return
+            if window <= 0:
+                return
+            self.conn.send_data(stream_id, body[:window].tobytes())
+            body = self.outgoing[stream_id] = body[window:]
+
+
+class H2StubServer:
+    """Cleartext HTTP/2 stub server running an asyncio loop in a thread."""
+
+    def __init__(
+        self, port: int = 0, content_size: int = 1024, latency: float = 0.0
+    ) -> None:
+        self.content_size = content_size
+        self.latency = latency
+        # Accepted TCP connections, to compare connection reuse.
+        self.connections = 0
+        self.loop = asyncio.new_event_loop()
+        self._server = self.loop.run_until_complete(
+            self.loop.create_server(lambda: H2StubProtocol(self), "127.0.0.1", port)
+        )
+        self.server_address = self._server.sockets[0].getsockname()
+
+    def serve_forever(self) -> None:
+        self.loop.run_forever()
+
+    def shutdown(self) -> None:
+        self.loop.call_soon_threadsafe(self.loop.stop)
+
+
+def serve_h2_in_thread(
+    content_size: int = 1024, latency: float = 0.0
+) -> Tuple[H2StubServer, str]:
+    """Start an h2c stub server on a free port and return it with its base URL."""
+    server = H2StubServer(content_size=content_size, latency=latency)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--content-size", type=int, default=1024)
+    parser.add_argument("--latency", type=float, default=0.0)
+    parser.add_argument("--http2", action="store_true", help="serve h2c")
+    args = parser.parse_args()
+
+    server: Any
+    if args.http2:
+        server = H2StubServer(args.port, args.content_size, args.latency)
+    else:
+        server = make_server(args.port, args.content_size, args.latency)
+    print(f"Serving on http://127.0.0.1:{server.server_address[1]}", flush=True)
+    server.serve_forever()
+
+
+if __name__ == "__main__":
+    main()
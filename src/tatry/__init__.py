@@ -10,9 +10,27 @@ from .exceptions import (
     RetrieverConnectionError,
     RetrieverError,
     RetrieverTimeoutError,
+    RetrieverUnavailableError,
 )
 from .retrievers.base import BaseRetriever
+from .retrievers.tatry import (
+    AdaptiveConcurrencyLimiter,
+    DocumentIdentityMap,
+    FeedbackQueue,
+    HealthMonitor,
+    HTTP2Adapter,
+    MetricsRegistry,
+    PriorityClass,
+    PriorityScheduler,
+    QueryCanonicalizer,
+    RecordingAdapter,
+    ReplayAdapter,
+    RetrievalResult,
+    SourceResultCache,
+    StaleWhileRevalidateCache,
+)
 from .retrievers.tatry import TatryRetriever as CoreTatryRetriever
+from .retrievers.tatry import UsageMeter, WarmupReport, deadline, priority
 
 try:
     from .integrations.langchain import TatryRetriever as LangChainTatryRetriever
@@ -33,6 +51,25 @@ __all__ = [
     "RetrieverConfigError",
     "RetrieverTimeoutError",
     "RetrieverConnectionError",
+    "RetrieverUnavailableError",
+    "AdaptiveConcurrencyLimiter",
+    "DocumentIdentityMap",
+    "FeedbackQueue",
+    "HealthMonitor",
+    "HTTP2Adapter",
+    "MetricsRegistry",
+    "PriorityClass",
+    "PriorityScheduler",
+    "QueryCanonicalizer",
+    "RecordingAdapter",
+    "ReplayAdapter",
+    "RetrievalResult",
+    "SourceResultCache",
+    "StaleWhileRevalidateCache",
+    "UsageMeter",
+    "WarmupReport",
+    "deadline",
+    "priority",
 ]
 
 if HAS_LANGCHAIN:
@@ -0,0 +1,244 @@
+"""Command-line bulk retrieval: ``tatry queries.jsonl > results.jsonl``."""
+
+import argparse
+import csv
+import json
+import os
+import sys
+import threading
+import time
+from collections import deque
+from itertools import islice
+from typing import IO, Any, Deque, Dict, Iterable, Iterator, List, Optional
+
+from .retrievers.tatry import TatryRetriever
+
+
+def read_queries(stream: IO[str], fmt: str = "jsonl") -> Iterator[Dict[str, Any]]:
+    """
+    Read retrieve requests lazily from JSONL or CSV.
+
+    JSONL lines hold a request object or a bare query string. CSV files
+    need a ``query`` column and may have ``sources`` (separated by ``;``),
+    ``max_results`` and ``min_score`` columns.
+    """
+    if fmt == "csv":
+        for row in csv.DictReader(stream):
+            request: Dict[str, Any] = {"query": row["query"]}
+            if row.get("sources"):
+                request["sources"] = [s.strip() for s in row["sources"].split(";")]
+            if row.get("max_results"):
+                request["max_results"] = int(row["max_results"])
+            if row.get("min_score"):
+                request["min_score"] = float(row["min_score"])
+            yield request
+        return
+
+    for line in stream:
+        if not line.strip():
+            continue
+        record = json.loads(line)
+        yield {"query": record} if isinstance(record, str) else record
+
+
+class Progress:
+    """Throughput and latency of a run, reported periodically to a stream."""
+
+    def __init__(self, stream: IO[str], interval: float = 5.0) -> None:
+        self.stream = stream
+        self.interval = interval
+        self.queries = 0
+        self.errors = 0
+        self.started = time.monotonic()
+        self._latencies: Deque[float] = deque(maxlen=4096)
+        self._last_report = self.started
+        self._lock = threading.Lock()
+
+    def record(self, queries: int, latency: Optional[float], errors: int = 0) -> None:
+        with self._lock:
+            self.queries += queries
+            self.errors += errors
+            if latency is not None:
+                self._latencies.append(latency)
+
+    def maybe_report(self) -> None:
+        if self.interval > 0 and time.monotonic() - self._last_report >= self.interval:
+            self.report()
+
+    def report(self) -> None:
+        with self._lock:
+            latencies = sorted(self._latencies)
+            queries, errors = self.queries, self.errors
+        self._last_report = time.monotonic()
+        elapsed = max(self._last_report - self.started, 1e-9)
+        line = f"{queries} queries, {errors} errors, {queries / elapsed:.1f} q/s"
+        if latencies:
+            p50 = latencies[len(latencies) // 2]
+            p95 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))]
+            line += f", request p50 {p50 * 1000:.0f} ms, p95 {p95 * 1000:.0f} ms"
+        print(line, file=self.stream, flush=True)
+
+
+def run(
+    client: TatryRetriever,
+    requests: Iterable[Dict[str, Any]],
+    out: IO[str],
+    batch_size: int = 1,
+    concurrency: int = 4,
+    start: int = 0,
+    progress: Optional[Progress] = None,
+) -> int:
+    """
+    Stream requests through ``retrieve_many`` and write JSONL in input order.
+
+    Returns:
+        Number of queries that failed
+    """
+    failed = 0
+    results = client.retrieve_many(
+        requests,
+        batch_size=batch_size,
+        concurrency=concurrency,
+        return_exceptions=True,
+        start=start,
+    )
+    for result in results:
+        record: Dict[str, Any] = {
+            "index": result.index,
+            "query": result.request.get("query"),
+        }
+        if result.error is not None:
+            failed += 1
+            record["error"] = str(result.error)
+        else:
+            record["documents"] = [doc.model_dump() for doc in result.documents or []]
+        out.write(json.dumps(record) + "\n")
+        out.flush()
+
+        if progress is not None:
+            # Queries of one batch share a call; count its latency once.
+            first = (result.index - start) % batch_size == 0
+            progress.record(
+                1, result.latency if first else None, int(result.error is not None)
+            )
+            progress.maybe_report()
+    return failed
+
+
+def completed_records(path: str) -> int:
+    """
+    Count the complete records of an earlier run's output file.
+
+    A partially written last line is truncated so the run can append to it.
+    """
+    done = kept = 0
+    with open(path, "rb+") as f:
+        for line in f:
+            if not line.endswith(b"\n"):
+                break
+            done += 1
+            kept += len(line)
+        f.truncate(kept)
+    return done
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="tatry",
+        description="Bulk retrieval from the Tatry API, streamed as JSONL.",
+    )
+    parser.add_argument(
+        "input", nargs="?", default="-", help="JSONL or CSV file, - for stdin"
+    )
+    parser.add_argument(
+        "-o", "--output", help="write results to this file instead of stdout"
+    )
+    parser.add_argument(
+        "--format", choices=["jsonl", "csv"], help="input format (default: by suffix)"
+    )
+    parser.add_argument("--api-key", default=os.environ.get("TATRY_API_KEY"))
+    parser.add_argument("--base-url", default="https://api.tatry.dev")
+    parser.add_argument("--timeout", type=int, help="per-request timeout in seconds")
+    parser.add_argument("--max-retries", type=int, help="attempts per request")
+    parser.add_argument(
+        "--transport", choices=["requests", "urllib3"], default="requests"
+    )
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument(
+        "--batch-size", type=int, default=1, help="queries per batch_retrieve call"
+    )
+    parser.add_argument("--max-results", type=int, default=5)
+    parser.add_argument("--sources", default="", help="comma-separated default sources")
+    parser.add_argument("--min-score", type=float)
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="skip queries already in --output and append to it",
+    )
+    parser.add_argument(
+        "--progress-interval",
+        type=float,
+        default=5.0,
+        help="seconds between progress reports on stderr, 0 to disable",
+    )
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if not args.api_key:
+        parser.error("an API key is required (--api-key or TATRY_API_KEY)")
+    if args.resume and not args.output:
+        parser.error("--resume requires --output")
+
+    defaults: Dict[str, Any] = {"max_results": args.max_results}
+    if args.sources:
+        defaults["sources"] = [s.strip() for s in args.sources.split(",")]
+    if args.min_score is not None:
+        defaults["min_score"] = args.min_score
+
+    fmt = args.format or ("csv" if args.input.endswith(".csv") else "jsonl")
+    start = 0
+    if args.resume and os.path.exists(args.output):
+        start = completed_records(args.output)
+
+    client = TatryRetriever(
+        api_key=args.api_key,
+        base_url=args.base_url,
+        timeout=args.timeout,
+        max_retries=args.max_retries,
+        transport=args.transport,
+    )
+    progress = Progress(sys.stderr, args.progress_interval)
+    source = sys.stdin if args.input == "-" else open(args.input, newline="")
+    out = (
+        sys.stdout
+        if not args.output
+        else open(args.output, "a" if args.resume else "w")
+    )
+    try:
+        requests = ({**defaults, **r} for r in read_queries(source, fmt))
+        failed = run(
+            client,
+            islice(requests, start, None),
+            out,
+            batch_size=args.batch_size,
+            concurrency=args.concurrency,
+            start=start,
+            progress=progress,
+        )
+    except KeyboardInterrupt:
+        return 130
+    finally:
+        if source is not sys.stdin:
+            source.close()
+        if out is not sys.stdout:
+            out.close()
+        if args.progress_interval > 0:
+            progress.report()
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
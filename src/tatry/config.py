@@ -1,4 +1,9 @@
 from dataclasses import dataclass
+from typing import Optional
+
+# Responses larger than this are parsed incrementally by default. Smaller
+# ones are validated in one go, which is about twice as fast.
+DEFAULT_STREAM_THRESHOLD = 8 * 1024 * 1024
 
 
 @dataclass
@@ -9,3 +14,14 @@ class Config:
     base_url: str
     timeout: int = 30
     max_retries: int = 3
+    # Per-attempt connect and read timeouts; both default to ``timeout``.
+    connect_timeout: Optional[float] = None
+    read_timeout: Optional[float] = None
+    # Total time budget per call across all retries. None means unbounded.
+    deadline: Optional[float] = None
+    # Response size in bytes above which large responses are parsed
+    # incrementally from the socket. None disables streaming.
+    stream_threshold: Optional[int] = DEFAULT_STREAM_THRESHOLD
+    # HTTP transport: "requests" (default, supports transport adapters) or
+    # the lower-overhead "urllib3".
+    transport: str = "requests"
@@ -45,3 +45,9 @@ class RetrieverConnectionError(RetrieverError):
     """Raised when there are connection issues."""
 
     pass
+
+
+class RetrieverUnavailableError(RetrieverConnectionError):
+    """Raised without a request when the service is known to be down."""
+
+    pass
@@ -1,4 +1,4 @@
-from typing import List, Optional
+from typing import Any, Dict, Iterable, Iterator, List, Optional
 
 try:
     from langchain.schema.document import Document as LangChainDocument
@@ -12,9 +12,53 @@ except ImportError:
             "LangChain is not installed. Please install it with `pip install langchain`."
         )
 
+from ..models.retrieve import Document
 from ..retrievers.tatry import TatryRetriever as TatryImpl
 
 
+def to_langchain_documents(
+    documents: Iterable[Document],
+    min_score: Optional[float] = None,
+    limit: Optional[int] = None,
+) -> Iterator[LangChainDocument]:
+    """
+    Convert Tatry documents to LangChain documents as they are consumed.
+
+    Documents below ``min_score`` are skipped before any conversion, and
+    nothing after the first ``limit`` matches is converted. The content
+    string is shared with the Tatry document rather than copied. With
+    pydantic v2 the documents are built with ``model_construct``, since the
+    values were already validated when the response was parsed.
+
+    Args:
+        documents: Documents from a Tatry response
+        min_score: Skip documents with a lower relevance score
+        limit: Maximum number of documents to produce
+
+    Returns:
+        Iterator of LangChain documents, in input order
+    """
+    if limit is not None and limit <= 0:
+        return
+    produced = 0
+    build = getattr(LangChainDocument, "model_construct", LangChainDocument)
+    for doc in documents:
+        if min_score is not None and doc.relevance_score < min_score:
+            continue
+        source = doc.metadata
+        metadata = {
+            "source": source.source,
+            "published_date": source.published_date,
+            "citation": source.citation,
+            "relevance_score": doc.relevance_score,
+            "id": doc.id,
+        }
+        yield build(page_content=doc.content, metadata=metadata)
+        produced += 1
+        if produced == limit:
+            return
+
+
 class TatryRetriever(LangChainBaseRetriever):
     """
     Tatry retriever for LangChain.
@@ -31,6 +75,10 @@ class TatryRetriever(LangChainBaseRetriever):
         sources: List[str] = None,
         max_results: int = 10,
         min_score: Optional[float] = None,
+        connect_timeout: Optional[float] = None,
+        read_timeout: Optional[float] = None,
+        deadline: Optional[float] = None,
+        transport: str = "requests",
     ):
         """
         Initialize the TatryRetriever.
@@ -43,10 +91,16 @@ class TatryRetriever(LangChainBaseRetriever):
             sources: List of source IDs to search
             max_results: Maximum number of results to return
             min_score: Minimum relevance score threshold (0.0 to 1.0)
+            connect_timeout: Connect timeout per attempt in seconds
+            read_timeout: Read timeout per attempt in seconds
+            deadline: Total time budget per query in seconds, across retries.
+                A tighter deadline set by the caller with
+                ``tatry.deadline()`` is inherited, including by ``ainvoke``.
+            transport: HTTP transport, "requests" or "urllib3"
         """
         LangChainBaseRetriever.__init__(self)
 
-        self._config = {
+        self._config: Dict[str, Any] = {
             "api_key": api_key,
             "base_url": base_url,
             "timeout": timeout,
@@ -61,6 +115,10 @@ class TatryRetriever(LangChainBaseRetriever):
             base_url=self._config["base_url"],
             timeout=self._config["timeout"],
             max_retries=self._config["max_retries"],
+            connect_timeout=connect_timeout,
+            read_timeout=read_timeout,
+            deadline=deadline,
+            transport=transport,
         )
 
     def _get_relevant_documents(self, query: str) -> List[LangChainDocument]:
@@ -73,28 +131,41 @@ class TatryRetriever(LangChainBaseRetriever):
         Returns:
             List of relevant documents
         """
+        return list(self.iter_relevant_documents(query))
+
+    def iter_relevant_documents(
+        self,
+        query: str,
+        min_score: Optional[float] = None,
+        limit: Optional[int] = None,
+    ) -> Iterator[LangChainDocument]:
+        """
+        Get documents relevant to the query, converted lazily.
+
+        The query is sent right away. Documents are converted only as the
+        iterator is consumed, so a chain that keeps the top few never pays
+        for converting the rest.
+
+        Args:
+            query: Query string
+            min_score: Skip documents below this score, on top of the
+                retriever's ``min_score``
+            limit: Maximum number of documents to produce
+
+        Returns:
+            Iterator of relevant documents
+        """
         response = self._client.retrieve(
             query=query,
             max_results=self._config["max_results"],
             sources=self._config["sources"],
             min_score=self._config["min_score"],
         )
-
-        documents = []
-        for doc in response.documents:
-            metadata = {
-                "source": doc.metadata.source,
-                "published_date": doc.metadata.published_date,
-                "citation": doc.metadata.citation,
-                "relevance_score": doc.relevance_score,
-                "id": doc.id,
-            }
-
-            documents.append(
-                LangChainDocument(
-                    page_content=doc.content,
-                    metadata=metadata,
-                )
-            )
-
-        return documents
+        thresholds = [
+            score
+            for score in (self._config["min_score"], min_score)
+            if score is not None
+        ]
+        return to_langchain_documents(
+            response.documents, max(thresholds, default=None), limit
+        )
@@ -0,0 +1,102 @@
+from functools import lru_cache
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Tuple, Type
+
+from pydantic import BaseModel, PrivateAttr, create_model
+
+from ..exceptions import RetrieverConfigError
+from .retrieve import Document, DocumentMetadata
+
+# Projectable document fields, in canonical order.
+DOCUMENT_FIELDS = (
+    "id",
+    "relevance_score",
+    "content",
+    "metadata.source",
+    "metadata.published_date",
+    "metadata.citation",
+)
+
+
+class ProjectedResult(BaseModel):
+    """Base of projected responses; remembers the request that produced them."""
+
+    _request: Optional[Dict[str, Any]] = PrivateAttr(default=None)
+
+
+class Projection(NamedTuple):
+    """Lightweight models holding only the projected document fields."""
+
+    fields: Tuple[str, ...]
+    document: Type[BaseModel]
+    response: Type[ProjectedResult]
+    batch_result: Type[ProjectedResult]
+    batch_response: Type[BaseModel]
+
+
+def normalize_fields(fields: Iterable[str]) -> Tuple[str, ...]:
+    """
+    Validate a field list and put it in canonical form.
+
+    ``id`` is always included. ``metadata`` stands for all metadata fields.
+    """
+    selected = {"id"}
+    for field in fields:
+        if field == "metadata":
+            selected.update(f for f in DOCUMENT_FIELDS if f.startswith("metadata."))
+        elif field in DOCUMENT_FIELDS:
+            selected.add(field)
+        else:
+            raise RetrieverConfigError(
+                f"Unknown document field {field!r}; "
+                f"expected one of {', '.join(DOCUMENT_FIELDS)} or metadata"
+            )
+    return tuple(field for field in DOCUMENT_FIELDS if field in selected)
+
+
+@lru_cache(maxsize=32)
+def projection(fields: Tuple[str, ...]) -> Projection:
+    """
+    Build, once per field set, the models for a projected response.
+
+    Only the projected fields exist on the models, so any other fields in
+    a response body are skipped during validation instead of being
+    materialized.
+
+    Args:
+        fields: Field list returned by ``normalize_fields``
+
+    Returns:
+        The document, response and batch models for the projection
+    """
+    document_fields: Dict[str, Any] = {
+        field: (Document.model_fields[field].annotation, ...)
+        for field in fields
+        if "." not in field
+    }
+    metadata_fields: Dict[str, Any] = {
+        name: (DocumentMetadata.model_fields[name].annotation, ...)
+        for name in (f.split(".", 1)[1] for f in fields if f.startswith("metadata."))
+    }
+    if metadata_fields:
+        document_fields["metadata"] = (
+            create_model("ProjectedMetadata", **metadata_fields),
+            ...,
+        )
+    document = create_model("ProjectedDocument", **document_fields)
+    response = create_model(
+        "ProjectedDocumentResponse",
+        __base__=ProjectedResult,
+        documents=(List[document], ...),  # type: ignore[valid-type]
+        total=(int, ...),
+    )
+    batch_result = create_model(
+        "ProjectedBatchQueryResult",
+        __base__=ProjectedResult,
+        query_id=(int, ...),
+        documents=(List[document], ...),  # type: ignore[valid-type]
+    )
+    batch_response = create_model(
+        "ProjectedBatchResponse",
+        results=(List[batch_result], ...),  # type: ignore[valid-type]
+    )
+    return Projection(fields, document, response, batch_result, batch_response)
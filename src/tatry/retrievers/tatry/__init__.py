@@ -1,3 +1,39 @@
+from .cache import SourceResultCache, StaleWhileRevalidateCache
+from .concurrency import AdaptiveConcurrencyLimiter
+from .deadlines import deadline
 from .endpoints import TatryImplementation as TatryRetriever
+from .feedback import FeedbackQueue
+from .health import HealthMonitor
+from .http2 import HTTP2Adapter
+from .identity import DocumentIdentityMap
+from .metrics import MetricsRegistry
+from .normalization import QueryCanonicalizer, measure_hit_rate
+from .pipeline import RetrievalResult
+from .recording import RecordingAdapter, ReplayAdapter
+from .scheduling import PriorityClass, PriorityScheduler, priority
+from .usage import UsageMeter
+from .warmup import WarmupReport, read_query_log
 
-__all__ = ["TatryRetriever"]
+__all__ = [
+    "TatryRetriever",
+    "AdaptiveConcurrencyLimiter",
+    "DocumentIdentityMap",
+    "FeedbackQueue",
+    "HealthMonitor",
+    "HTTP2Adapter",
+    "MetricsRegistry",
+    "PriorityClass",
+    "PriorityScheduler",
+    "QueryCanonicalizer",
+    "RecordingAdapter",
+    "ReplayAdapter",
+    "RetrievalResult",
+    "SourceResultCache",
+    "StaleWhileRevalidateCache",
+    "UsageMeter",
+    "WarmupReport",
+    "deadline",
+    "measure_hit_rate",
+    "priority",
+    "read_query_log",
+]
@@ -0,0 +1,362 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Callable,
+    Dict,
+    Hashable,
+    Iterable,
+    List,
+    NamedTuple,
+    Optional,
+    Tuple,
+    TypeVar,
+)
+
+if TYPE_CHECKING:
+    from .normalization import QueryCanonicalizer
+
+from ...exceptions import (
+    RetrieverAPIError,
+    RetrieverAuthError,
+    RetrieverConfigError,
+    RetrieverConnectionError,
+    RetrieverTimeoutError,
+)
+from ...models.retrieve import Document
+from .deadlines import remaining
+from .scheduling import BULK, priority
+
+T = TypeVar("T")
+
+
+class _SourceEntry(NamedTuple):
+    documents: List[Document]
+    max_results: int
+    min_score: Optional[float]
+    expires: float
+
+
+class SourceResultCache:
+    """
+    Retrieval results cached per ``(query, source)`` pair.
+
+    A request for several sources is served from the cached sources and
+    only the missing ones are fetched, so ``[a, b]`` followed by
+    ``[a, b, c]`` only fetches ``c``. An entry answers a later request if it
+    was fetched with at least as many results and a score threshold that is
+    no stricter, or if the source returned fewer documents than asked for.
+    Entries expire after ``ttl`` seconds and the least recently used entries
+    are evicted beyond ``maxsize``.
+    """
+
+    def __init__(self, maxsize: int = 10000, ttl: float = 300.0) -> None:
+        """
+        Initialize the cache.
+
+        Args:
+            maxsize: Maximum number of ``(query, source)`` entries
+            ttl: Seconds an entry stays valid
+        """
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[Tuple[str, str], _SourceEntry]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(
+        self,
+        query: str,
+        source: str,
+        max_results: int,
+        min_score: Optional[float] = None,
+    ) -> Optional[List[Document]]:
+        """Return cached documents able to answer the request, if any."""
+        key = (query, source)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry.expires <= time.monotonic():
+                del self._entries[key]
+                entry = None
+            if entry is None or not _covers(entry, max_results, min_score):
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry.documents
+
+    def put(
+        self,
+        query: str,
+        source: str,
+        documents: List[Document],
+        max_results: int,
+        min_score: Optional[float] = None,
+    ) -> None:
+        """Store the documents one source returned for a query."""
+        entry = _SourceEntry(
+            documents, max_results, min_score, time.monotonic() + self.ttl
+        )
+        with self._lock:
+            self._entries[(query, source)] = entry
+            self._entries.move_to_end((query, source))
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        """Drop all entries."""
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+def _covers(entry: _SourceEntry, max_results: int, min_score: Optional[float]) -> bool:
+    if entry.min_score is not None and (
+        min_score is None or min_score < entry.min_score
+    ):
+        return False
+    exhausted = len(entry.documents) < entry.max_results
+    return exhausted or entry.max_results >= max_results
+
+
+def merge_documents(
+    per_source: Iterable[List[Document]],
+    max_results: int,
+    min_score: Optional[float] = None,
+) -> List[Document]:
+    """
+    Merge per-source results into one ranked list.
+
+    Documents are ordered by ``relevance_score``, filtered by ``min_score``,
+    de-duplicated by ID and truncated to ``max_results``.
+    """
+    seen: Dict[str, Document] = {}
+    for documents in per_source:
+        for doc in documents:
+            if min_score is not None and doc.relevance_score < min_score:
+                continue
+            current = seen.get(doc.id)
+            if current is None or doc.relevance_score > current.relevance_score:
+                seen[doc.id] = doc
+    ranked = sorted(seen.values(), key=lambda doc: doc.relevance_score, reverse=True)
+    return ranked[:max_results]
+
+
+class _StaleEntry(NamedTuple):
+    value: Any
+    stored: float
+
+
+class StaleWhileRevalidateCache:
+    """
+    Call results served from cache while they are refreshed in the background.
+
+    An entry younger than ``soft_ttl`` is returned as is. Between
+    ``soft_ttl`` and ``hard_ttl`` it is still returned immediately, and a
+    background thread fetches a replacement. Older entries are fetched
+    synchronously, but if that fetch fails with a timeout, connection error,
+    429 or 5xx, an entry up to ``stale_if_error`` seconds past ``hard_ttl``
+    is returned instead of the error. Only one fetch per key runs at a
+    time: concurrent callers of a missing key wait for it, and a key is
+    never refreshed twice at once. Background refreshes run in the bulk
+    priority class.
+    """
+
+    def __init__(
+        self,
+        soft_ttl: float = 60.0,
+        hard_ttl: float = 600.0,
+        stale_if_error: float = 3600.0,
+        maxsize: int = 10000,
+        max_workers: int = 2,
+    ) -> None:
+        """
+        Initialize the cache.
+
+        Args:
+            soft_ttl: Seconds an entry is served without a refresh
+            hard_ttl: Seconds an entry may be served while it is refreshed
+            stale_if_error: Seconds past ``hard_ttl`` an entry may still be
+                served when fetching a replacement fails
+            maxsize: Maximum number of entries
+            max_workers: Threads running background refreshes
+        """
+        if not 0 <= soft_ttl <= hard_ttl or stale_if_error < 0:
+            raise RetrieverConfigError(
+                "TTLs must satisfy 0 <= soft_ttl <= hard_ttl and stale_if_error >= 0"
+            )
+        self.soft_ttl = soft_ttl
+        self.hard_ttl = hard_ttl
+        self.stale_if_error = stale_if_error
+        self.maxsize = maxsize
+        self.max_workers = max_workers
+
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.refresh_errors = 0
+        self.errors_masked = 0
+
+        self._entries: "OrderedDict[Hashable, _StaleEntry]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._reset()
+
+    def _reset(self) -> None:
+        # Runs at init and in a forked child: refresh threads do not survive
+        # a fork, so fetches the parent had in flight would never finish.
+        self._pid = os.getpid()
+        self._pending: Dict[Hashable, Future] = {}
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    def get_or_fetch(self, key: Hashable, fetch: Callable[[], T]) -> T:
+        """
+        Return the value cached for ``key``, calling ``fetch`` as needed.
+
+        Args:
+            key: Hashable cache key
+            fetch: Function producing a fresh value
+
+        Returns:
+            The cached or freshly fetched value
+        """
+        now = time.monotonic()
+        with self._lock:
+            if self._pid != os.getpid():
+                self._reset()
+            entry = self._entries.get(key)
+            age = 0.0
+            if entry is not None:
+                age = now - entry.stored
+                if age >= self.hard_ttl + self.stale_if_error:
+                    del self._entries[key]
+                    entry = None
+                else:
+                    self._entries.move_to_end(key)
+            if entry is not None and age < self.soft_ttl:
+                self.hits += 1
+                return entry.value
+            if entry is not None and age < self.hard_ttl:
+                self.stale_hits += 1
+                if key not in self._pending:
+                    self._start_refresh(key, fetch)
+                return entry.value
+
+            self.misses += 1
+            future = self._pending.get(key)
+            owner = future is None
+            if future is None:
+                future = self._pending[key] = Future()
+
+        try:
+            if owner:
+                return self._fetch(key, fetch, future)
+            return _result(future)
+        except (
+            RetrieverAPIError,
+            RetrieverConnectionError,
+            RetrieverTimeoutError,
+        ) as e:
+            if entry is None or not _transient(e):
+                raise
+            with self._lock:
+                self.errors_masked += 1
+            return entry.value
+
+    def _start_refresh(self, key: Hashable, fetch: Callable[[], Any]) -> None:
+        # Called with the lock held.
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.max_workers, thread_name_prefix="tatry-refresh"
+            )
+        future: Future = Future()
+        self._pending[key] = future
+        self._executor.submit(self._refresh, key, fetch, future)
+
+    def _refresh(self, key: Hashable, fetch: Callable[[], Any], future: Future) -> None:
+        try:
+            with priority(BULK):
+                self._fetch(key, fetch, future)
+        except Exception:
+            # The stale entry stays in place until it expires.
+            with self._lock:
+                self.refresh_errors += 1
+
+    def _fetch(self, key: Hashable, fetch: Callable[[], T], future: Future) -> T:
+        try:
+            value = fetch()
+        except BaseException as e:
+            with self._lock:
+                if self._pending.get(key) is future:
+                    del self._pending[key]
+            future.set_exception(e)
+            raise
+        with self._lock:
+            if self._pending.get(key) is future:
+                del self._pending[key]
+        self.put(key, value)
+        future.set_result(value)
+        return value
+
+    def put(self, key: Hashable, value: Any) -> None:
+        """Store a fresh value for ``key``, e.g. to warm the cache."""
+        with self._lock:
+            self._entries[key] = _StaleEntry(value, time.monotonic())
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, key: Hashable) -> None:
+        """Drop the entry for ``key``, if any."""
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        """Drop all entries."""
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+def retrieve_key(
+    query: str,
+    max_results: int,
+    sources: Iterable[str],
+    min_score: Optional[float],
+    canonicalizer: Optional["QueryCanonicalizer"] = None,
+) -> Tuple[Any, ...]:
+    """
+    ``StaleWhileRevalidateCache`` key of a ``retrieve`` call.
+
+    With a canonicalizer, equivalent spellings of a call share one key.
+    """
+    if canonicalizer is not None:
+        canonical = canonicalizer.canonicalize(query, max_results, sources, min_score)
+        return ("retrieve", canonical)
+    return ("retrieve", query, max_results, tuple(sources), min_score)
+
+
+def _result(future: Future) -> Any:
+    """Wait for another caller's fetch within the active deadline."""
+    try:
+        return future.result(timeout=remaining())
+    except FutureTimeoutError:
+        raise RetrieverTimeoutError("Timed out waiting for an in-flight fetch")
+
+
+def _transient(error: Exception) -> bool:
+    if isinstance(error, RetrieverAuthError):
+        return False
+    if isinstance(error, RetrieverAPIError):
+        status = error.status_code
+        return status is None or status == 429 or status >= 500
+    return True
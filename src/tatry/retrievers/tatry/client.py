@@ -1,17 +1,62 @@
-from typing import Any, Dict, Optional
+import itertools
+import json
+import os
+import time
+from contextlib import ExitStack
+from functools import partial
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+    Type,
+    TypeVar,
+    Union,
+)
 
 import requests
-from tenacity import retry, stop_after_attempt, wait_exponential
+from pydantic import BaseModel
+from requests.adapters import BaseAdapter
+from tenacity import (
+    RetryCallState,
+    Retrying,
+    retry_if_not_exception_type,
+    stop_after_attempt,
+    stop_any,
+    wait_exponential,
+)
+from tenacity.stop import stop_base
+from tenacity.wait import wait_base
 
-from ...config import Config
+from ...config import DEFAULT_STREAM_THRESHOLD, Config
 from ...exceptions import (
     RetrieverAPIError,
     RetrieverAuthError,
     RetrieverConfigError,
     RetrieverConnectionError,
     RetrieverTimeoutError,
+    RetrieverUnavailableError,
 )
 from ..base import BaseRetriever
+from .cache import SourceResultCache, StaleWhileRevalidateCache
+from .concurrency import AdaptiveConcurrencyLimiter
+from .deadlines import current_deadline
+from .health import HealthMonitor
+from .identity import DocumentIdentityMap
+from .metrics import Labels, MetricsRegistry, Sample, endpoint_label
+from .normalization import QueryCanonicalizer
+from .scheduling import PriorityScheduler
+from .streaming import JSONArrayStream
+from .transport import RequestsTransport, Transport, create_transport
+from .usage import UsageMeter
+
+T = TypeVar("T")
+M = TypeVar("M", bound=BaseModel)
+
+STREAM_CHUNK_SIZE = 64 * 1024
 
 
 class TatryClient(BaseRetriever):
@@ -23,6 +68,21 @@ class TatryClient(BaseRetriever):
         timeout: Optional[int] = None,
         max_retries: Optional[int] = None,
         base_url: str = "https://api.tatry.dev",
+        connect_timeout: Optional[float] = None,
+        read_timeout: Optional[float] = None,
+        deadline: Optional[float] = None,
+        usage_meter: Optional[UsageMeter] = None,
+        adapter: Optional[BaseAdapter] = None,
+        stream_threshold: Optional[int] = DEFAULT_STREAM_THRESHOLD,
+        canonicalizer: Optional[QueryCanonicalizer] = None,
+        fallback: Optional[BaseRetriever] = None,
+        concurrency_limiter: Optional[AdaptiveConcurrencyLimiter] = None,
+        source_cache: Optional[SourceResultCache] = None,
+        scheduler: Optional[PriorityScheduler] = None,
+        transport: str = "requests",
+        stale_cache: Optional[StaleWhileRevalidateCache] = None,
+        metrics: Optional[MetricsRegistry] = None,
+        identity_map: Optional[DocumentIdentityMap] = None,
     ):
         if not api_key or not isinstance(api_key, str):
             raise RetrieverConfigError("API key is required")
@@ -32,25 +92,95 @@ class TatryClient(BaseRetriever):
             base_url=base_url,
             timeout=timeout or 30,
             max_retries=max_retries or 3,
+            connect_timeout=connect_timeout,
+            read_timeout=read_timeout,
+            deadline=deadline,
+            stream_threshold=stream_threshold,
+            transport=transport,
         )
-        self.session = self._create_session()
-
-    def _create_session(self) -> requests.Session:
-        session = requests.Session()
-        session.headers.update(
-            {
-                "Authorization": f"Bearer {self.config.api_key}",
-                "Content-Type": "application/json",
-                "Accept": "application/json",
-            }
+        self.usage_meter = usage_meter
+        self.adapter = adapter
+        self.canonicalizer = canonicalizer
+        self.fallback = fallback
+        self.concurrency_limiter = concurrency_limiter
+        self.source_cache = source_cache
+        self.scheduler = scheduler
+        self.stale_cache = stale_cache
+        self.metrics = metrics
+        self.identity_map = identity_map
+        self.health_monitor: Optional[HealthMonitor] = None
+        self._pid = os.getpid()
+        self._transport = self._create_transport()
+        if metrics is not None:
+            metrics.register(self._collect_metrics)
+
+    @property
+    def transport(self) -> Transport:
+        """HTTP transport, rebuilt transparently in a forked child process."""
+        if self._pid != os.getpid():
+            self._after_fork()
+        return self._transport
+
+    @property
+    def session(self) -> requests.Session:
+        """Session of the requests transport."""
+        transport = self.transport
+        if not isinstance(transport, RequestsTransport):
+            raise AttributeError(
+                f"The {self.config.transport} transport has no session"
+            )
+        return transport.session
+
+    @session.setter
+    def session(self, session: requests.Session) -> None:
+        transport = self.transport
+        if not isinstance(transport, RequestsTransport):
+            raise AttributeError(
+                f"The {self.config.transport} transport has no session"
+            )
+        transport.session = session
+
+    def _after_fork(self) -> None:
+        """
+        Reset per-process state after a fork.
+
+        The parent's pooled sockets must not be shared with the child, so the
+        child gets a fresh transport and connection pool. The config and any
+        process-independent state are kept.
+        """
+        self._pid = os.getpid()
+        self._transport = self._create_transport()
+
+    def start_health_monitor(self, **kwargs: Any) -> HealthMonitor:
+        """
+        Probe ``/v1/health`` in the background and fail fast during outages.
+
+        While the monitor reports the service as down, calls raise
+        ``RetrieverUnavailableError`` without sending a request, and
+        ``retrieve``/``batch_retrieve`` are routed to ``fallback`` if one
+        was configured.
+
+        Args:
+            **kwargs: Arguments passed to ``HealthMonitor``
+
+        Returns:
+            The started monitor
+        """
+        if self.health_monitor is not None:
+            self.health_monitor.stop()
+        self.health_monitor = HealthMonitor(self, **kwargs).start()
+        return self.health_monitor
+
+    def _create_transport(self) -> Transport:
+        headers = {
+            "Authorization": f"Bearer {self.config.api_key}",
+            "Content-Type": "application/json",
+            "Accept": "application/json",
+        }
+        return create_transport(
+            self.config.transport, headers, self.config.base_url, self.adapter
         )
-        return session
 
-    @retry(
-        stop=stop_after_attempt(3),
-        wait=wait_exponential(multiplier=1, min=4, max=10),
-        reraise=True,
-    )
     def _request(self, method: str, path: str, **kwargs: Any) -> Dict[str, Any]:
         """
         Make an HTTP request to the API.
@@ -58,36 +188,363 @@ class TatryClient(BaseRetriever):
         Args:
             method: HTTP method (GET, POST, etc.)
             path: API endpoint path
-            **kwargs: Additional arguments passed to requests.request
+            **kwargs: ``json``, ``params`` and further request options of
+                the transport, such as ``headers`` for the requests transport
 
         Returns:
             Dict[str, Any]: JSON response from the API
+
+        Raises:
+            RetrieverConfigError: If the transport does not support an option
         """
-        url = f"{self.config.base_url}{path}"
+        return self._request_as(_parse_json, method, path, **kwargs)
 
-        try:
-            response = self.session.request(
-                method=method,
-                url=url,
-                timeout=self.config.timeout,
-                **kwargs,
+    def _request_model(
+        self,
+        model: Type[M],
+        method: str,
+        path: str,
+        items: Optional[Tuple[str, Type[BaseModel]]] = None,
+        **kwargs: Any,
+    ) -> M:
+        """
+        Make an HTTP request and validate the JSON body directly into a model.
+
+        The body is parsed by pydantic without building an intermediate dict
+        tree. If ``items`` names a top-level array and the client has a
+        ``stream_threshold``, large bodies are read from the socket
+        incrementally and validated one array item at a time. The default
+        threshold of 8 MiB keeps peak memory of very large responses at
+        about half of a one-shot parse.
+
+        Args:
+            model: Model of the whole response
+            method: HTTP method (GET, POST, etc.)
+            path: API endpoint path
+            items: Key and model of the top-level array that may be streamed
+            **kwargs: Request options, as for ``_request``
+
+        Returns:
+            The validated response model
+        """
+        if items is None or self.config.stream_threshold is None:
+            return self._request_as(
+                partial(_parse_model, model), method, path, **kwargs
             )
-            response.raise_for_status()
-            return response.json()  # type: ignore[no-any-return]
+        return self._request_as(
+            partial(self._parse_stream, model, items),
+            method,
+            path,
+            stream=True,
+            **kwargs,
+        )
 
-        except requests.exceptions.HTTPError as e:
-            if e.response.status_code == 401:
-                raise RetrieverAuthError(
-                    "Authentication failed", status_code=401, response=e.response
+    def _parse_stream(
+        self,
+        model: Type[M],
+        items: Tuple[str, Type[BaseModel]],
+        response: requests.Response,
+    ) -> M:
+        length = response.headers.get("Content-Length")
+        threshold = self.config.stream_threshold or 0
+        if length is not None and int(length) <= threshold:
+            return _parse_model(model, response)
+
+        chunks: Iterator[bytes] = response.iter_content(STREAM_CHUNK_SIZE)
+        if length is None:
+            # Without a length, buffer up to the threshold first, so small
+            # chunked responses still take the faster one-shot path.
+            head: List[bytes] = []
+            size = 0
+            for chunk in chunks:
+                head.append(chunk)
+                size += len(chunk)
+                if size > threshold:
+                    break
+            else:
+                return model.model_validate_json(b"".join(head))
+            chunks = itertools.chain(head, chunks)
+
+        key, item_model = items
+        stream = JSONArrayStream(chunks, key)
+        parsed = [item_model.model_validate_json(item) for item in stream]
+        fields = json.loads(stream.skeleton)
+        fields[key] = parsed
+        return model.model_validate(fields)
+
+    def _request_as(
+        self,
+        parse: Callable[[requests.Response], T],
+        method: str,
+        path: str,
+        **kwargs: Any,
+    ) -> T:
+        """
+        Make an HTTP request to the API and parse the response.
+
+        Failed attempts are retried up to ``max_retries`` times with
+        exponential backoff. With a deadline active, either from
+        ``deadline()`` or ``Config.deadline``, the total time across all
+        attempts and waits is capped and each attempt gets the remaining
+        budget as its timeout.
+
+        Args:
+            parse: Callable turning a successful response into the result
+            method: HTTP method (GET, POST, etc.)
+            path: API endpoint path
+            **kwargs: Additional arguments passed to requests.request
+
+        Returns:
+            The value returned by ``parse``
+        """
+        if self.health_monitor is not None and not self.health_monitor.healthy:
+            raise RetrieverUnavailableError("Service is unavailable (health check)")
+
+        expires = current_deadline()
+        if self.config.deadline is not None:
+            own = time.monotonic() + self.config.deadline
+            expires = own if expires is None else min(expires, own)
+
+        wait = wait_exponential(multiplier=1, min=4, max=10)
+        retry_options: Dict[str, Any] = {}
+        metrics = self.metrics
+        if metrics is not None:
+            labels = (("endpoint", endpoint_label(path)),)
+            retry_options["before_sleep"] = lambda _: metrics.inc(
+                "tatry_retries_total", labels=labels
+            )
+
+        retrying = Retrying(
+            stop=stop_any(
+                stop_after_attempt(self.config.max_retries),
+                _StopBeforeDeadline(expires, wait),
+            ),
+            # Invalid requests fail the same way on every attempt.
+            retry=retry_if_not_exception_type(RetrieverConfigError),
+            wait=wait,
+            reraise=True,
+            **retry_options,
+        )
+        return retrying(self._send, parse, method, path, expires, **kwargs)
+
+    def _attempt_timeout(
+        self, expires: Optional[float]
+    ) -> Union[float, Tuple[float, float]]:
+        connect = self.config.connect_timeout or self.config.timeout
+        read = self.config.read_timeout or self.config.timeout
+        if expires is not None:
+            left = expires - time.monotonic()
+            if left <= 0:
+                raise RetrieverTimeoutError("Deadline exceeded")
+            connect, read = min(connect, left), min(read, left)
+        return read if connect == read else (connect, read)
+
+    def _send(
+        self,
+        parse: Callable[[requests.Response], T],
+        method: str,
+        path: str,
+        expires: Optional[float],
+        **kwargs: Any,
+    ) -> T:
+        """Make one attempt, holding scheduler and concurrency limiter slots."""
+        with ExitStack() as stack:
+            if self.scheduler is not None:
+                stack.enter_context(self.scheduler.slot(timeout=_wait(expires)))
+            if self.concurrency_limiter is not None:
+                stack.enter_context(
+                    self.concurrency_limiter.slot(
+                        timeout=_wait(expires),
+                        key=endpoint_label(path),
+                        expires=expires,
+                    )
                 )
-            raise RetrieverAPIError(
-                f"API request failed: {str(e)}",
-                status_code=e.response.status_code,
-                response=e.response,
+            if self.metrics is None:
+                return self._attempt(parse, method, path, expires, **kwargs)
+            return self._measured_attempt(
+                self.metrics, parse, method, path, expires, **kwargs
             )
-        except requests.exceptions.Timeout as e:
-            raise RetrieverTimeoutError(f"Request timed out: {str(e)}")
-        except requests.exceptions.ConnectionError as e:
-            raise RetrieverConnectionError(f"Connection error: {str(e)}")
-        except requests.exceptions.RequestException as e:
-            raise RetrieverAPIError(f"Request failed: {str(e)}")
+
+    def _measured_attempt(
+        self,
+        metrics: MetricsRegistry,
+        parse: Callable[[requests.Response], T],
+        method: str,
+        path: str,
+        expires: Optional[float],
+        **kwargs: Any,
+    ) -> T:
+        """``_attempt`` recording latency, outcome and body sizes."""
+        endpoint = endpoint_label(path)
+        responses = []
+
+        def measured(response: requests.Response) -> T:
+            responses.append(response)
+            return parse(response)
+
+        status = "error"
+        metrics.inc("tatry_requests_in_flight")
+        started = time.perf_counter()
+        try:
+            result = self._attempt(measured, method, path, expires, **kwargs)
+            status = str(responses[0].status_code)
+            return result
+        except RetrieverAPIError as e:
+            if e.status_code is not None:
+                status = str(e.status_code)
+            if e.response is not None:
+                responses.append(e.response)
+            raise
+        except RetrieverTimeoutError:
+            status = "timeout"
+            metrics.inc("tatry_timeouts_total", labels=(("endpoint", endpoint),))
+            raise
+        finally:
+            elapsed = time.perf_counter() - started
+            metrics.inc("tatry_requests_in_flight", -1)
+            labels: Labels = (
+                ("endpoint", endpoint),
+                ("method", method),
+                ("status", status),
+            )
+            metrics.inc("tatry_requests_total", labels=labels)
+            metrics.observe("tatry_request_duration_seconds", elapsed, labels)
+            if responses:
+                self._record_sizes(metrics, endpoint, responses[0], kwargs)
+
+    def _record_sizes(
+        self,
+        metrics: MetricsRegistry,
+        endpoint: str,
+        response: Any,
+        kwargs: Dict[str, Any],
+    ) -> None:
+        labels = (("endpoint", endpoint),)
+        metrics.inc(
+            "tatry_request_bytes_total",
+            self.transport.request_size(response),
+            labels,
+        )
+        length = response.headers.get("Content-Length")
+        if length is not None:
+            received = int(length)
+        elif not kwargs.get("stream"):
+            received = len(response.content)
+        else:
+            # Streamed without a length: count what was read off the wire.
+            size = self.transport.response_size(response)
+            if size is None:
+                return
+            received = size
+        metrics.inc("tatry_response_bytes_total", received, labels)
+
+    def _collect_metrics(self) -> List[Sample]:
+        """
+        Cache, connection pool and concurrency limiter metrics, read at
+        export time.
+
+        Only additive values are returned; the registry derives the hit
+        ratio and pool utilization from their sums over all clients.
+        """
+        samples = []
+        caches = (
+            ("source", self.source_cache, ()),
+            ("stale", self.stale_cache, ("stale_hits",)),
+        )
+        for name, cache, extra in caches:
+            if cache is None:
+                continue
+            counts = {"hit": cache.hits, "miss": cache.misses}
+            counts.update({"stale": getattr(cache, attr) for attr in extra})
+            for result, count in counts.items():
+                labels = (("cache", name), ("result", result))
+                samples.append(Sample("tatry_cache_lookups_total", labels, count))
+
+        usage = self.transport.pool_usage()
+        if usage is not None:
+            in_use, capacity = usage
+            samples.append(Sample("tatry_pool_connections_in_use", (), in_use))
+            samples.append(Sample("tatry_pool_connections_max", (), capacity))
+
+        limiter = self.concurrency_limiter
+        if limiter is not None:
+            samples.append(Sample("tatry_concurrency_limit", (), limiter.limit))
+            samples.append(Sample("tatry_concurrency_in_flight", (), limiter.in_flight))
+        return samples
+
+    def _attempt(
+        self,
+        parse: Callable[[requests.Response], T],
+        method: str,
+        path: str,
+        expires: Optional[float],
+        **kwargs: Any,
+    ) -> T:
+        """Make a single request attempt and parse the response."""
+        transport = self.transport
+        try:
+            response = transport.request(
+                method,
+                f"{self.config.base_url}{path}",
+                timeout=self._attempt_timeout(expires),
+                **kwargs,
+            )
+            with response:
+                if response.status_code < 400:
+                    return parse(response)
+                # Buffer the error body before the response is closed.
+                response.content
+            raise _status_error(response)
+
+        except transport.errors as e:
+            error = transport.translate(e)
+            if isinstance(error, (RetrieverTimeoutError, RetrieverConnectionError)):
+                self._report_failure()
+            raise error
+        except ValueError as e:
+            raise RetrieverAPIError(f"Invalid response: {str(e)}")
+
+    def _report_failure(self) -> None:
+        if self.health_monitor is not None:
+            self.health_monitor.report_failure()
+
+
+class _StopBeforeDeadline(stop_base):
+    """Give up now rather than sleep past the deadline."""
+
+    def __init__(self, expires: Optional[float], wait: wait_base) -> None:
+        self.expires = expires
+        self.wait = wait
+
+    def __call__(self, retry_state: RetryCallState) -> bool:
+        return (
+            self.expires is not None
+            and self.expires - time.monotonic() <= self.wait(retry_state)
+        )
+
+
+def _wait(expires: Optional[float]) -> Optional[float]:
+    return None if expires is None else max(0.0, expires - time.monotonic())
+
+
+def _status_error(response: Any) -> RetrieverAPIError:
+    status = response.status_code
+    if status == 401:
+        return RetrieverAuthError(
+            "Authentication failed", status_code=401, response=response
+        )
+    kind = "Client" if status < 500 else "Server"
+    return RetrieverAPIError(
+        f"API request failed: {status} {kind} Error: {response.reason} "
+        f"for url: {response.url}",
+        status_code=status,
+        response=response,
+    )
+
+
+def _parse_json(response: requests.Response) -> Dict[str, Any]:
+    return response.json()  # type: ignore[no-any-return]
+
+
+def _parse_model(model: Type[M], response: requests.Response) -> M:
+    return model.model_validate_json(response.content)
@@ -0,0 +1,170 @@
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Hashable, Iterator, Optional
+
+from ...exceptions import RetrieverAPIError, RetrieverTimeoutError
+
+# Status codes that signal the service is shedding load.
+OVERLOAD_STATUSES = frozenset({429, 503})
+
+
+class AdaptiveConcurrencyLimiter:
+    """
+    AIMD concurrency limit driven by latency and overload responses.
+
+    Every successful request that finds the limit in use raises it by about
+    one per round of ``limit`` requests. A 429/503 response, a timeout, or a
+    latency above ``latency_tolerance`` times the baseline latency cuts the
+    limit by ``backoff``. Baselines are kept per request kind, e.g. per
+    endpoint, so that a mix of fast and slow calls does not look like
+    congestion. At most one cut is applied per round trip, so a burst of
+    failures from the same window counts once. The limit thereby tracks the
+    highest concurrency the service sustains.
+    """
+
+    def __init__(
+        self,
+        initial_limit: int = 4,
+        min_limit: int = 1,
+        max_limit: int = 256,
+        backoff: float = 0.75,
+        latency_tolerance: float = 2.0,
+    ) -> None:
+        """
+        Initialize the limiter.
+
+        Args:
+            initial_limit: Starting concurrency limit
+            min_limit: Lowest limit the limiter will back off to
+            max_limit: Highest limit the limiter will grow to
+            backoff: Factor applied to the limit on congestion
+            latency_tolerance: Latency, as a multiple of the baseline
+                latency, above which the service counts as congested
+        """
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.backoff = backoff
+        self.latency_tolerance = latency_tolerance
+
+        self._limit = float(initial_limit)
+        self._in_flight = 0
+        self._baselines: Dict[Hashable, float] = {}
+        self._last_cut = 0.0
+        self._cond = threading.Condition()
+
+    @property
+    def limit(self) -> int:
+        """Current concurrency limit."""
+        return int(self._limit)
+
+    @property
+    def in_flight(self) -> int:
+        """Number of requests currently holding a slot."""
+        return self._in_flight
+
+    @property
+    def baseline_latency(self) -> Optional[float]:
+        """Uncongested latency of requests released without a key, in seconds."""
+        return self._baselines.get(None)
+
+    @property
+    def baselines(self) -> Dict[Hashable, float]:
+        """Uncongested latency per request kind, in seconds."""
+        with self._cond:
+            return dict(self._baselines)
+
+    def acquire(self, timeout: Optional[float] = None) -> bool:
+        """
+        Wait for a free slot.
+
+        Returns:
+            True if a slot was acquired before the timeout
+        """
+        with self._cond:
+            if not self._cond.wait_for(
+                lambda: self._in_flight < int(self._limit), timeout
+            ):
+                return False
+            self._in_flight += 1
+            return True
+
+    def release(
+        self,
+        started: float,
+        latency: Optional[float] = None,
+        overloaded: bool = False,
+        key: Hashable = None,
+    ) -> None:
+        """
+        Free a slot and adjust the limit.
+
+        Args:
+            started: ``time.monotonic()`` when the request was sent
+            latency: Request latency, or None when it carries no signal
+            overloaded: Whether the service signalled overload
+            key: Request kind whose baseline ``latency`` is compared with
+        """
+        with self._cond:
+            saturated = self._in_flight >= int(self._limit)
+            self._in_flight -= 1
+
+            if latency is not None and not overloaded:
+                baseline = self._baselines.get(key)
+                if baseline is None or latency < baseline:
+                    baseline = latency
+                overloaded = latency > baseline * self.latency_tolerance
+                if not overloaded:
+                    # Drift up slowly so a stale minimum does not pin the
+                    # limit down after the service gets slower for good.
+                    baseline += (latency - baseline) * 0.01
+                self._baselines[key] = baseline
+
+            if overloaded:
+                if started >= self._last_cut:
+                    self._limit = max(self.min_limit, self._limit * self.backoff)
+                    self._last_cut = time.monotonic()
+            elif latency is not None and saturated:
+                self._limit = min(self.max_limit, self._limit + 1 / self._limit)
+            self._cond.notify_all()
+
+    @contextmanager
+    def slot(
+        self,
+        timeout: Optional[float] = None,
+        key: Hashable = None,
+        expires: Optional[float] = None,
+    ) -> Iterator[None]:
+        """
+        Hold a slot for one request and feed its outcome back.
+
+        Overload responses and timeouts count as congestion, successful
+        requests contribute their latency, other errors carry no signal.
+        A timeout once the caller's deadline has passed is the caller's
+        budget running out, not the service's, and carries no signal either.
+
+        Args:
+            timeout: Maximum seconds to wait for a slot
+            key: Request kind, e.g. the endpoint, for the latency baseline
+            expires: ``time.monotonic()`` deadline of the caller, if any
+
+        Raises:
+            RetrieverTimeoutError: If no slot frees up within ``timeout``
+        """
+        if not self.acquire(timeout):
+            raise RetrieverTimeoutError("Timed out waiting for a concurrency slot")
+        started = time.monotonic()
+        try:
+            yield
+        except RetrieverTimeoutError:
+            self.release(
+                started, overloaded=expires is None or time.monotonic() < expires
+            )
+            raise
+        except RetrieverAPIError as e:
+            self.release(started, overloaded=e.status_code in OVERLOAD_STATUSES)
+            raise
+        except BaseException:
+            self.release(started)
+            raise
+        self.release(started, latency=time.monotonic() - started, key=key)
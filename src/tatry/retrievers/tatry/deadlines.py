@@ -0,0 +1,43 @@
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator, Optional
+
+# Absolute expiry on the time.monotonic() clock.
+_deadline: ContextVar[Optional[float]] = ContextVar("tatry_deadline", default=None)
+
+
+@contextmanager
+def deadline(seconds: float) -> Iterator[None]:
+    """
+    Cap the total time of every API call made inside the block.
+
+    The budget covers all attempts and the waits between retries. Each
+    attempt gets the remaining budget as its timeout. Nested deadlines can
+    only shorten the enclosing one. The deadline is stored in a context
+    variable, so it follows asyncio tasks and ``contextvars.copy_context``
+    into executor threads.
+
+    Args:
+        seconds: Time budget from now
+    """
+    expires = time.monotonic() + seconds
+    parent = _deadline.get()
+    if parent is not None:
+        expires = min(expires, parent)
+    token = _deadline.set(expires)
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
+
+
+def current_deadline() -> Optional[float]:
+    """Expiry of the innermost active deadline on the monotonic clock."""
+    return _deadline.get()
+
+
+def remaining() -> Optional[float]:
+    """Seconds left before the active deadline, or None without one."""
+    expires = _deadline.get()
+    return None if expires is None else expires - time.monotonic()
@@ -1,22 +1,139 @@
-from typing import Dict, List, Optional
+from functools import partial
+from typing import (
+    Any,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+    Union,
+    overload,
+)
 
+from ...exceptions import RetrieverConfigError, RetrieverUnavailableError
 from ...models.auth import ValidateResponse
-from ...models.retrieve import BatchQueryResult, DocumentResponse
+from ...models.projection import ProjectedResult, normalize_fields, projection
+from ...models.retrieve import (
+    BatchQueryResult,
+    BatchResponse,
+    Document,
+    DocumentResponse,
+)
 from ...models.sources import Source
-from ...models.utils import FeedbackResponse, HealthResponse
+from ...models.utils import FeedbackResponse, HealthResponse, UsageResponse
+from .cache import SourceResultCache, merge_documents, retrieve_key
 from .client import TatryClient
+from .normalization import CanonicalQuery
+from .pipeline import RetrievalResult, retrieve_many
+from .scheduling import BULK, current_priority, priority
+from .warmup import WarmupReport, warm_cache
 
 
 class TatryImplementation(TatryClient):
     """Implementation of Tatry API endpoints."""
 
+    @overload
     def retrieve(
         self,
         query: str,
         max_results: int = 5,
         sources: List[str] = [],
         min_score: Optional[float] = None,
+        fields: None = None,
+    ) -> DocumentResponse: ...
+
+    @overload
+    def retrieve(
+        self,
+        query: str,
+        max_results: int = 5,
+        sources: List[str] = [],
+        min_score: Optional[float] = None,
+        *,
+        fields: Sequence[str],
+    ) -> ProjectedResult: ...
+
+    def retrieve(
+        self,
+        query: str,
+        max_results: int = 5,
+        sources: List[str] = [],
+        min_score: Optional[float] = None,
+        fields: Optional[Sequence[str]] = None,
+    ) -> Union[DocumentResponse, ProjectedResult]:
+        if fields is not None:
+            return self._retrieve_projected(
+                query, max_results, list(sources), min_score, normalize_fields(fields)
+            )
+        if self.stale_cache is None:
+            return self._retrieve_or_fallback(query, max_results, sources, min_score)
+        return self.stale_cache.get_or_fetch(
+            retrieve_key(query, max_results, sources, min_score, self.canonicalizer),
+            partial(
+                self._retrieve_or_fallback, query, max_results, list(sources), min_score
+            ),
+        )
+
+    def _retrieve_or_fallback(
+        self,
+        query: str,
+        max_results: int,
+        sources: List[str],
+        min_score: Optional[float],
     ) -> DocumentResponse:
+        try:
+            return self._retrieve(query, max_results, sources, min_score)
+        except RetrieverUnavailableError:
+            if self.fallback is None:
+                raise
+            return self.fallback.retrieve(query, max_results, sources, min_score)
+
+    def _retrieve_projected(
+        self,
+        query: str,
+        max_results: int,
+        sources: List[str],
+        min_score: Optional[float],
+        fields: Tuple[str, ...],
+    ) -> ProjectedResult:
+        # Projected results bypass the result caches, which hold full
+        # documents.
+        try:
+            result = self._retrieve(query, max_results, sources, min_score, fields)
+        except RetrieverUnavailableError:
+            if self.fallback is None:
+                raise
+            result = self.fallback.retrieve(  # type: ignore[call-arg]
+                query, max_results, sources, min_score, fields=fields
+            )
+        result._request = {
+            "query": query,
+            "max_results": max_results,
+            "sources": sources,
+            "min_score": min_score,
+        }
+        return result
+
+    def _retrieve(
+        self,
+        query: str,
+        max_results: int,
+        sources: List[str],
+        min_score: Optional[float],
+        fields: Optional[Tuple[str, ...]] = None,
+    ) -> Any:
+        if self.source_cache is not None and sources and fields is None:
+            # The canonical text only keys the cache; the API gets the
+            # query as the caller wrote it.
+            key = query
+            if self.canonicalizer is not None:
+                key = self.canonicalizer.normalize(query)
+            return self._retrieve_per_source(
+                self.source_cache, query, key, max_results, sources, min_score
+            )
+
         request_data = {
             "query": query,
             "max_results": max_results,
@@ -26,32 +143,248 @@ class TatryImplementation(TatryClient):
         if min_score is not None:
             request_data["min_score"] = min_score
 
-        response = self._request(
+        model: Any = DocumentResponse
+        document: Any = Document
+        if fields is not None:
+            request_data["fields"] = list(fields)
+            projected = projection(fields)
+            model, document = projected.response, projected.document
+
+        result = self._request_model(
+            model,
             "POST",
             "/v1/retrieve",
+            items=("documents", document),
             json=request_data,
         )
-        return DocumentResponse.model_validate(response)
+        if self.identity_map is not None and fields is None:
+            self.identity_map.intern_all(result.documents)
+        if self.usage_meter is not None:
+            self.usage_meter.record(sources, result.documents)
+            self.usage_meter.maybe_reconcile(self.get_usage)
+        if self.metrics is not None:
+            self.metrics.inc(
+                "tatry_documents_returned_total",
+                len(result.documents),
+                (("endpoint", "/v1/retrieve"),),
+            )
+        return result
 
-    def batch_retrieve(self, queries: List[Dict]) -> List[BatchQueryResult]:
-        response = self._request(
-            "POST",
-            "/v1/retrieve/batch",
-            json={"queries": queries},
+    def _retrieve_per_source(
+        self,
+        cache: SourceResultCache,
+        query: str,
+        key: str,
+        max_results: int,
+        sources: List[str],
+        min_score: Optional[float],
+    ) -> DocumentResponse:
+        # Each source's own top results are cached, so any combination of
+        # sources can be merged exactly; only uncached sources are fetched,
+        # all in one batch round trip. Entries are stored under ``key``.
+        found: Dict[str, List[Document]] = {}
+        missing: List[str] = []
+        for source in dict.fromkeys(sources):
+            documents = cache.get(key, source, max_results, min_score)
+            if documents is None:
+                missing.append(source)
+            else:
+                found[source] = documents
+
+        if missing:
+            queries: List[Dict] = []
+            for source in missing:
+                request = {
+                    "query": query,
+                    "max_results": max_results,
+                    "sources": [source],
+                }
+                if min_score is not None:
+                    request["min_score"] = min_score
+                queries.append(request)
+            for result in self._batch_retrieve(queries):
+                source = missing[result.query_id]
+                cache.put(key, source, result.documents, max_results, min_score)
+                found[source] = result.documents
+
+        documents = merge_documents(found.values(), max_results, min_score)
+        return DocumentResponse(documents=documents, total=len(documents))
+
+    @overload
+    def batch_retrieve(
+        self, queries: List[Dict], fields: None = None
+    ) -> List[BatchQueryResult]: ...
+
+    @overload
+    def batch_retrieve(
+        self, queries: List[Dict], fields: Sequence[str]
+    ) -> List[ProjectedResult]: ...
+
+    def batch_retrieve(
+        self, queries: List[Dict], fields: Optional[Sequence[str]] = None
+    ) -> List[Any]:
+        projected = normalize_fields(fields) if fields is not None else None
+        try:
+            # Batches are bulk traffic unless the caller chose a class.
+            with priority(current_priority() or BULK):
+                results = self._batch_retrieve_canonical(queries, projected)
+        except RetrieverUnavailableError:
+            if self.fallback is None:
+                raise
+            if projected is None:
+                return self.fallback.batch_retrieve(queries)
+            results = self.fallback.batch_retrieve(  # type: ignore[call-arg]
+                queries, fields=projected
+            )
+        if projected is not None:
+            for result in results:
+                if result.query_id < len(queries):
+                    result._request = queries[result.query_id]
+        return results
+
+    def fetch_content(
+        self, result: ProjectedResult, ids: Optional[Iterable[str]] = None
+    ) -> List[Document]:
+        """
+        Fetch full documents for a projected result.
+
+        The API has no lookup by document ID, so the request that produced
+        ``result`` is sent again without projection, through the result
+        caches if the client has any. Documents the query no longer returns
+        are left out.
+
+        Args:
+            result: Projected ``retrieve`` response or ``batch_retrieve`` result
+            ids: IDs of the documents to fetch, by default all in ``result``
+
+        Returns:
+            The full documents, in the order of ``ids``
+        """
+        request = getattr(result, "_request", None)
+        if request is None:
+            raise RetrieverConfigError("Result does not come from a projected call")
+        full = self.retrieve(
+            request["query"],
+            request.get("max_results", 5),
+            request.get("sources") or [],
+            request.get("min_score"),
+        )
+        by_id = {doc.id: doc for doc in full.documents}
+        if ids is None:
+            ids = (doc.id for doc in result.documents)  # type: ignore[attr-defined]
+        return [by_id[doc_id] for doc_id in ids if doc_id in by_id]
+
+    def retrieve_many(
+        self,
+        queries: Iterable[Union[str, Dict[str, Any]]],
+        batch_size: int = 20,
+        concurrency: int = 4,
+        ordered: bool = True,
+        return_exceptions: bool = False,
+        start: int = 0,
+    ) -> Iterator[RetrievalResult]:
+        """
+        Retrieve documents for a lazily consumed iterable of queries.
+
+        See ``pipeline.retrieve_many`` for batching, parallelism and
+        backpressure.
+        """
+        return retrieve_many(
+            self, queries, batch_size, concurrency, ordered, return_exceptions, start
         )
+
+    def warm_cache(
+        self,
+        log: Iterable[Union[str, Dict[str, Any]]],
+        top_n: int = 1000,
+        rank: str = "frequency",
+        batch_size: int = 20,
+        max_qps: Optional[float] = None,
+    ) -> WarmupReport:
+        """
+        Fill the result caches with the top queries of a query log.
+
+        See ``warmup.warm_cache`` for ranking, batching and rate limiting.
+        """
+        return warm_cache(self, log, top_n, rank, batch_size, max_qps)
+
+    def _batch_retrieve_canonical(
+        self, queries: List[Dict], fields: Optional[Tuple[str, ...]] = None
+    ) -> List[Any]:
+        if self.canonicalizer is None:
+            return self._batch_retrieve(queries, fields)
+
+        # Send each distinct canonical query once, as first written, and fan
+        # the results back out to every position that asked for it.
+        positions: Dict[CanonicalQuery, int] = {}
+        unique: List[Dict] = []
+        index: List[int] = []
+        for request in queries:
+            key = self.canonicalizer.canonicalize_request(request)
+            if key not in positions:
+                positions[key] = len(unique)
+                unique.append(request)
+            index.append(positions[key])
+
+        results = {
+            result.query_id: result for result in self._batch_retrieve(unique, fields)
+        }
         return [
-            BatchQueryResult.model_validate(result) for result in response["results"]
+            results[position].model_copy(update={"query_id": query_id})
+            for query_id, position in enumerate(index)
+            if position in results
         ]
 
+    def _batch_retrieve(
+        self, queries: List[Dict], fields: Optional[Tuple[str, ...]] = None
+    ) -> List[Any]:
+        model: Any = BatchResponse
+        item: Any = BatchQueryResult
+        body: Dict[str, Any] = {"queries": queries}
+        if fields is not None:
+            projected = projection(fields)
+            model, item = projected.batch_response, projected.batch_result
+            body["fields"] = list(fields)
+        results = self._request_model(
+            model,
+            "POST",
+            "/v1/retrieve/batch",
+            items=("results", item),
+            json=body,
+        ).results
+        if self.identity_map is not None and fields is None:
+            for result in results:
+                self.identity_map.intern_all(result.documents)
+        if self.usage_meter is not None:
+            for result in results:
+                query = (
+                    queries[result.query_id] if result.query_id < len(queries) else {}
+                )
+                self.usage_meter.record(query.get("sources", []), result.documents)
+            self.usage_meter.maybe_reconcile(self.get_usage)
+        if self.metrics is not None:
+            self.metrics.inc(
+                "tatry_documents_returned_total",
+                sum(len(result.documents) for result in results),
+                (("endpoint", "/v1/retrieve/batch"),),
+            )
+        return results
+
     def validate_api_key(self) -> ValidateResponse:
-        response = self._request("POST", "/v1/auth/validate")
-        return ValidateResponse.model_validate(response)
+        return self._request_model(ValidateResponse, "POST", "/v1/auth/validate")
 
     def list_sources(self) -> List[Source]:
         response = self._request("GET", "/v1/sources")
         return [Source.model_validate(source) for source in response["data"]["sources"]]
 
     def get_source(self, source_id: str) -> Source:
+        if self.stale_cache is None:
+            return self._get_source(source_id)
+        return self.stale_cache.get_or_fetch(
+            ("source", source_id), partial(self._get_source, source_id)
+        )
+
+    def _get_source(self, source_id: str) -> Source:
         response = self._request("GET", f"/v1/sources/{source_id}")
         return Source.model_validate(response["data"])
 
@@ -63,9 +396,11 @@ class TatryImplementation(TatryClient):
             "description": description,
             "metadata": metadata or {},
         }
-        response = self._request("POST", "/v1/feedback", json=data)
-        return FeedbackResponse.model_validate(response)
+        return self._request_model(FeedbackResponse, "POST", "/v1/feedback", json=data)
 
     def check_health(self) -> HealthResponse:
-        response = self._request("GET", "/v1/health")
-        return HealthResponse.model_validate(response)
+        return self._request_model(HealthResponse, "GET", "/v1/health")
+
+    def get_usage(self, month: Optional[str] = None) -> UsageResponse:
+        params = {"month": month} if month is not None else None
+        return self._request_model(UsageResponse, "GET", "/v1/usage", params=params)
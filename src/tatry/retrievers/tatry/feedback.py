@@ -0,0 +1,253 @@
+import atexit
+import logging
+import os
+import threading
+import time
+import weakref
+from collections import deque
+from typing import Callable, Deque, Dict, List, Optional
+
+from ...exceptions import RetrieverConfigError, RetrieverError
+from ...models.utils import FeedbackRequest
+from ..base import BaseRetriever
+
+logger = logging.getLogger(__name__)
+
+OVERFLOW_POLICIES = ("block", "drop_newest", "drop_oldest")
+
+# Seconds an idle worker thread waits for feedback before exiting. A new one
+# is started by the next ``submit``.
+IDLE_TIMEOUT = 30.0
+
+
+class FeedbackQueue:
+    """
+    Fire-and-forget sink that submits feedback from a background thread.
+
+    ``submit`` only validates the payload and appends it to a bounded
+    in-memory queue. A worker thread drains the queue in batches and sends
+    each item through the client, reusing its pooled connection. Pending
+    feedback is flushed when the interpreter exits.
+    """
+
+    # Set by ``_reset``.
+    _queue: Deque[FeedbackRequest]
+    _worker: Optional[threading.Thread]
+
+    def __init__(
+        self,
+        client: BaseRetriever,
+        maxsize: int = 1000,
+        batch_size: int = 50,
+        flush_interval: float = 1.0,
+        overflow: str = "drop_oldest",
+    ) -> None:
+        """
+        Initialize the queue.
+
+        Args:
+            client: Retriever used to submit feedback
+            maxsize: Maximum number of queued payloads
+            batch_size: Maximum number of payloads drained per batch
+            flush_interval: Seconds the worker waits for a batch to fill up
+            overflow: What to do when the queue is full: "block" the caller,
+                "drop_newest" (reject the new payload) or "drop_oldest"
+        """
+        if overflow not in OVERFLOW_POLICIES:
+            raise RetrieverConfigError(
+                f"overflow must be one of {', '.join(OVERFLOW_POLICIES)}"
+            )
+        if maxsize < 1 or batch_size < 1:
+            raise RetrieverConfigError("maxsize and batch_size must be positive")
+
+        self.client = client
+        self.maxsize = maxsize
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.overflow = overflow
+
+        self.sent = 0
+        self.failed = 0
+        self.dropped = 0
+
+        self._closed = False
+        self._reset()
+        # Held weakly, so that the exit hook does not keep the queue alive.
+        self._close_at_exit: Callable[[], None] = _close_at_exit(weakref.ref(self))
+        atexit.register(self._close_at_exit)
+
+    def submit(
+        self,
+        feedback_type: str,
+        description: str,
+        metadata: Optional[Dict] = None,
+        timeout: Optional[float] = None,
+    ) -> bool:
+        """
+        Queue feedback for background submission.
+
+        Args:
+            feedback_type: Feedback type, as for ``submit_feedback``
+            description: Feedback description
+            metadata: Optional feedback metadata
+            timeout: With the "block" policy, maximum seconds to wait for room
+
+        Returns:
+            True if the payload was queued, False if it was dropped because
+            the queue was full or already closed
+        """
+        return self.put(
+            FeedbackRequest(
+                type=feedback_type, description=description, metadata=metadata
+            ),
+            timeout=timeout,
+        )
+
+    def put(self, feedback: FeedbackRequest, timeout: Optional[float] = None) -> bool:
+        """Queue a feedback payload. See ``submit``."""
+        if self._pid != os.getpid():
+            self._reset()
+
+        with self._cond:
+            if self._closed:
+                self.dropped += 1
+                return False
+            if len(self._queue) >= self.maxsize:
+                if self.overflow == "drop_newest":
+                    self.dropped += 1
+                    return False
+                if self.overflow == "drop_oldest":
+                    self._queue.popleft()
+                    self._unfinished -= 1
+                    self.dropped += 1
+                elif (
+                    not self._cond.wait_for(
+                        lambda: len(self._queue) < self.maxsize or self._closed,
+                        timeout,
+                    )
+                    or self._closed
+                ):
+                    self.dropped += 1
+                    return False
+
+            self._queue.append(feedback)
+            self._unfinished += 1
+            if self._worker is None:
+                self._worker = threading.Thread(
+                    target=self._run, name="tatry-feedback", daemon=True
+                )
+                self._worker.start()
+            if len(self._queue) in (1, self.batch_size):
+                self._cond.notify_all()
+        return True
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """
+        Wait until every queued payload has been sent or has failed.
+
+        Returns:
+            True if the queue drained before the timeout
+        """
+        with self._cond:
+            self._flushing += 1
+            self._cond.notify_all()
+            try:
+                return self._cond.wait_for(lambda: self._unfinished == 0, timeout)
+            finally:
+                self._flushing -= 1
+
+    def close(self, timeout: Optional[float] = 10.0) -> bool:
+        """
+        Flush pending feedback and stop the worker thread.
+
+        Returns:
+            True if all pending feedback was sent before the timeout
+        """
+        atexit.unregister(self._close_at_exit)
+        if self._pid != os.getpid():
+            return True
+        drained = self.flush(timeout)
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+            worker = self._worker
+        if worker is not None:
+            worker.join(timeout)
+        return drained
+
+    def __len__(self) -> int:
+        return len(self._queue)
+
+    def _reset(self) -> None:
+        # Runs at init and in a forked child: the worker thread does not
+        # survive a fork and the parent remains responsible for its backlog.
+        self._pid = os.getpid()
+        self._cond = threading.Condition()
+        self._queue = deque()
+        self._unfinished = 0
+        self._flushing = 0
+        self._worker = None
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                deadline = None
+                while not self._closed:
+                    if not self._queue:
+                        deadline = None
+                        if not self._cond.wait(IDLE_TIMEOUT) and not self._queue:
+                            self._worker = None
+                            return
+                        continue
+                    now = time.monotonic()
+                    if deadline is None:
+                        deadline = now + self.flush_interval
+                    if (
+                        len(self._queue) >= self.batch_size
+                        or self._flushing
+                        or now >= deadline
+                    ):
+                        break
+                    self._cond.wait(deadline - now)
+                if self._closed and not self._queue:
+                    return
+                batch = self._take_batch()
+                self._cond.notify_all()
+
+            try:
+                self._send(batch)
+            finally:
+                with self._cond:
+                    self._unfinished -= len(batch)
+                    self._cond.notify_all()
+
+    def _take_batch(self) -> List[FeedbackRequest]:
+        count = min(self.batch_size, len(self._queue))
+        return [self._queue.popleft() for _ in range(count)]
+
+    def _send(self, batch: List[FeedbackRequest]) -> None:
+        # The API has no bulk feedback endpoint, so a batch is sent as
+        # back-to-back requests over the client's pooled connection.
+        for feedback in batch:
+            try:
+                self.client.submit_feedback(
+                    feedback.type, feedback.description, feedback.metadata
+                )
+                self.sent += 1
+            except RetrieverError:
+                self.failed += 1
+            except Exception:
+                # Anything else is a bug, but must not stop the worker.
+                self.failed += 1
+                logger.exception("Unexpected error while submitting feedback")
+
+
+def _close_at_exit(
+    queue: "weakref.ReferenceType[FeedbackQueue]",
+) -> Callable[[], None]:
+    def close() -> None:
+        alive = queue()
+        if alive is not None:
+            alive.close()
+
+    return close
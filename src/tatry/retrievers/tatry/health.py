@@ -0,0 +1,161 @@
+import logging
+import os
+import threading
+import time
+from typing import TYPE_CHECKING, Optional
+
+from ...exceptions import RetrieverAPIError, RetrieverError
+from ...models.utils import HealthResponse
+
+if TYPE_CHECKING:
+    from .client import TatryClient
+
+logger = logging.getLogger(__name__)
+
+HEALTHY = "healthy"
+UNHEALTHY = "unhealthy"
+UNKNOWN = "unknown"
+
+# Status values reported by /v1/health that mean the service is down.
+DOWN_STATUSES = frozenset({"unhealthy", "down", "error"})
+
+
+class HealthMonitor:
+    """
+    Background prober of ``/v1/health`` with a cheap in-memory state.
+
+    While the service is healthy the probe interval doubles after every
+    successful probe, up to ``max_interval``. After a failed probe, or when
+    a request reports a connection problem, the monitor probes again after
+    ``min_interval`` so outages and recoveries are noticed quickly. The
+    state only becomes unhealthy after ``failure_threshold`` consecutive
+    failed probes. Only connection errors, timeouts, 5xx responses and an
+    explicit down status count as failed; any other answer, including a 4xx
+    such as 401 or 429, shows that the service is up.
+    """
+
+    def __init__(
+        self,
+        client: "TatryClient",
+        min_interval: float = 1.0,
+        max_interval: float = 30.0,
+        failure_threshold: int = 2,
+        probe_timeout: float = 2.0,
+    ) -> None:
+        """
+        Initialize the monitor.
+
+        Args:
+            client: Client whose service is probed
+            min_interval: Shortest time between probes in seconds
+            max_interval: Longest time between probes in seconds
+            failure_threshold: Consecutive failed probes before the service
+                is considered unhealthy
+            probe_timeout: Timeout of a single probe in seconds
+        """
+        self.client = client
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.failure_threshold = failure_threshold
+        self.probe_timeout = probe_timeout
+
+        self.state = UNKNOWN
+        self.last_checked: Optional[float] = None
+        self.interval = min_interval
+        self._failures = 0
+        self._pid = os.getpid()
+        self._wake = threading.Event()
+        self._stopped = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def healthy(self) -> bool:
+        """False only while the service is known to be down."""
+        if self._pid != os.getpid() and self._thread is not None:
+            # Threads do not survive a fork: restart probing in the child.
+            self._pid = os.getpid()
+            self._thread = None
+            self.start()
+        return self.state != UNHEALTHY
+
+    def start(self) -> "HealthMonitor":
+        """Start probing in a daemon thread."""
+        if self._thread is None:
+            self._stopped.clear()
+            self._thread = threading.Thread(
+                target=self._run, name="tatry-health", daemon=True
+            )
+            self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        """Stop probing."""
+        self._stopped.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def report_failure(self) -> None:
+        """Signal a failed request so the next probe happens right away."""
+        self._wake.set()
+
+    def probe(self) -> bool:
+        """
+        Probe the service once and update the state.
+
+        Returns:
+            True if the service responded as healthy
+        """
+        try:
+            response = self.client._attempt(
+                lambda r: HealthResponse.model_validate_json(r.content),
+                "GET",
+                "/v1/health",
+                time.monotonic() + self.probe_timeout,
+            )
+            ok = response.data.get("status", response.status) not in DOWN_STATUSES
+        except RetrieverError as e:
+            ok = not _is_outage(e)
+
+        self.last_checked = time.monotonic()
+        if ok:
+            self._failures = 0
+            self.interval = (
+                min(self.interval * 2, self.max_interval)
+                if self.state == HEALTHY
+                else self.min_interval
+            )
+            self.state = HEALTHY
+        else:
+            self._failures += 1
+            self.interval = self.min_interval
+            if self._failures >= self.failure_threshold:
+                self.state = UNHEALTHY
+        return ok
+
+    def _run(self) -> None:
+        while not self._stopped.is_set():
+            try:
+                self.probe()
+            except Exception:
+                # A bug in probing must not silently end monitoring.
+                logger.exception("Health probe failed unexpectedly")
+                self.interval = self.min_interval
+                self.last_checked = time.monotonic()
+            self._wake.clear()
+            if self._stopped.is_set():
+                break
+            self._wake.wait(self.interval)
+            # Early wake-ups still keep probes min_interval apart.
+            elapsed = time.monotonic() - (self.last_checked or 0.0)
+            if elapsed < self.min_interval:
+                self._stopped.wait(self.min_interval - elapsed)
+
+
+def _is_outage(error: RetrieverError) -> bool:
+    """Whether a failed probe means the service is down."""
+    if isinstance(error, RetrieverAPIError):
+        status = error.status_code
+        return status is None or status >= 500
+    return True
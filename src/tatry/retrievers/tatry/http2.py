@@ -0,0 +1,300 @@
+import asyncio
+import os
+import ssl
+import threading
+from contextlib import contextmanager
+from typing import (
+    Any,
+    AsyncIterator,
+    Coroutine,
+    Dict,
+    Iterator,
+    NamedTuple,
+    Optional,
+    Tuple,
+    TypeVar,
+    Union,
+)
+
+import requests
+from requests.adapters import BaseAdapter
+from requests.structures import CaseInsensitiveDict
+from requests.utils import select_proxy
+
+try:
+    import httpx
+except ImportError:  # pragma: no cover - exercised without the extra
+    httpx = None  # type: ignore[assignment]
+
+T = TypeVar("T")
+
+
+@contextmanager
+def _translate_errors(request: requests.PreparedRequest) -> Iterator[None]:
+    """Re-raise httpx errors as the requests exceptions the client handles."""
+    try:
+        yield
+    except httpx.ConnectTimeout as e:
+        raise requests.exceptions.ConnectTimeout(e, request=request)
+    except httpx.TimeoutException as e:
+        raise requests.exceptions.ReadTimeout(e, request=request)
+    except httpx.TransportError as e:
+        raise requests.exceptions.ConnectionError(e, request=request)
+    except httpx.HTTPError as e:
+        raise requests.exceptions.RequestException(e, request=request)
+
+
+class _StreamedBody:
+    """File-like ``Response.raw`` pulling an httpx body from the loop thread."""
+
+    def __init__(
+        self,
+        adapter: "HTTP2Adapter",
+        response: "httpx.Response",
+        request: requests.PreparedRequest,
+    ) -> None:
+        self._adapter = adapter
+        self._response = response
+        self._request = request
+        self._chunks = response.aiter_bytes()
+        # Received bytes not yet returned by read().
+        self._buffer = b""
+
+    def stream(
+        self, chunk_size: Optional[int] = None, decode_content: bool = True
+    ) -> Iterator[bytes]:
+        while True:
+            chunk = self.read(chunk_size) if chunk_size else self._next()
+            if not chunk:
+                return
+            yield chunk
+
+    def read(self, amt: Optional[int] = None, decode_content: bool = True) -> bytes:
+        parts = [self._buffer]
+        size = len(self._buffer)
+        self._buffer = b""
+        while amt is None or size < amt:
+            chunk = self._next()
+            if chunk is None:
+                break
+            parts.append(chunk)
+            size += len(chunk)
+        data = b"".join(parts)
+        if amt is None:
+            return data
+        self._buffer = data[amt:]
+        return data[:amt]
+
+    def _next(self) -> Optional[bytes]:
+        if self._buffer:
+            chunk, self._buffer = self._buffer, b""
+            return chunk
+        with _translate_errors(self._request):
+            return self._adapter._call(_next_chunk(self._chunks))
+
+    def close(self) -> None:
+        self._adapter._call(self._response.aclose())
+
+    def release_conn(self) -> None:
+        self.close()
+
+
+class _ClientKey(NamedTuple):
+    """Connection settings of one httpx client."""
+
+    cleartext: bool
+    verify: Union[bool, str]
+    cert: Union[None, str, Tuple[str, str]]
+    proxy: Optional[str]
+
+
+async def _next_chunk(chunks: AsyncIterator[bytes]) -> Optional[bytes]:
+    try:
+        return await chunks.__anext__()
+    except StopAsyncIteration:
+        return None
+
+
+class HTTP2Adapter(BaseAdapter):
+    """
+    Transport adapter multiplexing requests over HTTP/2 connections.
+
+    Requests are sent through an ``httpx`` async client with HTTP/2 enabled,
+    running on one event loop in a daemon thread, so many concurrent calls
+    from any number of threads share one connection per host instead of one
+    connection each. Plain ``http://`` URLs use HTTP/2 with prior knowledge
+    (h2c), ``https://`` URLs negotiate HTTP/2 via ALPN and fall back to
+    HTTP/1.1. The ``verify``, ``cert`` and ``proxies`` settings that
+    ``requests`` resolves for each request, including those from the
+    environment, are honoured; each distinct combination gets its own
+    client. Requires the ``http2`` extra: ``pip install tatry[http2]``.
+    """
+
+    def __init__(self, max_connections: int = 1, verify: bool = True) -> None:
+        """
+        Initialize the adapter.
+
+        Args:
+            max_connections: Connections kept per host; each carries many
+                concurrent streams
+            verify: Whether to verify TLS certificates; if False, this
+                overrides the ``verify`` setting of each request
+        """
+        if httpx is None:
+            raise ImportError(
+                "HTTP/2 support is not installed. "
+                "Please install it with `pip install tatry[http2]`."
+            )
+        super().__init__()
+        self.max_connections = max_connections
+        self.verify = verify
+        self._lock = threading.Lock()
+        self._pid = os.getpid()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        # Only touched from the loop thread.
+        self._clients: Dict[_ClientKey, "httpx.AsyncClient"] = {}
+
+    def _ensure_loop(self) -> asyncio.AbstractEventLoop:
+        with self._lock:
+            if self._pid != os.getpid():
+                # Neither the loop thread nor its connections survive a fork.
+                self._pid = os.getpid()
+                self._loop = None
+                self._clients = {}
+            if self._loop is None:
+                self._loop = asyncio.new_event_loop()
+                threading.Thread(
+                    target=self._loop.run_forever, name="tatry-http2", daemon=True
+                ).start()
+            return self._loop
+
+    def _call(self, coro: Coroutine[Any, Any, T]) -> T:
+        """Run a coroutine on the loop thread and wait for its result."""
+        return asyncio.run_coroutine_threadsafe(coro, self._ensure_loop()).result()
+
+    def _client(self, key: _ClientKey) -> "httpx.AsyncClient":
+        client = self._clients.get(key)
+        if client is None:
+            client = self._clients[key] = httpx.AsyncClient(
+                http1=not key.cleartext,
+                http2=True,
+                verify=_ssl_context(key.verify, key.cert),
+                proxy=key.proxy,
+                # requests has already applied the environment's settings.
+                trust_env=False,
+                limits=httpx.Limits(
+                    max_connections=self.max_connections,
+                    max_keepalive_connections=self.max_connections,
+                ),
+            )
+        return client
+
+    async def _send(
+        self,
+        request: requests.PreparedRequest,
+        stream: bool,
+        timeout: "httpx.Timeout",
+        key: _ClientKey,
+    ) -> "httpx.Response":
+        url = request.url or ""
+        client = self._client(key)
+        outgoing = client.build_request(
+            request.method or "GET",
+            url,
+            headers={
+                name: value if isinstance(value, str) else value.decode("latin-1")
+                for name, value in request.headers.items()
+            },
+            content=_content(request.body),
+            timeout=timeout,
+        )
+        incoming = await client.send(outgoing, stream=stream)
+        if not stream:
+            await incoming.aread()
+        return incoming
+
+    def send(
+        self,
+        request: requests.PreparedRequest,
+        stream: bool = False,
+        timeout: Union[None, float, Tuple[Optional[float], Optional[float]]] = None,
+        verify: Union[bool, str] = True,
+        cert: Union[None, str, Tuple[str, str]] = None,
+        proxies: Optional[Dict[str, str]] = None,
+    ) -> requests.Response:
+        url = request.url or ""
+        key = _ClientKey(
+            cleartext=url.startswith("http://"),
+            verify=verify if self.verify else False,
+            cert=cert,
+            proxy=select_proxy(url, proxies or {}),
+        )
+        with _translate_errors(request):
+            incoming = self._call(self._send(request, stream, _timeout(timeout), key))
+
+        response = requests.Response()
+        response.status_code = incoming.status_code
+        response.reason = incoming.reason_phrase
+        # httpx has already decoded any content encoding.
+        response.headers = CaseInsensitiveDict(
+            (k, v) for k, v in incoming.headers.items() if k != "content-encoding"
+        )
+        response.url = request.url or ""
+        response.request = request
+        response.encoding = incoming.encoding
+        if stream:
+            response.raw = _StreamedBody(self, incoming, request)
+        else:
+            response._content = incoming.content
+            response._content_consumed = True  # type: ignore[attr-defined]
+        return response
+
+    def close(self) -> None:
+        with self._lock:
+            loop, self._loop = self._loop, None
+        if loop is None or self._pid != os.getpid():
+            return
+        clients, self._clients = list(self._clients.values()), {}
+        for client in clients:
+            asyncio.run_coroutine_threadsafe(client.aclose(), loop).result()
+        loop.call_soon_threadsafe(loop.stop)
+
+
+def _content(body: Any) -> Optional[bytes]:
+    if isinstance(body, str):
+        return body.encode("utf-8")
+    if body is None or isinstance(body, bytes):
+        return body
+    raise ValueError("HTTP2Adapter only sends request bodies held in memory")
+
+
+def _ssl_context(
+    verify: Union[bool, str], cert: Union[None, str, Tuple[str, str]]
+) -> Union[bool, ssl.SSLContext]:
+    """TLS settings for httpx from the requests ``verify`` and ``cert``."""
+    if cert is None and isinstance(verify, bool):
+        return verify
+    if verify is False:
+        context = ssl.create_default_context()
+        context.check_hostname = False
+        context.verify_mode = ssl.CERT_NONE
+    elif verify is True:
+        context = ssl.create_default_context(cafile=requests.certs.where())
+    elif os.path.isdir(verify):
+        context = ssl.create_default_context(capath=verify)
+    else:
+        context = ssl.create_default_context(cafile=verify)
+    if isinstance(cert, tuple):
+        context.load_cert_chain(*cert)
+    elif cert is not None:
+        context.load_cert_chain(cert)
+    return context
+
+
+def _timeout(
+    timeout: Union[None, float, Tuple[Optional[float], Optional[float]]],
+) -> "httpx.Timeout":
+    if isinstance(timeout, tuple):
+        connect, read = timeout
+        return httpx.Timeout(read, connect=connect)
+    return httpx.Timeout(timeout)
@@ -0,0 +1,94 @@
+import sys
+import threading
+import weakref
+from functools import partial
+from typing import Dict, Iterable, Tuple
+
+from ...models.retrieve import Document, DocumentMetadata
+
+_Entry = Tuple["weakref.ref[DocumentMetadata]", str]
+
+
+class DocumentIdentityMap:
+    """
+    Shares content and metadata between copies of the same document.
+
+    Popular documents come back in many responses, each parse producing
+    its own copy of the content string. Documents passed through the map
+    are keyed by ``id``. When a document's content and metadata equal the
+    ones already seen for that ID, it is pointed at the first instances
+    and its own copies can be freed. Relevance scores stay per document.
+
+    Entries are held weakly through the shared metadata instance, so an ID
+    is forgotten once no document using its content is alive. ``shared``
+    counts the documents re-pointed and ``bytes_saved`` the size of the
+    copies they released.
+    """
+
+    def __init__(self) -> None:
+        self.documents = 0
+        self.shared = 0
+        self.bytes_saved = 0
+        self._entries: Dict[str, _Entry] = {}
+        self._lock = threading.Lock()
+
+    def intern(self, document: Document) -> Document:
+        """
+        Point a document at the shared content and metadata for its ID.
+
+        Args:
+            document: Parsed document, modified in place
+
+        Returns:
+            The same document
+        """
+        key = document.id
+        with self._lock:
+            self.documents += 1
+            entry = self._entries.get(key)
+            if entry is not None:
+                metadata, content = entry[0](), entry[1]
+                if (
+                    metadata is not None
+                    and content == document.content
+                    and metadata == document.metadata
+                ):
+                    if document.metadata is not metadata:
+                        self.shared += 1
+                        self.bytes_saved += _size(document)
+                        # Same values, so validation can be skipped.
+                        document.__dict__["content"] = content
+                        document.__dict__["metadata"] = metadata
+                    return document
+
+            # A new ID, or changed content: this document becomes the one
+            # later copies share.
+            ref = weakref.ref(document.metadata, partial(self._expire, key))
+            self._entries[key] = (ref, document.content)
+        return document
+
+    def intern_all(self, documents: Iterable[Document]) -> None:
+        """Intern every document of a response."""
+        for document in documents:
+            self.intern(document)
+
+    def _expire(self, key: str, ref: "weakref.ref[DocumentMetadata]") -> None:
+        # Runs from the garbage collector, possibly while this thread holds
+        # the lock, so it only uses atomic dict operations.
+        entry = self._entries.get(key)
+        if entry is not None and entry[0] is ref:
+            self._entries.pop(key, None)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+def _size(document: Document) -> int:
+    """Bytes held by a document's own content and metadata copies."""
+    metadata = document.metadata
+    return (
+        sys.getsizeof(document.content)
+        + sys.getsizeof(metadata)
+        + sys.getsizeof(metadata.__dict__)
+        + sum(sys.getsizeof(value) for value in metadata.__dict__.values())
+    )
@@ -0,0 +1,298 @@
+import threading
+import weakref
+from bisect import bisect_left
+from collections import defaultdict
+from typing import (
+    Callable,
+    DefaultDict,
+    Dict,
+    Iterable,
+    List,
+    NamedTuple,
+    Optional,
+    Sequence,
+    Tuple,
+)
+
+Labels = Tuple[Tuple[str, str], ...]
+
+# Prometheus' default latency buckets, in seconds.
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Type and help text of the metrics the client records.
+METRICS: Dict[str, Tuple[str, str]] = {
+    "tatry_requests_total": ("counter", "API request attempts by outcome."),
+    "tatry_request_duration_seconds": (
+        "histogram",
+        "Latency of API request attempts in seconds.",
+    ),
+    "tatry_requests_in_flight": ("gauge", "API requests currently in flight."),
+    "tatry_retries_total": ("counter", "Retries after failed attempts."),
+    "tatry_timeouts_total": ("counter", "Request attempts that timed out."),
+    "tatry_request_bytes_total": ("counter", "Request body bytes sent."),
+    "tatry_response_bytes_total": ("counter", "Response body bytes received."),
+    "tatry_documents_returned_total": ("counter", "Documents returned by the API."),
+    "tatry_cache_lookups_total": ("counter", "Result cache lookups by result."),
+    "tatry_cache_hit_ratio": (
+        "gauge",
+        "Share of result cache lookups answered from the cache.",
+    ),
+    "tatry_pool_connections_in_use": (
+        "gauge",
+        "Pooled HTTP connections checked out.",
+    ),
+    "tatry_pool_connections_max": ("gauge", "Capacity of the HTTP connection pools."),
+    "tatry_pool_utilization": ("gauge", "Share of pooled connections in use."),
+    "tatry_concurrency_limit": (
+        "gauge",
+        "Current limit of the adaptive concurrency limiter.",
+    ),
+    "tatry_concurrency_in_flight": (
+        "gauge",
+        "Requests holding a slot of the adaptive concurrency limiter.",
+    ),
+}
+
+
+class Sample(NamedTuple):
+    """One value produced by a collector at export time."""
+
+    name: str
+    labels: Labels
+    value: float
+
+
+Collector = Callable[[], Iterable[Sample]]
+
+
+class _Histogram:
+    __slots__ = ("counts", "sum")
+
+    def __init__(self, size: int) -> None:
+        # Per-bucket counts, the last one for values above every bound.
+        self.counts = [0] * size
+        self.sum = 0.0
+
+
+class _Shard:
+    """Metrics written by one thread."""
+
+    __slots__ = ("owner", "counters", "histograms")
+
+    def __init__(self, owner: Optional[threading.Thread] = None) -> None:
+        # The writing thread, or None for the shard of finished threads.
+        self.owner = weakref.ref(owner) if owner is not None else None
+        self.counters: DefaultDict[Tuple[str, Labels], float] = defaultdict(float)
+        self.histograms: Dict[Tuple[str, Labels], _Histogram] = {}
+
+    def alive(self) -> bool:
+        if self.owner is None:
+            return True
+        thread = self.owner()
+        return thread is not None and thread.is_alive()
+
+    def add(self, other: "_Shard", size: int) -> None:
+        """Add the values of ``other``, whose histograms have ``size`` buckets."""
+        # dict.copy() does not release the GIL, so it is consistent even
+        # while the owning thread records.
+        for key, value in other.counters.copy().items():
+            self.counters[key] += value
+        for key, histogram in other.histograms.copy().items():
+            total = self.histograms.get(key)
+            if total is None:
+                total = self.histograms[key] = _Histogram(size)
+            for i, count in enumerate(list(histogram.counts)):
+                total.counts[i] += count
+            total.sum += histogram.sum
+
+
+class MetricsRegistry:
+    """
+    In-process counters and histograms with Prometheus text export.
+
+    Every thread writes to its own shard, so recording takes no lock and
+    never contends with other threads. Shards are summed when the metrics
+    are read, and the shards of finished threads are folded into one.
+    Histograms use fixed buckets. Values that are cheap to read on demand,
+    such as cache statistics and pool usage, come from collectors called at
+    export time instead of being recorded per request. Collectors export
+    additive values only and ratios are computed from the sums, so several
+    clients can share a registry.
+    """
+
+    def __init__(self, buckets: Sequence[float] = DEFAULT_BUCKETS) -> None:
+        """
+        Initialize the registry.
+
+        Args:
+            buckets: Upper bounds of the histogram buckets, ascending
+        """
+        self.buckets = tuple(sorted(buckets))
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._finished = _Shard()
+        self._shards: List[_Shard] = [self._finished]
+        self._collectors: List[Callable[[], Optional[Collector]]] = []
+
+    def _shard(self) -> _Shard:
+        shard: Optional[_Shard] = getattr(self._local, "shard", None)
+        if shard is None:
+            shard = self._local.shard = _Shard(threading.current_thread())
+            with self._lock:
+                self._fold_finished()
+                self._shards.append(shard)
+        return shard
+
+    def _fold_finished(self) -> None:
+        """Merge the shards of finished threads; called with the lock held."""
+        live = []
+        for shard in self._shards:
+            if shard.alive():
+                live.append(shard)
+            else:
+                self._finished.add(shard, len(self.buckets) + 1)
+        self._shards = live
+
+    def inc(self, name: str, value: float = 1.0, labels: Labels = ()) -> None:
+        """Add ``value`` to a counter, or to a gauge when negative."""
+        self._shard().counters[(name, labels)] += value
+
+    def observe(self, name: str, value: float, labels: Labels = ()) -> None:
+        """Record one histogram observation."""
+        histograms = self._shard().histograms
+        histogram = histograms.get((name, labels))
+        if histogram is None:
+            histogram = histograms[(name, labels)] = _Histogram(len(self.buckets) + 1)
+        histogram.counts[bisect_left(self.buckets, value)] += 1
+        histogram.sum += value
+
+    def register(self, collector: Collector) -> None:
+        """
+        Add a function producing samples at export time.
+
+        A bound method is held weakly, so registering a client's collector
+        does not keep the client alive; it is dropped once the client is.
+        """
+        ref: Callable[[], Optional[Collector]]
+        if hasattr(collector, "__self__") and hasattr(collector, "__func__"):
+            ref = weakref.WeakMethod(collector)
+        else:
+            ref = _strong(collector)
+        with self._lock:
+            self._collectors.append(ref)
+
+    def snapshot(
+        self,
+    ) -> Tuple[Dict[Tuple[str, Labels], float], Dict[Tuple[str, Labels], _Histogram]]:
+        """
+        Sum all shards, run the collectors and derive the ratios.
+
+        Returns:
+            Counter and gauge values, and histograms, by name and labels
+        """
+        total = _Shard()
+        with self._lock:
+            # Summed under the lock so that no shard is folded meanwhile and
+            # counted twice.
+            self._fold_finished()
+            for shard in self._shards:
+                total.add(shard, len(self.buckets) + 1)
+            collectors = []
+            for ref in self._collectors:
+                collector = ref()
+                if collector is not None:
+                    collectors.append(collector)
+            if len(collectors) < len(self._collectors):
+                self._collectors = [ref for ref in self._collectors if ref()]
+
+        counters = total.counters
+        for collector in collectors:
+            for sample in collector():
+                counters[(sample.name, sample.labels)] += sample.value
+        _derive_ratios(counters)
+        return dict(counters), total.histograms
+
+    def value(self, name: str, **labels: str) -> float:
+        """Current value of a counter or gauge, summed over unlisted labels."""
+        counters, _ = self.snapshot()
+        return sum(
+            value
+            for (metric, metric_labels), value in counters.items()
+            if metric == name and set(labels.items()) <= set(metric_labels)
+        )
+
+    def export(self) -> str:
+        """Render all metrics in the Prometheus text exposition format."""
+        counters, histograms = self.snapshot()
+        families: DefaultDict[str, List[str]] = defaultdict(list)
+
+        for (name, labels), value in sorted(counters.items()):
+            families[name].append(f"{name}{_format_labels(labels)} {_number(value)}")
+        for (name, labels), histogram in sorted(histograms.items()):
+            lines = families[name]
+            cumulative = 0
+            bounds = [_number(b) for b in self.buckets] + ["+Inf"]
+            for bound, count in zip(bounds, histogram.counts):
+                cumulative += count
+                bucket_labels = _format_labels(labels + (("le", bound),))
+                lines.append(f"{name}_bucket{bucket_labels} {cumulative}")
+            lines.append(f"{name}_sum{_format_labels(labels)} {_number(histogram.sum)}")
+            lines.append(f"{name}_count{_format_labels(labels)} {cumulative}")
+
+        output = []
+        for name in sorted(families):
+            kind, description = METRICS.get(name, ("untyped", ""))
+            if description:
+                output.append(f"# HELP {name} {description}")
+            output.append(f"# TYPE {name} {kind}")
+            output.extend(families[name])
+        return "\n".join(output) + "\n" if output else ""
+
+
+def _strong(collector: Collector) -> Callable[[], Collector]:
+    return lambda: collector
+
+
+def _derive_ratios(counters: DefaultDict[Tuple[str, Labels], float]) -> None:
+    """Add the ratio gauges, computed from values summed over all clients."""
+    lookups: DefaultDict[Labels, float] = defaultdict(float)
+    hits: DefaultDict[Labels, float] = defaultdict(float)
+    for (name, labels), value in list(counters.items()):
+        if name == "tatry_cache_lookups_total":
+            cache = tuple(label for label in labels if label[0] != "result")
+            lookups[cache] += value
+            if ("result", "miss") not in labels:
+                hits[cache] += value
+    for cache, count in lookups.items():
+        counters[("tatry_cache_hit_ratio", cache)] = (
+            hits[cache] / count if count else 0.0
+        )
+
+    capacity = counters.get(("tatry_pool_connections_max", ()))
+    if capacity is not None:
+        in_use = counters.get(("tatry_pool_connections_in_use", ()), 0.0)
+        counters[("tatry_pool_utilization", ())] = (
+            in_use / capacity if capacity else 0.0
+        )
+
+
+def endpoint_label(path: str) -> str:
+    """API path with identifiers replaced, to keep label cardinality bounded."""
+    if path.startswith("/v1/sources/"):
+        return "/v1/sources/{id}"
+    return path
+
+
+def _format_labels(labels: Labels) -> str:
+    if not labels:
+        return ""
+    pairs = ",".join(f'{key}="{_escape(value)}"' for key, value in labels)
+    return f"{{{pairs}}}"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _number(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
@@ -0,0 +1,181 @@
+import json
+import unicodedata
+from dataclasses import dataclass, field
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    List,
+    NamedTuple,
+    Optional,
+    Sequence,
+    Tuple,
+)
+
+Normalizer = Callable[[str], str]
+
+
+def unicode_nfkc(query: str) -> str:
+    """Fold compatibility characters, e.g. full-width letters and ligatures."""
+    return unicodedata.normalize("NFKC", query)
+
+
+def lowercase(query: str) -> str:
+    """Case-fold the query."""
+    return query.casefold()
+
+
+def strip_punctuation(query: str) -> str:
+    """Replace punctuation with spaces."""
+    return "".join(
+        " " if unicodedata.category(char).startswith("P") else char for char in query
+    )
+
+
+def collapse_whitespace(query: str) -> str:
+    """Trim the query and collapse runs of whitespace to one space."""
+    return " ".join(query.split())
+
+
+DEFAULT_NORMALIZERS: Tuple[Normalizer, ...] = (
+    unicode_nfkc,
+    lowercase,
+    strip_punctuation,
+    collapse_whitespace,
+)
+
+
+class CanonicalQuery(NamedTuple):
+    """Normalized, hashable form of a retrieve request."""
+
+    query: str
+    sources: Tuple[str, ...]
+    max_results: Optional[int]
+    min_score: Optional[float]
+    # Any other request fields, as sorted JSON.
+    extra: str = ""
+
+
+class QueryCanonicalizer:
+    """
+    Canonicalization stage in front of ``retrieve`` and ``batch_retrieve``.
+
+    Query text goes through a chain of normalizers and the source list is
+    de-duplicated and sorted, so trivially different requests share one
+    ``CanonicalQuery``. That value is used as the cache key and to
+    de-duplicate queries within a batch; requests are still sent as written.
+    """
+
+    def __init__(
+        self,
+        normalizers: Sequence[Normalizer] = DEFAULT_NORMALIZERS,
+        sort_sources: bool = True,
+    ) -> None:
+        """
+        Initialize the canonicalizer.
+
+        Args:
+            normalizers: Callables applied to the query text in order
+            sort_sources: Whether source order is irrelevant
+        """
+        self.normalizers = tuple(normalizers)
+        self.sort_sources = sort_sources
+
+    def normalize(self, query: str) -> str:
+        """Apply the normalizer chain to query text."""
+        for normalizer in self.normalizers:
+            query = normalizer(query)
+        return query
+
+    def canonicalize(
+        self,
+        query: str,
+        max_results: Optional[int] = None,
+        sources: Iterable[str] = (),
+        min_score: Optional[float] = None,
+    ) -> CanonicalQuery:
+        """Return the canonical form of a retrieve request."""
+        if self.sort_sources:
+            source_key = tuple(sorted(set(sources)))
+        else:
+            source_key = tuple(dict.fromkeys(sources))
+        return CanonicalQuery(self.normalize(query), source_key, max_results, min_score)
+
+    def canonicalize_request(self, request: Dict[str, Any]) -> CanonicalQuery:
+        """Return the canonical form of a ``batch_retrieve`` query dict."""
+        extra = {
+            key: value
+            for key, value in request.items()
+            if key not in ("query", "sources", "max_results", "min_score")
+        }
+        return self.canonicalize(
+            request["query"],
+            request.get("max_results"),
+            request.get("sources") or (),
+            request.get("min_score"),
+        )._replace(extra=json.dumps(extra, sort_keys=True) if extra else "")
+
+
+@dataclass
+class HitRateReport:
+    """Repeat rates of a query log with and without normalization."""
+
+    total: int
+    raw_hit_rate: float
+    normalized_hit_rate: float
+    # Cumulative hit rate after each stage: source canonicalization first,
+    # then each normalizer by name.
+    by_normalizer: List[Tuple[str, float]] = field(default_factory=list)
+
+    @property
+    def improvement(self) -> float:
+        """Absolute hit rate gained by normalization."""
+        return self.normalized_hit_rate - self.raw_hit_rate
+
+
+def measure_hit_rate(
+    queries: Iterable[Dict[str, Any]], canonicalizer: QueryCanonicalizer
+) -> HitRateReport:
+    """
+    Measure how much canonicalization raises the hit rate of a query log.
+
+    The hit rate is the share of requests an ideal, unbounded cache would
+    serve because an equivalent request was seen before.
+
+    Args:
+        queries: ``retrieve`` argument dicts, e.g. parsed from a JSONL log
+        canonicalizer: Canonicalizer to evaluate
+
+    Returns:
+        A report with the raw, normalized and per-normalizer hit rates
+    """
+    stages = [
+        QueryCanonicalizer(canonicalizer.normalizers[:i], canonicalizer.sort_sources)
+        for i in range(len(canonicalizer.normalizers) + 1)
+    ]
+    names = ["sources"] + [
+        getattr(normalizer, "__name__", repr(normalizer))
+        for normalizer in canonicalizer.normalizers
+    ]
+    raw_keys = set()
+    stage_keys: List[set] = [set() for _ in stages]
+    total = 0
+    for request in queries:
+        total += 1
+        raw_keys.add(json.dumps(request, sort_keys=True))
+        for keys, stage in zip(stage_keys, stages):
+            keys.add(stage.canonicalize_request(request))
+
+    def hit_rate(unique: int) -> float:
+        return 1 - unique / total if total else 0.0
+
+    by_normalizer = [
+        (name, hit_rate(len(keys))) for name, keys in zip(names, stage_keys)
+    ]
+    return HitRateReport(
+        total=total,
+        raw_hit_rate=hit_rate(len(raw_keys)),
+        normalized_hit_rate=by_normalizer[-1][1],
+        by_normalizer=by_normalizer,
+    )
@@ -0,0 +1,161 @@
+import contextvars
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from itertools import islice
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Deque,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Set,
+    Tuple,
+    Union,
+)
+
+from ...exceptions import RetrieverError
+from ...models.retrieve import Document
+from .scheduling import BULK, current_priority, priority
+
+if TYPE_CHECKING:
+    from .endpoints import TatryImplementation
+
+# Batches submitted ahead of the consumer per worker.
+QUEUE_DEPTH = 2
+
+
+@dataclass(frozen=True)
+class RetrievalResult:
+    """Outcome of one query pushed through ``retrieve_many``."""
+
+    # Position of the query in the input.
+    index: int
+    request: Dict[str, Any]
+    documents: Optional[List[Document]]
+    error: Optional[Exception]
+    # Seconds the API call carrying this query took.
+    latency: float
+
+
+def retrieve_many(
+    client: "TatryImplementation",
+    queries: Iterable[Union[str, Dict[str, Any]]],
+    batch_size: int = 20,
+    concurrency: int = 4,
+    ordered: bool = True,
+    return_exceptions: bool = False,
+    start: int = 0,
+) -> Iterator[RetrievalResult]:
+    """
+    Push an iterable of queries through the API lazily.
+
+    Queries are grouped into ``batch_retrieve`` calls of ``batch_size``
+    (plain ``retrieve`` calls when ``batch_size`` is 1) that run on
+    ``concurrency`` worker threads. Input is only pulled while fewer than
+    ``concurrency * QUEUE_DEPTH`` batches are in flight or waiting to be
+    consumed, so memory stays flat for inputs of any length and a slow
+    consumer slows down the input. Deadlines and priorities active in the
+    calling context apply to every call.
+
+    Args:
+        client: Client making the calls
+        queries: Query strings or ``batch_retrieve`` request dicts
+        batch_size: Queries per API call
+        concurrency: API calls in flight at once
+        ordered: Yield results in input order rather than completion order
+        return_exceptions: Yield failures as results with ``error`` set
+            instead of raising them
+        start: Index of the first query, e.g. when resuming a run
+
+    Yields:
+        One ``RetrievalResult`` per query
+    """
+    numbered = enumerate(
+        ({"query": q} if isinstance(q, str) else q for q in queries), start
+    )
+    batches = iter(lambda: list(islice(numbered, batch_size)), [])
+    window = concurrency * QUEUE_DEPTH
+    pending: Deque["Future[List[RetrievalResult]]"] = deque()
+    running: Set["Future[List[RetrievalResult]]"] = set()
+
+    def submit(batch: List[Tuple[int, Dict[str, Any]]]) -> None:
+        context = contextvars.copy_context()
+        future = pool.submit(context.run, _fetch, client, batch, batch_size > 1)
+        pending.append(future)
+        running.add(future)
+
+    def results(future: "Future[List[RetrievalResult]]") -> List[RetrievalResult]:
+        running.discard(future)
+        batch = future.result()
+        if not return_exceptions:
+            for result in batch:
+                if result.error is not None:
+                    raise result.error
+        return batch
+
+    pool = ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="tatry")
+    try:
+        for batch in islice(batches, window):
+            submit(batch)
+        while running:
+            if ordered:
+                done = pending.popleft()
+            else:
+                done = next(iter(wait(running, return_when=FIRST_COMPLETED).done))
+                pending.remove(done)
+            yield from results(done)
+            for batch in islice(batches, 1):
+                submit(batch)
+    finally:
+        # Reached when the consumer stops early, too: drop queued batches.
+        for future in pending:
+            future.cancel()
+        pool.shutdown(wait=True)
+
+
+def _fetch(
+    client: "TatryImplementation",
+    batch: List[Tuple[int, Dict[str, Any]]],
+    batched: bool,
+) -> List[RetrievalResult]:
+    started = time.monotonic()
+    try:
+        # Single queries go through retrieve, which would otherwise run as
+        # interactive traffic.
+        with priority(current_priority() or BULK):
+            if batched:
+                results = client.batch_retrieve([request for _, request in batch])
+                found = {result.query_id: result.documents for result in results}
+            else:
+                request = batch[0][1]
+                found = {
+                    0: client.retrieve(
+                        request["query"],
+                        request.get("max_results", 5),
+                        request.get("sources") or [],
+                        request.get("min_score"),
+                    ).documents
+                }
+    except Exception as e:
+        # Any failure belongs to the queries of this batch, so that
+        # return_exceptions holds for unexpected errors, too.
+        latency = time.monotonic() - started
+        return [RetrievalResult(i, r, None, e, latency) for i, r in batch]
+
+    latency = time.monotonic() - started
+    missing = RetrieverError("No result returned for query")
+    return [
+        RetrievalResult(
+            index,
+            request,
+            found.get(position),
+            None if position in found else missing,
+            latency,
+        )
+        for position, (index, request) in enumerate(batch)
+    ]
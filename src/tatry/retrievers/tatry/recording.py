@@ -0,0 +1,234 @@
+import gzip
+import http.client
+import itertools
+import json
+import os
+import threading
+import time
+from datetime import timedelta
+from typing import IO, Any, Dict, Iterator, List, Optional, Tuple, Union
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import BaseAdapter, HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+
+from ...exceptions import RetrieverConfigError
+
+# One exchange is stored per line:
+#   {"method": "POST", "url": "/v1/retrieve", "request": {...}, "status": 200,
+#    "response": {...}, "elapsed": 0.083}
+# JSON bodies are stored parsed, other bodies as text under "body".
+# Files ending in ".gz" are gzip-compressed.
+
+# Timeout argument of ``BaseAdapter.send``.
+AdapterTimeout = Union[None, float, Tuple[Optional[float], Optional[float]]]
+
+
+def _open(path: str, mode: str) -> IO[str]:
+    if path.endswith(".gz"):
+        return gzip.open(path, mode + "t", encoding="utf-8")  # type: ignore
+    return open(path, mode, encoding="utf-8")
+
+
+def _relative_url(url: str) -> str:
+    parts = urlsplit(url)
+    return f"{parts.path}?{parts.query}" if parts.query else parts.path
+
+
+def _decode_body(body: Any) -> Any:
+    if body is None:
+        return None
+    if isinstance(body, bytes):
+        body = body.decode("utf-8")
+    try:
+        return json.loads(body)
+    except ValueError:
+        return body
+
+
+def _request_key(method: str, url: str, body: Any) -> Tuple[str, str, str]:
+    return (
+        method.upper(),
+        _relative_url(url),
+        json.dumps(body, sort_keys=True, separators=(",", ":")),
+    )
+
+
+class RecordingAdapter(BaseAdapter):
+    """
+    Transport adapter that records API exchanges to a file.
+
+    Requests are sent through a regular ``HTTPAdapter`` and every exchange
+    whose path starts with ``path_prefix`` is appended to ``path`` as one
+    JSON line, together with its wall-clock latency.
+    """
+
+    def __init__(self, path: str, path_prefix: str = "/v1/") -> None:
+        """
+        Initialize the adapter.
+
+        Args:
+            path: Output file, gzip-compressed if it ends in ".gz"
+            path_prefix: Only exchanges under this path are recorded
+        """
+        super().__init__()
+        self.path = path
+        self.path_prefix = path_prefix
+        self._lock = threading.Lock()
+        self._file = _open(path, "a")
+        self._pid = os.getpid()
+        self._inner = HTTPAdapter()
+
+    def send(
+        self,
+        request: requests.PreparedRequest,
+        stream: bool = False,
+        timeout: AdapterTimeout = None,
+        verify: Union[bool, str] = True,
+        cert: Union[None, str, Tuple[str, str]] = None,
+        proxies: Optional[Dict[str, str]] = None,
+    ) -> requests.Response:
+        if self._pid != os.getpid():
+            self._pid = os.getpid()
+            self._inner = HTTPAdapter()
+
+        started = time.perf_counter()
+        response = self._inner.send(
+            request,
+            stream=stream,
+            timeout=timeout,
+            verify=verify,
+            cert=cert,
+            proxies=proxies,
+        )
+        content = response.content
+        elapsed = time.perf_counter() - started
+
+        url = _relative_url(request.url or "")
+        if url.startswith(self.path_prefix):
+            record: Dict[str, Any] = {
+                "method": request.method,
+                "url": url,
+                "request": _decode_body(request.body),
+                "status": response.status_code,
+                "elapsed": round(elapsed, 6),
+            }
+            body = _decode_body(content) if content else None
+            if isinstance(body, str):
+                record["body"] = body
+            else:
+                record["response"] = body
+            line = json.dumps(record, separators=(",", ":"))
+            with self._lock:
+                self._file.write(line + "\n")
+                self._file.flush()
+        return response
+
+    def close(self) -> None:
+        with self._lock:
+            self._file.close()
+        self._inner.close()
+
+
+class ReplayAdapter(BaseAdapter):
+    """
+    Transport adapter that serves recorded exchanges without any network.
+
+    Requests are matched on method, path, query string and JSON body. When
+    the same request was recorded several times, the recordings are served
+    in turn. With ``latency_scale`` set, each response is delayed by its
+    recorded latency multiplied by the scale, honouring the read timeout.
+    """
+
+    def __init__(self, path: str, latency_scale: Optional[float] = None) -> None:
+        """
+        Initialize the adapter.
+
+        Args:
+            path: File written by ``RecordingAdapter``
+            latency_scale: Multiplier for the recorded latencies, or ``None``
+                to respond immediately
+        """
+        super().__init__()
+        self.latency_scale = latency_scale
+        self._lock = threading.Lock()
+        self._exchanges: Dict[Tuple[str, str, str], Iterator[Dict[str, Any]]] = {}
+
+        recorded: Dict[Tuple[str, str, str], List[Dict[str, Any]]] = {}
+        with _open(path, "r") as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                record = json.loads(line)
+                key = _request_key(record["method"], record["url"], record["request"])
+                recorded.setdefault(key, []).append(self._prepare(record))
+        if not recorded:
+            raise RetrieverConfigError(f"No recorded exchanges in {path}")
+        for key, records in recorded.items():
+            self._exchanges[key] = itertools.cycle(records)
+
+    @staticmethod
+    def _prepare(record: Dict[str, Any]) -> Dict[str, Any]:
+        # Serialize bodies once at load time so replaying stays cheap.
+        if "body" in record:
+            content = record["body"].encode("utf-8")
+            content_type = "text/plain"
+        elif record.get("response") is not None:
+            content = json.dumps(record["response"], separators=(",", ":")).encode()
+            content_type = "application/json"
+        else:
+            content, content_type = b"", "text/plain"
+        return {
+            "status": record["status"],
+            "content": content,
+            "content_type": content_type,
+            "elapsed": record.get("elapsed", 0.0),
+        }
+
+    def send(
+        self,
+        request: requests.PreparedRequest,
+        stream: bool = False,
+        timeout: AdapterTimeout = None,
+        verify: Union[bool, str] = True,
+        cert: Union[None, str, Tuple[str, str]] = None,
+        proxies: Optional[Dict[str, str]] = None,
+    ) -> requests.Response:
+        key = _request_key(
+            request.method or "GET", request.url or "", _decode_body(request.body)
+        )
+        with self._lock:
+            exchanges = self._exchanges.get(key)
+            exchange = next(exchanges) if exchanges is not None else None
+        if exchange is None:
+            raise requests.exceptions.ConnectionError(
+                f"No recorded response for {key[0]} {key[1]}", request=request
+            )
+
+        if self.latency_scale:
+            delay = exchange["elapsed"] * self.latency_scale
+            read_timeout = timeout[1] if isinstance(timeout, tuple) else timeout
+            if read_timeout is not None and delay > read_timeout:
+                time.sleep(read_timeout)
+                raise requests.exceptions.ReadTimeout(
+                    "Replayed response exceeded the read timeout", request=request
+                )
+            time.sleep(delay)
+
+        response = requests.Response()
+        response.status_code = exchange["status"]
+        response.reason = http.client.responses.get(exchange["status"], "")
+        response._content = exchange["content"]
+        response._content_consumed = True
+        response.headers = CaseInsensitiveDict(
+            {"Content-Type": exchange["content_type"]}
+        )
+        response.encoding = "utf-8"
+        response.url = request.url or ""
+        response.request = request
+        response.elapsed = timedelta(seconds=exchange["elapsed"])
+        return response
+
+    def close(self) -> None:
+        pass
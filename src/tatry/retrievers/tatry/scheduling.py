@@ -0,0 +1,200 @@
+import threading
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Deque, Dict, Iterator, Mapping, NamedTuple, Optional
+
+from ...exceptions import RetrieverConfigError, RetrieverTimeoutError
+
+INTERACTIVE = "interactive"
+BULK = "bulk"
+
+_priority: ContextVar[Optional[str]] = ContextVar("tatry_priority", default=None)
+
+
+class PriorityClass(NamedTuple):
+    """Share of the scheduler given to one class of traffic."""
+
+    # Relative share of capacity while several classes are waiting.
+    weight: float = 1.0
+    # Most requests of this class in flight at once; None for no cap.
+    max_concurrency: Optional[int] = None
+
+
+class _Ticket:
+    __slots__ = ("start", "finish")
+
+    def __init__(self, start: float, finish: float) -> None:
+        self.start = start
+        self.finish = finish
+
+
+@contextmanager
+def priority(name: str) -> Iterator[None]:
+    """
+    Run every API call made inside the block in the priority class ``name``.
+
+    Like ``deadline()``, the class is kept in a context variable, so it
+    follows asyncio tasks and ``contextvars.copy_context`` into threads.
+    """
+    token = _priority.set(name)
+    try:
+        yield
+    finally:
+        _priority.reset(token)
+
+
+def current_priority() -> Optional[str]:
+    """Priority class of the innermost ``priority()`` block, if any."""
+    return _priority.get()
+
+
+class PriorityScheduler:
+    """
+    Weighted fair queue in front of the client's connection pool.
+
+    At most ``capacity`` requests are in flight at once. When a slot frees
+    up, it goes to the waiting class with the earliest virtual finish time
+    (start-time fair queuing). Virtual times are stamped when a request
+    is queued, so backlogged classes share capacity in proportion to their
+    weights, and a class that was idle does not bank credit.
+    Per-class caps keep a class from occupying the whole pool. The
+    defaults give interactive traffic eight times the share of bulk
+    traffic and hold back half the pool from bulk traffic.
+
+    Batches, cache warm-up and stale refreshes tag their requests with the
+    ``bulk`` class; with custom class names, ``bulk`` picks the class that
+    tag resolves to.
+    """
+
+    def __init__(
+        self,
+        capacity: int = 10,
+        classes: Optional[Mapping[str, PriorityClass]] = None,
+        default: str = INTERACTIVE,
+        bulk: Optional[str] = None,
+    ) -> None:
+        """
+        Initialize the scheduler.
+
+        Args:
+            capacity: Total requests in flight, normally the pool size
+            classes: Priority classes by name
+            default: Class of requests made outside a ``priority()`` block
+            bulk: Class of background work tagged ``bulk``; defaults to
+                ``bulk`` if there is such a class and to ``default`` if not
+        """
+        if classes is None:
+            classes = {
+                INTERACTIVE: PriorityClass(weight=8.0),
+                BULK: PriorityClass(weight=1.0, max_concurrency=max(1, capacity // 2)),
+            }
+        if default not in classes:
+            raise RetrieverConfigError(f"Unknown default priority class: {default}")
+        if bulk is None:
+            bulk = BULK if BULK in classes else default
+        if bulk not in classes:
+            raise RetrieverConfigError(f"Unknown bulk priority class: {bulk}")
+
+        self.capacity = capacity
+        self.classes = dict(classes)
+        self.default = default
+        self.bulk = bulk
+
+        self._cond = threading.Condition()
+        self._total = 0
+        self._vtime = 0.0
+        self._in_flight = {name: 0 for name in self.classes}
+        self._finish = {name: 0.0 for name in self.classes}
+        self._waiting: Dict[str, Deque[_Ticket]] = {
+            name: deque() for name in self.classes
+        }
+
+    @property
+    def in_flight(self) -> Dict[str, int]:
+        """Requests currently holding a slot, by class."""
+        with self._cond:
+            return dict(self._in_flight)
+
+    @property
+    def waiting(self) -> Dict[str, int]:
+        """Requests waiting for a slot, by class."""
+        with self._cond:
+            return {name: len(queue) for name, queue in self._waiting.items()}
+
+    def acquire(
+        self, name: Optional[str] = None, timeout: Optional[float] = None
+    ) -> bool:
+        """
+        Wait for a slot in class ``name``.
+
+        Returns:
+            True if a slot was acquired before the timeout
+        """
+        name = self._resolve(name)
+        with self._cond:
+            start = max(self._finish[name], self._vtime)
+            ticket = _Ticket(start, start + 1 / self.classes[name].weight)
+            self._finish[name] = ticket.finish
+            queue = self._waiting[name]
+            queue.append(ticket)
+            granted = self._cond.wait_for(
+                lambda: queue[0] is ticket and self._next() == name, timeout
+            )
+            if not granted:
+                queue.remove(ticket)
+            else:
+                queue.popleft()
+                self._vtime = max(self._vtime, ticket.start)
+                self._in_flight[name] += 1
+                self._total += 1
+            # The head of another queue may now be eligible.
+            self._cond.notify_all()
+            return granted
+
+    def release(self, name: Optional[str] = None) -> None:
+        """Free a slot held by class ``name``."""
+        name = self._resolve(name)
+        with self._cond:
+            self._in_flight[name] -= 1
+            self._total -= 1
+            self._cond.notify_all()
+
+    @contextmanager
+    def slot(
+        self, name: Optional[str] = None, timeout: Optional[float] = None
+    ) -> Iterator[None]:
+        """
+        Hold a slot in class ``name`` for one request.
+
+        Raises:
+            RetrieverTimeoutError: If no slot frees up within ``timeout``
+        """
+        name = self._resolve(name)
+        if not self.acquire(name, timeout):
+            raise RetrieverTimeoutError(f"Timed out waiting for a {name} slot")
+        try:
+            yield
+        finally:
+            self.release(name)
+
+    def _resolve(self, name: Optional[str]) -> str:
+        name = name or current_priority() or self.default
+        if name == BULK:
+            name = self.bulk
+        if name not in self.classes:
+            raise RetrieverConfigError(f"Unknown priority class: {name}")
+        return name
+
+    def _next(self) -> Optional[str]:
+        """Class that gets the next free slot, if any can run now."""
+        if self._total >= self.capacity:
+            return None
+        best, best_finish = None, 0.0
+        for name, queue in self._waiting.items():
+            cap = self.classes[name].max_concurrency
+            if not queue or (cap is not None and self._in_flight[name] >= cap):
+                continue
+            if best is None or queue[0].finish < best_finish:
+                best, best_finish = name, queue[0].finish
+        return best
@@ -0,0 +1,102 @@
+import re
+from typing import Iterable, Iterator, Optional
+
+_TOKEN = re.compile(rb'[{}\[\]"]')
+_STRING_TAIL = re.compile(rb'[^"\\]*(?:\\.[^"\\]*)*"', re.S)
+
+
+class JSONArrayStream:
+    """
+    Incrementally split a JSON array out of a streamed top-level object.
+
+    Iterating yields the raw bytes of each object in the array stored under
+    ``key``, as soon as the object is complete, so only one element has to
+    be buffered at a time. Everything else in the document is collected in
+    ``skeleton`` with the array replaced by ``[]``, e.g. the ``total`` field
+    of ``{"documents": [...], "total": 3}``.
+    """
+
+    def __init__(self, chunks: Iterable[bytes], key: str) -> None:
+        """
+        Initialize the stream.
+
+        Args:
+            chunks: Raw response body chunks
+            key: Key of the top-level array to split
+        """
+        self.chunks = chunks
+        self.key = key.encode("utf-8")
+        self._skeleton = bytearray()
+        self._complete = False
+
+    @property
+    def skeleton(self) -> bytes:
+        """The document without the array items, available after iteration."""
+        if not self._complete:
+            raise ValueError("JSON stream has not been fully consumed")
+        return bytes(self._skeleton)
+
+    def __iter__(self) -> Iterator[bytes]:
+        buf = bytearray()
+        pos = 0  # next byte to scan
+        mark = 0  # start of bytes not yet copied to the skeleton
+        depth = 0
+        last_key: Optional[bytes] = None
+        in_array = False
+        item_start: Optional[int] = None
+
+        for chunk in self.chunks:
+            buf += chunk
+            while True:
+                match = _TOKEN.search(buf, pos)
+                if match is None:
+                    pos = len(buf)
+                    break
+                start = match.start()
+                char = buf[start]
+
+                if char == 0x22:  # '"'
+                    tail = _STRING_TAIL.match(buf, start + 1)
+                    if tail is None:
+                        # Unterminated string: wait for more data.
+                        pos = start
+                        break
+                    if depth == 1 and not in_array:
+                        last_key = bytes(buf[start + 1 : tail.end() - 1])
+                    pos = tail.end()
+                    continue
+
+                pos = start + 1
+                if char in (0x7B, 0x5B):  # '{' '['
+                    if depth == 1 and char == 0x5B and last_key == self.key:
+                        self._skeleton += buf[mark:pos]
+                        in_array = True
+                    elif in_array and depth == 2 and char == 0x7B:
+                        item_start = start
+                    depth += 1
+                else:
+                    depth -= 1
+                    if in_array and depth == 2 and item_start is not None:
+                        yield bytes(buf[item_start:pos])
+                        item_start = None
+                    elif in_array and depth == 1:
+                        in_array = False
+                        mark = start
+
+            # Drop bytes that are no longer needed so memory stays bounded
+            # by the largest single item.
+            if in_array:
+                drop = item_start if item_start is not None else pos
+                if item_start is not None:
+                    item_start = 0
+            else:
+                self._skeleton += buf[mark:pos]
+                drop = pos
+                mark = 0
+            del buf[:drop]
+            pos -= drop
+
+        if depth != 0 or in_array:
+            raise ValueError("Truncated JSON document")
+        self._skeleton += buf[mark:]
+        self._complete = True
@@ -0,0 +1,382 @@
+import json
+import os
+from abc import ABC, abstractmethod
+from typing import Any, Dict, Iterator, List, Optional, Tuple, Type, Union
+from urllib.parse import urlencode
+
+import requests
+import urllib3
+from requests.adapters import BaseAdapter
+
+from ...exceptions import (
+    RetrieverAPIError,
+    RetrieverConfigError,
+    RetrieverConnectionError,
+    RetrieverError,
+    RetrieverTimeoutError,
+)
+
+Timeout = Union[float, Tuple[float, float]]
+
+# Keyword arguments of requests.Session.request that a caller may pass on.
+_SESSION_OPTIONS = frozenset(
+    {
+        "data",
+        "headers",
+        "cookies",
+        "files",
+        "auth",
+        "allow_redirects",
+        "proxies",
+        "hooks",
+        "verify",
+        "cert",
+    }
+)
+
+
+class Transport(ABC):
+    """
+    Sends HTTP requests for ``TatryClient``.
+
+    ``request`` returns a response with the parts of the
+    ``requests.Response`` interface the client uses: ``status_code``,
+    ``reason``, ``url``, ``headers``, ``content``, ``json()``,
+    ``iter_content()`` and use as a context manager. Failures are raised as
+    the transport's own exceptions, listed in ``errors``, and turned into
+    retriever errors by ``translate``. Other keyword arguments are request
+    options of the underlying library; a transport raises
+    ``RetrieverConfigError`` for options it does not support. A new
+    transport is created in a forked child process.
+    """
+
+    # Exceptions raised by the transport or its responses.
+    errors: Tuple[Type[BaseException], ...] = ()
+
+    @abstractmethod
+    def request(
+        self,
+        method: str,
+        url: str,
+        timeout: Timeout,
+        json: Any = None,
+        params: Optional[Dict[str, Any]] = None,
+        stream: bool = False,
+        **kwargs: Any,
+    ) -> Any:
+        """Send one request and return its response."""
+
+    @abstractmethod
+    def translate(self, error: BaseException) -> RetrieverError:
+        """Retriever error corresponding to one of ``errors``."""
+
+    def close(self) -> None:
+        """Release pooled connections."""
+
+    def request_size(self, response: Any) -> int:
+        """Size in bytes of the body sent for ``response``."""
+        return 0
+
+    def response_size(self, response: Any) -> Optional[int]:
+        """Body bytes read so far for a streamed ``response``, if known."""
+        return None
+
+    def pool_usage(self) -> Optional[Tuple[int, int]]:
+        """Connections in use and pool capacity, if the transport pools."""
+        return None
+
+
+class RequestsTransport(Transport):
+    """
+    Transport built on a ``requests.Session``; supports transport adapters.
+
+    Request options that ``requests.Session.request`` accepts, such as
+    ``headers``, ``data`` or ``auth``, are passed through.
+    """
+
+    errors = (requests.exceptions.RequestException,)
+
+    def __init__(
+        self,
+        headers: Dict[str, str],
+        base_url: str,
+        adapter: Optional[BaseAdapter] = None,
+    ) -> None:
+        self.session = requests.Session()
+        self.session.headers.update(headers)
+        if adapter is not None:
+            self.session.mount(base_url, adapter)
+
+    def request(
+        self,
+        method: str,
+        url: str,
+        timeout: Timeout,
+        json: Any = None,
+        params: Optional[Dict[str, Any]] = None,
+        stream: bool = False,
+        **kwargs: Any,
+    ) -> requests.Response:
+        unsupported = set(kwargs) - _SESSION_OPTIONS
+        if unsupported:
+            raise RetrieverConfigError(
+                f"Unsupported request options: {', '.join(sorted(unsupported))}"
+            )
+        # Encoded here, as requests would, so that an unserializable body
+        # fails the same way with either transport. The session already sends
+        # the JSON content type. As in requests, ``data`` takes precedence.
+        if json is not None and not kwargs.get("data"):
+            kwargs["data"] = _encode_body(json)
+        return self.session.request(
+            method, url, timeout=timeout, params=params, stream=stream, **kwargs
+        )
+
+    def translate(self, error: BaseException) -> RetrieverError:
+        if isinstance(error, requests.exceptions.Timeout):
+            return RetrieverTimeoutError(f"Request timed out: {str(error)}")
+        if isinstance(error, requests.exceptions.ConnectionError):
+            return RetrieverConnectionError(f"Connection error: {str(error)}")
+        return RetrieverAPIError(f"Request failed: {str(error)}")
+
+    def close(self) -> None:
+        self.session.close()
+
+    def request_size(self, response: Any) -> int:
+        body = response.request.body if response.request is not None else None
+        return len(body) if body else 0
+
+    def response_size(self, response: Any) -> Optional[int]:
+        tell = getattr(response.raw, "tell", None)
+        return tell() if tell is not None else None
+
+    def pool_usage(self) -> Optional[Tuple[int, int]]:
+        managers = []
+        for adapter in self.session.adapters.values():
+            manager = getattr(adapter, "poolmanager", None)
+            if isinstance(manager, urllib3.PoolManager):
+                managers.append(manager)
+        return _pool_usage(managers) if managers else None
+
+
+class Urllib3Response:
+    """The part of the ``requests.Response`` interface the client relies on."""
+
+    __slots__ = (
+        "_raw",
+        "_content",
+        "url",
+        "status_code",
+        "reason",
+        "headers",
+        "request_size",
+    )
+
+    def __init__(
+        self, raw: urllib3.BaseHTTPResponse, url: str, request_size: int = 0
+    ) -> None:
+        self._raw = raw
+        self._content: Optional[bytes] = None
+        self.url = url
+        self.request_size = request_size
+        self.status_code = raw.status
+        self.reason = raw.reason
+        self.headers = raw.headers
+
+    @property
+    def ok(self) -> bool:
+        return self.status_code < 400
+
+    @property
+    def content(self) -> bytes:
+        if self._content is None:
+            self._content = self._raw.data
+        return self._content
+
+    @property
+    def text(self) -> str:
+        return self.content.decode("utf-8", errors="replace")
+
+    def json(self) -> Any:
+        return json.loads(self.content)
+
+    def iter_content(self, chunk_size: int = 1) -> Iterator[bytes]:
+        if self._content is not None:
+            return iter((self._content,))
+        return self._raw.stream(chunk_size)
+
+    def close(self) -> None:
+        if not self._raw.closed:
+            # Unread body: the connection cannot be reused.
+            self._raw.close()
+        self._raw.release_conn()
+
+    def __enter__(self) -> "Urllib3Response":
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        self.close()
+
+
+class Urllib3Transport(Transport):
+    """
+    Thin transport on a ``urllib3.PoolManager``.
+
+    It skips the session, hook and adapter layers of ``requests``, which
+    dominate the client-side cost of small JSON calls. Like ``requests``,
+    it follows redirects, verifies certificates against ``certifi`` or
+    ``REQUESTS_CA_BUNDLE``/``CURL_CA_BUNDLE``, and uses the proxy that the
+    environment sets for the base URL. Transport adapters, SOCKS proxies
+    and per-request options other than ``json``, ``params`` and ``stream``
+    are not supported.
+    """
+
+    errors = (urllib3.exceptions.HTTPError,)
+
+    def __init__(
+        self, headers: Dict[str, str], base_url: str, maxsize: int = 10
+    ) -> None:
+        options: Dict[str, Any] = {
+            "maxsize": maxsize,
+            "headers": headers,
+            # Retries are the client's job; only redirects are followed, with
+            # the same limit as requests.
+            "retries": urllib3.Retry(
+                total=None,
+                connect=0,
+                read=0,
+                status=0,
+                other=0,
+                redirect=requests.models.DEFAULT_REDIRECT_LIMIT,
+            ),
+            "cert_reqs": "CERT_REQUIRED",
+        }
+        bundle = (
+            os.environ.get("REQUESTS_CA_BUNDLE")
+            or os.environ.get("CURL_CA_BUNDLE")
+            or requests.utils.DEFAULT_CA_BUNDLE_PATH
+        )
+        if os.path.isdir(bundle):
+            options["ca_cert_dir"] = bundle
+        else:
+            options["ca_certs"] = bundle
+
+        proxy = requests.utils.select_proxy(
+            base_url, requests.utils.get_environ_proxies(base_url)
+        )
+        if proxy is None:
+            self.pool: urllib3.PoolManager = urllib3.PoolManager(**options)
+        elif proxy.lower().startswith("socks"):
+            raise RetrieverConfigError(
+                "SOCKS proxies need the requests transport with PySocks"
+            )
+        else:
+            proxy_headers = requests.adapters.HTTPAdapter().proxy_headers(proxy)
+            self.pool = urllib3.ProxyManager(
+                requests.utils.prepend_scheme_if_needed(proxy, "http"),
+                proxy_headers=proxy_headers,
+                **options,
+            )
+
+    def request(
+        self,
+        method: str,
+        url: str,
+        timeout: Timeout,
+        json: Any = None,
+        params: Optional[Dict[str, Any]] = None,
+        stream: bool = False,
+        **kwargs: Any,
+    ) -> Urllib3Response:
+        if kwargs:
+            raise RetrieverConfigError(
+                "Request options not supported by the urllib3 transport: "
+                f"{', '.join(sorted(kwargs))}"
+            )
+        if params:
+            query = {k: v for k, v in params.items() if v is not None}
+            url = f"{url}?{urlencode(query, doseq=True)}"
+        body = None
+        if json is not None:
+            body = _encode_body(json)
+        if isinstance(timeout, tuple):
+            pool_timeout = urllib3.Timeout(connect=timeout[0], read=timeout[1])
+        else:
+            pool_timeout = urllib3.Timeout(connect=timeout, read=timeout)
+        raw = self.pool.request(
+            method, url, body=body, timeout=pool_timeout, preload_content=not stream
+        )
+        return Urllib3Response(raw, url, len(body) if body else 0)
+
+    def translate(self, error: BaseException) -> RetrieverError:
+        if isinstance(error, urllib3.exceptions.MaxRetryError) and error.reason:
+            error = error.reason
+        if isinstance(error, urllib3.exceptions.NewConnectionError):
+            return RetrieverConnectionError(f"Connection error: {str(error)}")
+        if isinstance(error, urllib3.exceptions.TimeoutError):
+            return RetrieverTimeoutError(f"Request timed out: {str(error)}")
+        if isinstance(
+            error,
+            (
+                urllib3.exceptions.ProtocolError,
+                urllib3.exceptions.SSLError,
+                urllib3.exceptions.ProxyError,
+            ),
+        ):
+            return RetrieverConnectionError(f"Connection error: {str(error)}")
+        return RetrieverAPIError(f"Request failed: {str(error)}")
+
+    def close(self) -> None:
+        self.pool.clear()
+
+    def request_size(self, response: Any) -> int:
+        return int(response.request_size)
+
+    def response_size(self, response: Any) -> Optional[int]:
+        return int(response._raw.tell())
+
+    def pool_usage(self) -> Optional[Tuple[int, int]]:
+        return _pool_usage([self.pool])
+
+
+def _pool_usage(managers: List[urllib3.PoolManager]) -> Tuple[int, int]:
+    # Each host pool's queue starts with ``maxsize`` free slots; a checked
+    # out connection leaves the queue until it is returned.
+    in_use = capacity = 0
+    for manager in managers:
+        for key in manager.pools.keys():
+            pool = manager.pools.get(key)
+            queue = getattr(pool, "pool", None)
+            if queue is None:
+                continue
+            capacity += queue.maxsize
+            in_use += queue.maxsize - queue.qsize()
+    return in_use, capacity
+
+
+def _encode_body(data: Any) -> bytes:
+    try:
+        return json.dumps(data, allow_nan=False).encode("utf-8")
+    except (TypeError, ValueError) as e:
+        # Raised before sending; retrying cannot help.
+        raise RetrieverConfigError(f"Request body is not valid JSON: {e}") from e
+
+
+TRANSPORTS = ("requests", "urllib3")
+
+
+def create_transport(
+    name: str,
+    headers: Dict[str, str],
+    base_url: str,
+    adapter: Optional[BaseAdapter] = None,
+) -> Transport:
+    """Build the transport selected by ``Config.transport``."""
+    if name == "requests":
+        return RequestsTransport(headers, base_url, adapter)
+    if name == "urllib3":
+        if adapter is not None:
+            raise RetrieverConfigError("Transport adapters need the requests transport")
+        return Urllib3Transport(headers, base_url)
+    raise RetrieverConfigError(
+        f"Unknown transport {name!r}; expected one of {', '.join(TRANSPORTS)}"
+    )
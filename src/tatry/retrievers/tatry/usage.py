@@ -0,0 +1,145 @@
+import threading
+import time
+from collections import Counter
+from typing import Callable, Dict, Iterable, Optional
+
+from ...exceptions import RetrieverError
+from ...models.retrieve import Document
+from ...models.utils import DocumentUsage, QueryUsage, Usage, UsageResponse
+
+
+class UsageMeter:
+    """
+    In-process counter of queries and documents per source.
+
+    Responses are counted locally as they arrive and added on top of the
+    last usage snapshot fetched from the server, so reading the counters
+    never makes a network call. Reconciling replaces that baseline with
+    fresh numbers from ``/v1/usage``.
+    """
+
+    def __init__(self, reconcile_interval: Optional[float] = None) -> None:
+        """
+        Initialize the meter.
+
+        Args:
+            reconcile_interval: Seconds between automatic reconciliations with
+                the server. ``None`` disables automatic reconciliation.
+        """
+        self.reconcile_interval = reconcile_interval
+        self._lock = threading.Lock()
+        self._baseline: Optional[Usage] = None
+        self._queries: Counter = Counter()
+        self._documents: Counter = Counter()
+        # Deltas captured while a reconciliation is in flight.
+        self._pending_queries: Counter = Counter()
+        self._pending_documents: Counter = Counter()
+        self._reconciling = False
+        self._last_reconciled = time.monotonic()
+
+    def record(self, sources: Iterable[str], documents: Iterable[Document]) -> None:
+        """
+        Record one query and the documents it returned.
+
+        Args:
+            sources: Source IDs the query was sent to
+            documents: Documents returned for the query
+        """
+        with self._lock:
+            self._queries[None] += 1
+            for source in sources:
+                self._queries[source] += 1
+            for doc in documents:
+                self._documents[None] += 1
+                # Projected documents may lack the source.
+                source_id = getattr(getattr(doc, "metadata", None), "source", None)
+                if source_id is not None:
+                    self._documents[source_id] += 1
+
+    def snapshot(self) -> Usage:
+        """Return the current usage: server baseline plus local counts."""
+        with self._lock:
+            queries = self._queries + self._pending_queries
+            documents = self._documents + self._pending_documents
+            baseline = self._baseline
+
+        if baseline is not None:
+            queries.update(baseline.queries.by_source)
+            queries[None] += baseline.queries.total
+            documents.update(baseline.documents.by_source)
+            documents[None] += baseline.documents.total
+
+        return Usage(
+            queries=QueryUsage(
+                total=queries.pop(None, 0), by_source=_by_source(queries)
+            ),
+            documents=DocumentUsage(
+                total=documents.pop(None, 0), by_source=_by_source(documents)
+            ),
+        )
+
+    def reconcile(self, fetch: Callable[[], UsageResponse]) -> bool:
+        """
+        Replace the baseline with fresh server usage.
+
+        Local counts recorded while ``fetch`` runs are kept on top of the new
+        baseline. If ``fetch`` fails, no counts are lost; errors other than
+        ``RetrieverError`` are re-raised.
+
+        Args:
+            fetch: Callable returning the server usage, e.g. ``client.get_usage``
+
+        Returns:
+            True if the baseline was updated
+        """
+        if not self._claim():
+            return False
+        usage: Optional[Usage] = None
+        try:
+            usage = fetch().data.usage
+        except RetrieverError:
+            return False
+        finally:
+            with self._lock:
+                if usage is None:
+                    self._queries.update(self._pending_queries)
+                    self._documents.update(self._pending_documents)
+                else:
+                    self._baseline = usage
+                    self._last_reconciled = time.monotonic()
+                self._release()
+        return True
+
+    def maybe_reconcile(self, fetch: Callable[[], UsageResponse]) -> bool:
+        """
+        Start a background reconciliation if one is due.
+
+        Returns:
+            True if a reconciliation thread was started
+        """
+        if (
+            self.reconcile_interval is None
+            or self._reconciling
+            or time.monotonic() - self._last_reconciled < self.reconcile_interval
+        ):
+            return False
+        threading.Thread(target=self.reconcile, args=(fetch,), daemon=True).start()
+        return True
+
+    def _claim(self) -> bool:
+        with self._lock:
+            if self._reconciling:
+                return False
+            self._reconciling = True
+            self._pending_queries, self._queries = self._queries, Counter()
+            self._pending_documents, self._documents = self._documents, Counter()
+            return True
+
+    def _release(self) -> None:
+        self._pending_queries = Counter()
+        self._pending_documents = Counter()
+        self._reconciling = False
+
+
+def _by_source(counts: Counter) -> Dict[str, int]:
+    return {source: count for source, count in counts.items() if count}
@@ -0,0 +1,274 @@
+import gzip
+import json
+import time
+from dataclasses import dataclass
+from typing import (
+    IO,
+    TYPE_CHECKING,
+    Any,
+    Callable,
+    Dict,
+    Hashable,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Set,
+    Tuple,
+    Union,
+)
+
+from ...exceptions import RetrieverConfigError, RetrieverError
+from ...models.retrieve import Document, DocumentResponse
+from .cache import retrieve_key
+
+if TYPE_CHECKING:
+    from .endpoints import TatryImplementation
+
+RANKINGS = ("frequency", "recency")
+
+
+@dataclass
+class WarmupReport:
+    """Outcome of a ``warm_cache`` run."""
+
+    # Entries read from the log.
+    logged: int
+    # Distinct queries in the log.
+    distinct: int
+    # Queries chosen for warming, at most ``top_n``.
+    selected: int
+    # Selected queries whose results were all stored.
+    warmed: int
+    # Batch queries that failed or got no result.
+    failed: int
+    # Share of logged requests whose query was warmed.
+    coverage: float
+    # Entries in the warmed caches afterwards, and their total capacity.
+    entries: int
+    capacity: int
+    seconds: float
+
+    @property
+    def fill(self) -> float:
+        """Share of cache capacity in use after warming."""
+        return self.entries / self.capacity if self.capacity else 0.0
+
+
+class _Logged:
+    """A distinct logged query with its occurrence statistics."""
+
+    __slots__ = ("request", "count", "last")
+
+    def __init__(self, request: Dict[str, Any], position: int) -> None:
+        self.request = request
+        self.count = 0
+        self.last = position
+
+
+def read_query_log(path: str) -> Iterator[Dict[str, Any]]:
+    """
+    Read a JSONL query log, gzip-compressed if the name ends in ``.gz``.
+
+    Each line is a JSON object of ``retrieve`` arguments or a JSON string
+    holding just the query. Blank lines are skipped.
+    """
+    opener: Callable[..., IO[str]] = gzip.open if path.endswith(".gz") else open
+    with opener(path, "rt", encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                entry = json.loads(line)
+                yield {"query": entry} if isinstance(entry, str) else entry
+
+
+def warm_cache(
+    client: "TatryImplementation",
+    log: Iterable[Union[str, Dict[str, Any]]],
+    top_n: int = 1000,
+    rank: str = "frequency",
+    batch_size: int = 20,
+    max_qps: Optional[float] = None,
+) -> WarmupReport:
+    """
+    Fill the client's result caches with the most important logged queries.
+
+    Logged ``retrieve`` arguments are grouped into distinct queries (by
+    canonical form if the client has a canonicalizer) and ranked by how
+    often they occur, or by how recently they last occurred, assuming the
+    log is in chronological order. The top ``top_n`` are fetched with
+    ``batch_retrieve`` and stored in the client's ``stale_cache`` and, for
+    queries with sources, in its per-source ``source_cache``. Failed
+    batches are counted and skipped.
+
+    Args:
+        client: Client whose caches are warmed
+        log: ``retrieve`` argument dicts or query strings, oldest first
+        top_n: Number of distinct queries to warm
+        rank: "frequency" or "recency"
+        batch_size: Queries per ``batch_retrieve`` call
+        max_qps: Maximum queries sent per second, or None for no limit
+
+    Returns:
+        A report of what was warmed and how long it took
+    """
+    if rank not in RANKINGS:
+        raise RetrieverConfigError(f"rank must be one of {', '.join(RANKINGS)}")
+    if client.stale_cache is None and client.source_cache is None:
+        raise RetrieverConfigError("The client has no result cache to warm")
+
+    started = time.monotonic()
+    logged = 0
+    distinct: Dict[Hashable, _Logged] = {}
+    for position, entry in enumerate(log):
+        request = _retrieve_args(entry)
+        key = _group_key(client, request)
+        item = distinct.get(key)
+        if item is None:
+            item = distinct[key] = _Logged(request, position)
+        item.count += 1
+        item.last = position
+        logged += 1
+
+    if rank == "frequency":
+        ranked = sorted(
+            distinct.values(), key=lambda item: (item.count, item.last), reverse=True
+        )
+    else:
+        ranked = sorted(distinct.values(), key=lambda item: item.last, reverse=True)
+    selected = ranked[:top_n]
+
+    # One batch query per cache entry to fill, with the function storing its
+    # result and the selected query it belongs to.
+    queries: List[Dict[str, Any]] = []
+    stores: List[Tuple[Callable[[List[Document]], None], int]] = []
+    queued: Set[str] = set()
+    for index, item in enumerate(selected):
+        request = item.request
+        if client.stale_cache is not None:
+            queries.append(_batch_query(**request))
+            stores.append((_stale_store(client, request), index))
+        if client.source_cache is not None and request["sources"]:
+            for query, text in _per_source_queries(client, request):
+                key = json.dumps(dict(query, query=text), sort_keys=True)
+                if key not in queued:
+                    queued.add(key)
+                    queries.append(query)
+                    stores.append((_source_store(client, query, text), index))
+
+    failures: Set[int] = set()
+    failed = 0
+    for offset in range(0, len(queries), batch_size):
+        if max_qps is not None:
+            # Pace batches so that no more than max_qps queries are sent.
+            delay = started + offset / max_qps - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+        batch = queries[offset : offset + batch_size]
+        answered: Set[int] = set()
+        try:
+            results = client.batch_retrieve(batch)
+        except RetrieverError:
+            results = []
+        for result in results:
+            if 0 <= result.query_id < len(batch):
+                store, _ = stores[offset + result.query_id]
+                store(result.documents)
+                answered.add(result.query_id)
+        for query_id in range(len(batch)):
+            if query_id not in answered:
+                failed += 1
+                failures.add(stores[offset + query_id][1])
+
+    warmed = [item for index, item in enumerate(selected) if index not in failures]
+    entries = capacity = 0
+    for cache in (client.stale_cache, client.source_cache):
+        if cache is not None:
+            entries += len(cache)
+            capacity += cache.maxsize
+    return WarmupReport(
+        logged=logged,
+        distinct=len(distinct),
+        selected=len(selected),
+        warmed=len(warmed),
+        failed=failed,
+        coverage=sum(item.count for item in warmed) / logged if logged else 0.0,
+        entries=entries,
+        capacity=capacity,
+        seconds=time.monotonic() - started,
+    )
+
+
+def _retrieve_args(entry: Union[str, Dict[str, Any]]) -> Dict[str, Any]:
+    """``retrieve`` arguments of a log entry, with the method's defaults."""
+    if isinstance(entry, str):
+        entry = {"query": entry}
+    return {
+        "query": entry["query"],
+        "max_results": entry.get("max_results", 5),
+        "sources": list(entry.get("sources") or []),
+        "min_score": entry.get("min_score"),
+    }
+
+
+def _group_key(client: "TatryImplementation", request: Dict[str, Any]) -> Hashable:
+    """Stale cache key of a logged call; equivalent spellings share it."""
+    return retrieve_key(**request, canonicalizer=client.canonicalizer)
+
+
+def _batch_query(
+    query: str, max_results: int, sources: List[str], min_score: Optional[float]
+) -> Dict[str, Any]:
+    request: Dict[str, Any] = {
+        "query": query,
+        "max_results": max_results,
+        "sources": sources,
+    }
+    if min_score is not None:
+        request["min_score"] = min_score
+    return request
+
+
+def _per_source_queries(
+    client: "TatryImplementation", request: Dict[str, Any]
+) -> List[Tuple[Dict[str, Any], str]]:
+    """
+    Single-source queries matching the entries ``retrieve`` would cache.
+
+    Each query is sent as logged and paired with the query text that keys
+    its cache entry.
+    """
+    query = text = request["query"]
+    if client.canonicalizer is not None:
+        text = client.canonicalizer.normalize(query)
+    return [
+        (
+            _batch_query(query, request["max_results"], [source], request["min_score"]),
+            text,
+        )
+        for source in dict.fromkeys(request["sources"])
+    ]
+
+
+def _stale_store(
+    client: "TatryImplementation", request: Dict[str, Any]
+) -> Callable[[List[Document]], None]:
+    def store(documents: List[Document]) -> None:
+        response = DocumentResponse(documents=documents, total=len(documents))
+        client.stale_cache.put(_group_key(client, request), response)  # type: ignore[union-attr]
+
+    return store
+
+
+def _source_store(
+    client: "TatryImplementation", query: Dict[str, Any], text: str
+) -> Callable[[List[Document]], None]:
+    def store(documents: List[Document]) -> None:
+        client.source_cache.put(  # type: ignore[union-attr]
+            text,
+            query["sources"][0],
+            documents,
+            query["max_results"],
+            query.get("min_score"),
+        )
+
+    return store
@@ -0,0 +1,39 @@
+"""Response payloads and endpoint URLs shared by the test modules."""
+
+from typing import Any, Dict, Optional
+
+from tatry.models.retrieve import Document
+
+BASE_URL = "https://api.tatry.dev"
+RETRIEVE_URL = f"{BASE_URL}/v1/retrieve"
+BATCH_URL = f"{BASE_URL}/v1/retrieve/batch"
+HEALTH_URL = f"{BASE_URL}/v1/health"
+
+
+def make_document(
+    doc_id: str,
+    score: float = 0.9,
+    content: Optional[str] = None,
+    source: str = "test",
+) -> Dict[str, Any]:
+    """API payload of one document; the content defaults to "content <id>"."""
+    return {
+        "id": doc_id,
+        "content": f"content {doc_id}" if content is None else content,
+        "metadata": {
+            "source": source,
+            "published_date": "2024-01-01",
+            "citation": f"Document {doc_id}",
+        },
+        "relevance_score": score,
+    }
+
+
+def document(
+    doc_id: str,
+    score: float = 0.9,
+    content: Optional[str] = None,
+    source: str = "test",
+) -> Document:
+    """Validated ``Document`` of the ``make_document`` payload."""
+    return Document.model_validate(make_document(doc_id, score, content, source))
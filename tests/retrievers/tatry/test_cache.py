@@ -0,0 +1,110 @@
+import json
+
+from helpers import BATCH_URL, RETRIEVE_URL, document, make_document
+
+from tatry.retrievers.tatry import SourceResultCache, TatryRetriever
+from tatry.retrievers.tatry.cache import merge_documents
+
+
+def per_source_callback(scores):
+    """Answer each single-source batch query with that source's documents."""
+
+    def callback(request):
+        queries = json.loads(request.body)["queries"]
+        results = [
+            {
+                "query_id": i,
+                "documents": [
+                    make_document(f"{q['sources'][0]}-{n}", s, source=q["sources"][0])
+                    for n, s in enumerate(scores[q["sources"][0]])
+                ][: q["max_results"]],
+            }
+            for i, q in enumerate(queries)
+        ]
+        return 200, {}, json.dumps({"results": results})
+
+    return callback
+
+
+def test_incremental_sources_fetch_only_missing(mock_responses):
+    """Test that widening the sources list only fetches the new source."""
+    client = TatryRetriever(api_key="test_key", source_cache=SourceResultCache())
+    mock_responses.add_callback(
+        mock_responses.POST,
+        BATCH_URL,
+        callback=per_source_callback({"a": [0.9, 0.3], "b": [0.8], "c": [0.95]}),
+    )
+
+    first = client.retrieve("test", max_results=2, sources=["a", "b"])
+    assert [d.id for d in first.documents] == ["a-0", "b-0"]
+
+    second = client.retrieve("test", max_results=2, sources=["a", "b", "c"])
+    assert [d.id for d in second.documents] == ["c-0", "a-0"]
+    assert second.total == 2
+
+    sent = [json.loads(call.request.body)["queries"] for call in mock_responses.calls]
+    assert [[q["sources"] for q in queries] for queries in sent] == [
+        [["a"], ["b"]],
+        [["c"]],
+    ]
+
+
+def test_cache_bypassed_without_sources(mock_responses):
+    """Test that requests without sources go straight to /v1/retrieve."""
+    client = TatryRetriever(api_key="test_key", source_cache=SourceResultCache())
+    mock_responses.add(
+        mock_responses.POST,
+        RETRIEVE_URL,
+        json={"documents": [make_document("x", 0.5)], "total": 1},
+    )
+
+    assert client.retrieve("test").total == 1
+    assert len(client.source_cache) == 0
+
+
+def test_entry_coverage():
+    """Test which later requests a cached entry can answer."""
+    cache = SourceResultCache()
+    docs = [document(str(i), 0.5) for i in range(5)]
+    cache.put("q", "a", docs, max_results=5, min_score=0.2)
+
+    assert cache.get("q", "a", max_results=3, min_score=0.4) == docs
+    assert cache.get("q", "a", max_results=10, min_score=0.2) is None
+    assert cache.get("q", "a", max_results=3) is None  # looser threshold
+
+    cache.put("q", "b", docs[:2], max_results=5)
+    assert cache.get("q", "b", max_results=50) == docs[:2]  # source exhausted
+    assert (cache.hits, cache.misses) == (2, 2)
+
+
+def test_expiry_and_eviction(monkeypatch):
+    """Test that entries expire after ttl and the LRU entry is evicted."""
+    now = [100.0]
+    monkeypatch.setattr("tatry.retrievers.tatry.cache.time.monotonic", lambda: now[0])
+    cache = SourceResultCache(maxsize=2, ttl=10)
+    cache.put("q", "a", [], 1)
+    cache.put("q", "b", [], 1)
+    cache.get("q", "a", 1)
+    cache.put("q", "c", [], 1)
+    assert cache.get("q", "b", 1) is None
+    assert cache.get("q", "a", 1) == []
+
+    now[0] += 11
+    assert cache.get("q", "a", 1) is None
+    assert len(cache) == 1
+
+
+def test_merge_documents():
+    """Test ranking, threshold, de-duplication and truncation of merges."""
+    a = [
+        document("x", 0.4),
+        document("y", 0.9),
+    ]
+    b = [
+        document("x", 0.7),
+        document("z", 0.1),
+    ]
+
+    merged = merge_documents([a, b], max_results=5, min_score=0.2)
+    assert [(d.id, d.relevance_score) for d in merged] == [("y", 0.9), ("x", 0.7)]
+    assert len(merge_documents([a, b], max_results=1)) == 1
@@ -1,3 +1,5 @@
+import time
+
 import pytest
 import requests
 
@@ -8,6 +10,7 @@ from tatry.exceptions import (
     RetrieverConnectionError,
     RetrieverTimeoutError,
 )
+from tatry.retrievers.tatry.deadlines import current_deadline, deadline
 from tatry.retrievers.tatry.endpoints import TatryImplementation
 
 
@@ -49,6 +52,26 @@ def test_client_invalid_api_key():
         ClientImplementation(api_key=None)
 
 
+def test_session_reused_in_same_process(test_client):
+    """Test that the session is stable while the process does not change."""
+    assert test_client.session is test_client.session
+
+
+def test_session_rebuilt_after_fork(monkeypatch, test_client):
+    """Test that a forked child gets a fresh session but keeps its config."""
+    parent_session = test_client.session
+    config = test_client.config
+
+    child_pid = test_client._pid + 1
+    monkeypatch.setattr("os.getpid", lambda: child_pid)
+
+    child_session = test_client.session
+    assert child_session is not parent_session
+    assert child_session.headers["Authorization"] == "Bearer test_key"
+    assert test_client.config is config
+    assert test_client.session is child_session
+
+
 def test_request_auth_error(mock_responses, test_client):
     """Test handling of authentication errors."""
     mock_responses.add(
@@ -151,3 +174,64 @@ def test_request_non_json_response(mock_responses, test_client):
     with pytest.raises(RetrieverAPIError) as exc:
         test_client._request("GET", "/v1/test")
     assert "Request failed" in str(exc.value)
+
+
+def test_split_timeouts():
+    """Test that connect and read timeouts are applied separately."""
+    client = ClientImplementation(
+        api_key="test_key", connect_timeout=2, read_timeout=15
+    )
+    assert client._attempt_timeout(None) == (2, 15)
+
+
+def test_single_timeout_by_default(test_client):
+    """Test that a single timeout is used when no split is configured."""
+    assert test_client._attempt_timeout(None) == 30
+
+
+def test_deadline_caps_attempt_timeout():
+    """Test that each attempt gets at most the remaining budget."""
+    client = ClientImplementation(api_key="test_key", connect_timeout=0.5)
+    with deadline(1):
+        connect, read = client._attempt_timeout(current_deadline())
+    assert connect == 0.5
+    assert 0 < read <= 1
+
+
+def test_deadline_stops_retries(mock_responses, test_client):
+    """Test that a deadline stops retrying instead of sleeping past it."""
+    mock_responses.add(
+        mock_responses.GET,
+        "https://api.tatry.dev/v1/test",
+        body=requests.exceptions.ConnectionError(),
+    )
+
+    started = time.monotonic()
+    with deadline(1):
+        with pytest.raises(RetrieverConnectionError):
+            test_client._request("GET", "/v1/test")
+
+    assert time.monotonic() - started < 1
+    assert len(mock_responses.calls) == 1
+
+
+def test_expired_deadline(mock_responses, test_client):
+    """Test that no request is sent once the deadline has passed."""
+    with deadline(0):
+        with pytest.raises(RetrieverTimeoutError):
+            test_client._request("GET", "/v1/test")
+    assert len(mock_responses.calls) == 0
+
+
+def test_config_deadline(mock_responses):
+    """Test that Config.deadline applies to every call."""
+    client = ClientImplementation(api_key="test_key", deadline=0.5)
+    mock_responses.add(
+        mock_responses.GET,
+        "https://api.tatry.dev/v1/test",
+        body=requests.exceptions.Timeout(),
+    )
+
+    with pytest.raises(RetrieverTimeoutError):
+        client._request("GET", "/v1/test")
+    assert len(mock_responses.calls) == 1
@@ -0,0 +1,125 @@
+import time
+
+import pytest
+import requests
+
+from tatry.exceptions import RetrieverAPIError, RetrieverTimeoutError
+from tatry.retrievers.tatry import AdaptiveConcurrencyLimiter, TatryRetriever, deadline
+
+
+def run_request(limiter, latency=0.01, error=None):
+    """Acquire a slot, then release it as if a request took ``latency``."""
+    assert limiter.acquire(timeout=0)
+    started = time.monotonic() - latency
+    if error is None:
+        limiter.release(started, latency=latency)
+    else:
+        limiter.release(started, overloaded=True)
+
+
+def test_additive_increase_when_saturated():
+    """Test that the limit grows by about one per round at full use."""
+    limiter = AdaptiveConcurrencyLimiter(initial_limit=2)
+    for _ in range(4):
+        run_request(limiter)
+    assert limiter.limit == 2  # never saturated: one request at a time
+
+    for _ in range(3):
+        assert limiter.acquire(timeout=0)
+        assert limiter.acquire(timeout=0)
+        limiter.release(time.monotonic(), latency=0.01)
+        limiter.release(time.monotonic(), latency=0.01)
+    assert limiter.limit == 3
+
+
+def test_overload_cuts_once_per_round_trip():
+    """Test that simultaneous overload signals cut the limit once."""
+    limiter = AdaptiveConcurrencyLimiter(initial_limit=8, backoff=0.5)
+    started = time.monotonic()
+    for _ in range(3):
+        assert limiter.acquire(timeout=0)
+    for _ in range(3):
+        limiter.release(started, overloaded=True)
+    assert limiter.limit == 4
+
+
+def test_latency_spike_cuts_limit():
+    """Test that latency far above the baseline counts as congestion."""
+    limiter = AdaptiveConcurrencyLimiter(initial_limit=8, backoff=0.5)
+    run_request(limiter, latency=0.01)
+    run_request(limiter, latency=0.1)
+    assert limiter.limit == 4
+    assert limiter.baseline_latency == pytest.approx(0.01)
+
+
+def test_baselines_per_request_kind():
+    """Test that steady mixed fast and slow calls are not congestion."""
+    limiter = AdaptiveConcurrencyLimiter(initial_limit=16, backoff=0.5)
+    for _ in range(20):
+        for key, latency in (("/v1/retrieve", 0.01), ("/v1/retrieve/batch", 0.06)):
+            assert limiter.acquire(timeout=0)
+            limiter.release(time.monotonic(), latency=latency, key=key)
+    assert limiter.limit == 16
+    assert limiter.baselines == {
+        "/v1/retrieve": pytest.approx(0.01),
+        "/v1/retrieve/batch": pytest.approx(0.06),
+    }
+
+
+def test_limit_bounds():
+    """Test that the limit stays within its bounds."""
+    limiter = AdaptiveConcurrencyLimiter(initial_limit=2, min_limit=2)
+    run_request(limiter, error=True)
+    assert limiter.limit == 2
+
+
+def test_slot_times_out_when_full():
+    """Test that waiting for a slot honours the timeout."""
+    limiter = AdaptiveConcurrencyLimiter(initial_limit=1)
+    with limiter.slot():
+        with pytest.raises(RetrieverTimeoutError):
+            with limiter.slot(timeout=0.01):
+                pass
+    assert limiter.in_flight == 0
+
+
+def test_client_backs_off_on_429(mock_responses):
+    """Test that 429 responses seen by the client lower the limit."""
+    limiter = AdaptiveConcurrencyLimiter(initial_limit=8, backoff=0.5)
+    client = TatryRetriever(
+        api_key="test_key", max_retries=1, concurrency_limiter=limiter
+    )
+    mock_responses.add(
+        mock_responses.POST,
+        "https://api.tatry.dev/v1/retrieve/batch",
+        json={"error": "rate limited"},
+        status=429,
+    )
+
+    with pytest.raises(RetrieverAPIError):
+        client.batch_retrieve([{"query": "test"}])
+    assert limiter.limit == 4
+    assert limiter.in_flight == 0
+
+
+def test_transport_timeouts_cut_but_deadlines_do_not(mock_responses):
+    """Test that only timeouts before the caller's deadline count as overload."""
+    limiter = AdaptiveConcurrencyLimiter(initial_limit=8, backoff=0.5)
+    client = TatryRetriever(
+        api_key="test_key", max_retries=1, concurrency_limiter=limiter
+    )
+
+    with deadline(0):
+        with pytest.raises(RetrieverTimeoutError):
+            client.retrieve("test")
+    assert limiter.limit == 8
+
+    mock_responses.add(
+        mock_responses.POST,
+        "https://api.tatry.dev/v1/retrieve",
+        body=requests.exceptions.ReadTimeout(),
+    )
+    with pytest.raises(RetrieverTimeoutError):
+        client.retrieve("test")
+    assert limiter.limit == 4
+    assert limiter.in_flight == 0
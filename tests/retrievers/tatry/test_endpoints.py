@@ -5,6 +5,7 @@ from tatry.exceptions import RetrieverAPIError
 from tatry.models.auth import ValidateResponse
 from tatry.models.retrieve import BatchQueryResult, DocumentResponse
 from tatry.models.sources import Source
+from tatry.models.utils import UsageResponse
 
 
 def test_retrieve(mock_responses, tatry_client):
@@ -299,3 +300,26 @@ def test_retrieve_with_max_results(mock_responses, tatry_client):
 
     response = tatry_client.retrieve("test", max_results=5)
     assert isinstance(response, DocumentResponse)
+
+
+def test_get_usage(mock_responses, tatry_client):
+    """Test usage endpoint."""
+    mock_responses.add(
+        mock_responses.GET,
+        "https://api.tatry.dev/v1/usage?month=2024-01",
+        json={
+            "status": "success",
+            "data": {
+                "time_range": {"month": "2024-01"},
+                "usage": {
+                    "queries": {"total": 3, "by_source": {"source1": 3}},
+                    "documents": {"total": 12, "by_source": {"source1": 12}},
+                },
+            },
+        },
+    )
+
+    response = tatry_client.get_usage(month="2024-01")
+    assert isinstance(response, UsageResponse)
+    assert response.data.usage.queries.total == 3
+    assert response.data.usage.documents.by_source == {"source1": 12}
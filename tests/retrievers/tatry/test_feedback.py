@@ -0,0 +1,157 @@
+import gc
+import threading
+import time
+import weakref
+
+import pytest
+
+from tatry.exceptions import RetrieverAPIError, RetrieverConfigError
+from tatry.retrievers.tatry import FeedbackQueue
+
+
+class RecordingClient:
+    """Client stub recording submitted feedback."""
+
+    def __init__(self, fail=False, error=None):
+        self.submitted = []
+        self.fail = fail
+        self.error = error
+        self.release = threading.Event()
+        self.release.set()
+
+    def submit_feedback(self, feedback_type, description, metadata=None):
+        self.release.wait()
+        if self.fail:
+            raise RetrieverAPIError("failed", status_code=500)
+        if self.error is not None:
+            error, self.error = self.error, None
+            raise error
+        self.submitted.append((feedback_type, description, metadata))
+
+
+def test_submit_and_flush():
+    """Test that queued feedback is sent in the background and flushed."""
+    client = RecordingClient()
+    queue = FeedbackQueue(client, flush_interval=60)
+
+    assert queue.submit("rating", "good", {"score": 5})
+    assert queue.submit("rating", "bad")
+    assert queue.flush(timeout=5)
+
+    assert client.submitted == [
+        ("rating", "good", {"score": 5}),
+        ("rating", "bad", None),
+    ]
+    assert queue.sent == 2
+    queue.close()
+
+
+def test_failed_submissions_are_counted():
+    """Test that API errors are counted instead of raised."""
+    queue = FeedbackQueue(RecordingClient(fail=True))
+    queue.submit("rating", "good")
+    assert queue.flush(timeout=5)
+    assert queue.failed == 1
+    queue.close()
+
+
+@pytest.mark.parametrize(
+    "overflow, expected",
+    [("drop_newest", ["0", "1"]), ("drop_oldest", ["0", "2"])],
+)
+def test_overflow_policies(overflow, expected):
+    """Test drop policies when the queue is full."""
+    client = RecordingClient()
+    client.release.clear()
+    queue = FeedbackQueue(client, maxsize=1, batch_size=1, overflow=overflow)
+
+    queue.submit("rating", "0")
+    # Wait for the worker to pick up the first item and block on the client.
+    while len(queue):
+        time.sleep(0.001)
+    queue.submit("rating", "1")
+    queue.submit("rating", "2")
+    assert queue.dropped == 1
+
+    client.release.set()
+    assert queue.close(timeout=5)
+    assert [description for _, description, _ in client.submitted] == expected
+
+
+def test_block_policy_times_out():
+    """Test that the block policy applies backpressure with a timeout."""
+    client = RecordingClient()
+    client.release.clear()
+    queue = FeedbackQueue(client, maxsize=1, batch_size=1, overflow="block")
+
+    queue.submit("rating", "0")
+    while len(queue):
+        time.sleep(0.001)
+    queue.submit("rating", "1")
+    assert not queue.submit("rating", "2", timeout=0.05)
+
+    client.release.set()
+    queue.close(timeout=5)
+    assert len(client.submitted) == 2
+
+
+def test_unexpected_errors_keep_worker_alive():
+    """Test that errors other than API errors are counted and not fatal."""
+    client = RecordingClient(error=TypeError("not JSON serializable"))
+    queue = FeedbackQueue(client, batch_size=1)
+
+    queue.submit("rating", "broken")
+    assert queue.flush(timeout=5)
+    queue.submit("rating", "good")
+    assert queue.flush(timeout=5)
+
+    assert (queue.failed, queue.sent) == (1, 1)
+    queue.close()
+
+
+def test_blocked_submit_dropped_on_close():
+    """Test that a submit waiting for room is dropped when the queue closes."""
+    client = RecordingClient()
+    client.release.clear()
+    queue = FeedbackQueue(client, maxsize=1, batch_size=1, overflow="block")
+    queue.submit("rating", "0")
+    while len(queue):
+        time.sleep(0.001)
+    queue.submit("rating", "1")
+
+    results = []
+    blocked = threading.Thread(
+        target=lambda: results.append(queue.submit("rating", "2"))
+    )
+    blocked.start()
+    closer = threading.Thread(target=queue.close, kwargs={"timeout": 0.05})
+    closer.start()
+    blocked.join(5)
+    client.release.set()
+    closer.join(5)
+
+    assert results == [False]
+    assert "2" not in [description for _, description, _ in client.submitted]
+
+
+def test_queue_not_kept_alive_by_exit_hook():
+    """Test that an unused queue can be garbage collected."""
+    queue = FeedbackQueue(RecordingClient())
+    ref = weakref.ref(queue)
+    del queue
+    gc.collect()
+    assert ref() is None
+
+
+def test_closed_queue_drops():
+    """Test that feedback submitted after close is dropped."""
+    queue = FeedbackQueue(RecordingClient())
+    queue.close()
+    assert not queue.submit("rating", "late")
+    assert queue.dropped == 1
+
+
+def test_invalid_overflow_policy():
+    """Test that unknown overflow policies are rejected."""
+    with pytest.raises(RetrieverConfigError):
+        FeedbackQueue(RecordingClient(), overflow="ignore")
@@ -0,0 +1,130 @@
+import time
+
+import pytest
+from helpers import HEALTH_URL
+
+from tatry.exceptions import RetrieverUnavailableError
+from tatry.models.retrieve import DocumentResponse
+from tatry.retrievers.tatry import HealthMonitor, TatryRetriever
+from tatry.retrievers.tatry.health import HEALTHY, UNHEALTHY, UNKNOWN
+
+
+def add_health(mock_responses, status=200, state="healthy"):
+    mock_responses.add(
+        mock_responses.GET,
+        HEALTH_URL,
+        json={"status": "success", "data": {"status": state}},
+        status=status,
+    )
+
+
+def test_probe_marks_service_healthy(mock_responses, tatry_client):
+    """Test that a successful probe marks the service healthy."""
+    add_health(mock_responses)
+    monitor = HealthMonitor(tatry_client)
+
+    assert monitor.state == UNKNOWN
+    assert monitor.probe()
+    assert monitor.state == HEALTHY
+    assert monitor.healthy
+
+
+def test_unhealthy_after_threshold(mock_responses, tatry_client):
+    """Test that the state flips only after consecutive failed probes."""
+    add_health(mock_responses, status=503)
+    add_health(mock_responses, state="down")
+    monitor = HealthMonitor(tatry_client, failure_threshold=2)
+
+    assert not monitor.probe()
+    assert monitor.healthy
+    assert not monitor.probe()
+    assert monitor.state == UNHEALTHY
+    assert not monitor.healthy
+
+
+def test_interval_adapts(mock_responses, tatry_client):
+    """Test that probing backs off while healthy and speeds up on failure."""
+    for _ in range(4):
+        add_health(mock_responses)
+    add_health(mock_responses, status=503)
+    monitor = HealthMonitor(tatry_client, min_interval=1, max_interval=4)
+
+    intervals = []
+    for _ in range(5):
+        monitor.probe()
+        intervals.append(monitor.interval)
+    assert intervals == [1, 2, 4, 4, 1]
+
+
+def test_fail_fast_while_unhealthy(mock_responses, tatry_client):
+    """Test that calls fail without a request while the service is down."""
+    monitor = HealthMonitor(tatry_client)
+    monitor.state = UNHEALTHY
+    tatry_client.health_monitor = monitor
+
+    with pytest.raises(RetrieverUnavailableError):
+        tatry_client.retrieve("test")
+    assert len(mock_responses.calls) == 0
+
+
+def test_fail_over_while_unhealthy(mock_responses):
+    """Test that retrieve is routed to the fallback while the service is down."""
+    fallback = TatryRetriever(api_key="test_key", base_url="https://backup.test")
+    client = TatryRetriever(api_key="test_key", fallback=fallback)
+    client.health_monitor = HealthMonitor(client)
+    client.health_monitor.state = UNHEALTHY
+    mock_responses.add(
+        mock_responses.POST,
+        "https://backup.test/v1/retrieve",
+        json={"documents": [], "total": 0},
+    )
+
+    assert isinstance(client.retrieve("test"), DocumentResponse)
+
+
+def test_start_health_monitor(mock_responses, tatry_client):
+    """Test that the background monitor probes and can be stopped."""
+    add_health(mock_responses)
+    monitor = tatry_client.start_health_monitor(min_interval=60)
+    while monitor.last_checked is None:
+        time.sleep(0.001)
+    monitor.stop()
+
+    assert tatry_client.health_monitor is monitor
+    assert monitor.state == HEALTHY
+
+
+@pytest.mark.parametrize("status", [401, 404, 429])
+def test_client_errors_do_not_mark_unhealthy(mock_responses, tatry_client, status):
+    """Test that 4xx probe responses show the service is up."""
+    add_health(mock_responses, status=status)
+    add_health(mock_responses, status=status)
+    monitor = HealthMonitor(tatry_client, failure_threshold=2)
+
+    monitor.probe()
+    monitor.probe()
+
+    assert monitor.state == HEALTHY
+    assert monitor.healthy
+
+
+def test_monitor_survives_unexpected_errors(tatry_client):
+    """Test that an unexpected probe error does not end monitoring."""
+    monitor = HealthMonitor(tatry_client, min_interval=0.001, max_interval=0.001)
+    calls = []
+
+    def probe():
+        calls.append(1)
+        if len(calls) == 1:
+            raise RuntimeError("bug")
+        monitor.last_checked = time.monotonic()
+        return True
+
+    monitor.probe = probe
+    monitor.start()
+    give_up = time.monotonic() + 5
+    while len(calls) < 3 and time.monotonic() < give_up:
+        time.sleep(0.001)
+    monitor.stop()
+
+    assert len(calls) >= 3
@@ -0,0 +1,115 @@
+import json
+import ssl
+
+import pytest
+import requests
+from helpers import RETRIEVE_URL, make_document
+
+from tatry.exceptions import RetrieverConnectionError, RetrieverTimeoutError
+from tatry.retrievers.tatry import HTTP2Adapter, TatryRetriever
+from tatry.retrievers.tatry.http2 import _ssl_context
+
+httpx = pytest.importorskip("httpx")
+
+
+def make_client(handler, **kwargs):
+    """Client whose HTTP2Adapter talks to an httpx mock transport."""
+    adapter = HTTP2Adapter()
+    transport = httpx.MockTransport(handler)
+    adapter._client = lambda key: adapter._clients.setdefault(
+        key, httpx.AsyncClient(transport=transport)
+    )
+    client = TatryRetriever(api_key="test_key", adapter=adapter, **kwargs)
+    return client, adapter
+
+
+def retrieve_handler(request):
+    count = json.loads(request.content)["max_results"]
+    documents = [make_document(f"doc-{i}", content="x" * 100) for i in range(count)]
+    return httpx.Response(200, json={"documents": documents, "total": count})
+
+
+def test_retrieve_over_adapter():
+    """Test that requests and responses pass through the adapter intact."""
+    seen = []
+
+    def handler(request):
+        seen.append(request)
+        return retrieve_handler(request)
+
+    client, adapter = make_client(handler)
+    response = client.retrieve("test", max_results=3)
+
+    assert [d.id for d in response.documents] == ["doc-0", "doc-1", "doc-2"]
+    assert seen[0].headers["authorization"] == "Bearer test_key"
+    assert seen[0].url == RETRIEVE_URL
+    adapter.close()
+
+
+def test_streamed_response():
+    """Test that stream_threshold reads the body through the adapter."""
+    client, adapter = make_client(retrieve_handler, stream_threshold=0)
+    response = client.retrieve("test", max_results=500)
+    assert len(response.documents) == 500
+    adapter.close()
+
+
+@pytest.mark.parametrize(
+    "error, expected",
+    [
+        (httpx.ConnectError, RetrieverConnectionError),
+        (httpx.ReadTimeout, RetrieverTimeoutError),
+    ],
+)
+def test_errors_translated(error, expected):
+    """Test that httpx errors surface as the client's usual exceptions."""
+
+    def handler(request):
+        raise error("boom", request=request)
+
+    client, adapter = make_client(handler, max_retries=1)
+    with pytest.raises(expected):
+        client.retrieve("test")
+    adapter.close()
+
+
+def test_streamed_read_amount():
+    """Test that raw.read(amt) returns at most amt bytes and keeps the rest."""
+    _, adapter = make_client(lambda request: httpx.Response(200, content=b"abcdefgh"))
+    session = requests.Session()
+    session.mount("https://", adapter)
+
+    raw = session.get(RETRIEVE_URL, stream=True).raw
+    assert [raw.read(3), raw.read(3), raw.read(), raw.read(1)] == [
+        b"abc",
+        b"def",
+        b"gh",
+        b"",
+    ]
+    adapter.close()
+
+
+def test_tls_and_proxy_settings(monkeypatch):
+    """Test that verify, cert and proxies pick the client used for a request."""
+    monkeypatch.delenv("REQUESTS_CA_BUNDLE", raising=False)
+    monkeypatch.delenv("CURL_CA_BUNDLE", raising=False)
+    _, adapter = make_client(lambda request: httpx.Response(200, json={}))
+    session = requests.Session()
+    session.trust_env = False
+    session.mount("https://", adapter)
+    bundle = requests.certs.where()
+    proxy = "http://proxy.local:3128"
+
+    session.get(RETRIEVE_URL)
+    session.get(RETRIEVE_URL, verify=bundle, proxies={"https": proxy})
+    session.get(RETRIEVE_URL, verify=False)
+    assert [(k.verify, k.proxy) for k in adapter._clients] == [
+        (True, None),
+        (bundle, proxy),
+        (False, None),
+    ]
+    adapter.close()
+
+    assert _ssl_context(True, None) is True
+    assert _ssl_context(bundle, None).verify_mode == ssl.CERT_REQUIRED
+    assert _ssl_context(False, None) is False
@@ -0,0 +1,84 @@
+import gc
+import json
+
+from helpers import BATCH_URL, RETRIEVE_URL, document, make_document
+
+from tatry.retrievers.tatry import DocumentIdentityMap, TatryRetriever
+
+
+def test_copies_share_content():
+    """Test that equal copies share content and metadata but not scores."""
+    identity = DocumentIdentityMap()
+    first = identity.intern(document("a", 0.9))
+    second = identity.intern(document("a", 0.5))
+
+    assert second.content is first.content
+    assert second.metadata is first.metadata
+    assert (first.relevance_score, second.relevance_score) == (0.9, 0.5)
+    assert (identity.documents, identity.shared, len(identity)) == (2, 1, 1)
+    assert identity.bytes_saved > len(first.content)
+
+    # Interning an already shared document saves nothing more.
+    identity.intern(second)
+    assert identity.shared == 1
+
+
+def test_changed_content_replaces_entry():
+    """Test that a document whose content changed is not shared."""
+    identity = DocumentIdentityMap()
+    old = identity.intern(document("a", content="old"))
+    new = identity.intern(document("a", content="new"))
+    latest = identity.intern(document("a", content="new"))
+
+    assert new.content == "new" and old.content == "old"
+    assert latest.metadata is new.metadata
+    assert identity.shared == 1
+
+
+def test_entries_are_weak():
+    """Test that an ID is forgotten once no document uses its content."""
+    identity = DocumentIdentityMap()
+    first = identity.intern(document("a"))
+    second = identity.intern(document("a"))
+
+    # The entry survives the first document while a sharing copy lives.
+    del first
+    gc.collect()
+    assert len(identity) == 1
+
+    del second
+    gc.collect()
+    assert len(identity) == 0
+
+
+def test_client_interns_responses(mock_responses):
+    """Test that retrieve and batch responses share document instances."""
+    identity = DocumentIdentityMap()
+    client = TatryRetriever(api_key="test_key", identity_map=identity)
+    body = {"documents": [make_document("a"), make_document("b")], "total": 2}
+    mock_responses.add(mock_responses.POST, RETRIEVE_URL, json=body)
+    mock_responses.add(mock_responses.POST, RETRIEVE_URL, json=body)
+    batch = {"results": [{"query_id": 0, "documents": [make_document("b", 0.4)]}]}
+    mock_responses.add(mock_responses.POST, BATCH_URL, json=batch)
+
+    first = client.retrieve("one")
+    second = client.retrieve("two")
+    third = client.batch_retrieve([{"query": "three"}])
+
+    assert second.documents[0].content is first.documents[0].content
+    assert third[0].documents[0].metadata is first.documents[1].metadata
+    assert third[0].documents[0].relevance_score == 0.4
+    assert (identity.documents, identity.shared) == (5, 3)
+
+
+def test_projected_responses_not_interned(mock_responses):
+    """Test that projected documents bypass the map."""
+    identity = DocumentIdentityMap()
+    client = TatryRetriever(api_key="test_key", identity_map=identity)
+    body = {"documents": [{"id": "a", "relevance_score": 0.9}], "total": 1}
+    mock_responses.add(mock_responses.POST, RETRIEVE_URL, json=body)
+
+    client.retrieve("test", fields=["relevance_score"])
+
+    assert "fields" in json.loads(mock_responses.calls[0].request.body)
+    assert identity.documents == 0
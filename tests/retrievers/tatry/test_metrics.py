@@ -0,0 +1,174 @@
+import gc
+import threading
+
+import requests
+from helpers import RETRIEVE_URL, make_document
+
+from tatry.exceptions import RetrieverAPIError, RetrieverTimeoutError
+from tatry.retrievers.tatry import (
+    AdaptiveConcurrencyLimiter,
+    MetricsRegistry,
+    SourceResultCache,
+    TatryRetriever,
+)
+from tatry.retrievers.tatry.metrics import endpoint_label
+
+
+def test_counters_and_histograms_across_threads():
+    """Test that per-thread shards add up and export in text format."""
+    registry = MetricsRegistry(buckets=(0.1, 1.0))
+
+    def work():
+        for _ in range(1000):
+            registry.inc("tatry_retries_total", labels=(("endpoint", "/v1/x"),))
+        registry.observe("tatry_request_duration_seconds", 0.5)
+
+    threads = [threading.Thread(target=work) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    registry.observe("tatry_request_duration_seconds", 0.05)
+
+    assert registry.value("tatry_retries_total") == 4000
+    text = registry.export()
+    assert "# TYPE tatry_retries_total counter" in text
+    assert 'tatry_retries_total{endpoint="/v1/x"} 4000' in text
+    assert "# TYPE tatry_request_duration_seconds histogram" in text
+    assert 'tatry_request_duration_seconds_bucket{le="0.1"} 1' in text
+    assert 'tatry_request_duration_seconds_bucket{le="1"} 5' in text
+    assert 'tatry_request_duration_seconds_bucket{le="+Inf"} 5' in text
+    assert "tatry_request_duration_seconds_sum 2.05" in text
+    assert "tatry_request_duration_seconds_count 5" in text
+
+
+def test_label_values_escaped():
+    """Test that label values are escaped."""
+    registry = MetricsRegistry()
+    registry.inc("custom_total", labels=(("path", 'a"b\\c\n'),))
+    assert 'custom_total{path="a\\"b\\\\c\\n"} 1' in registry.export()
+    assert endpoint_label("/v1/sources/arxiv") == "/v1/sources/{id}"
+
+
+def test_client_records_requests(mock_responses):
+    """Test request, size, document, cache and pool metrics."""
+    registry = MetricsRegistry()
+    client = TatryRetriever(
+        api_key="test_key",
+        max_retries=1,
+        metrics=registry,
+        source_cache=SourceResultCache(),
+    )
+    body = {"documents": [make_document("a"), make_document("b")], "total": 2}
+    mock_responses.add(mock_responses.POST, RETRIEVE_URL, json=body)
+    mock_responses.add(mock_responses.POST, RETRIEVE_URL, status=500, json={})
+
+    client.retrieve("test")
+    try:
+        client.retrieve("test")
+    except RetrieverAPIError:
+        pass
+
+    ok = {"endpoint": "/v1/retrieve", "method": "POST", "status": "200"}
+    assert registry.value("tatry_requests_total", **ok) == 1
+    assert registry.value("tatry_requests_total", status="500") == 1
+    assert registry.value("tatry_requests_in_flight") == 0
+    assert registry.value("tatry_documents_returned_total") == 2
+    sent = len(mock_responses.calls[0].request.body)
+    assert registry.value("tatry_request_bytes_total") == sent * 2
+    assert registry.value("tatry_response_bytes_total") > 0
+
+    text = registry.export()
+    assert 'tatry_request_duration_seconds_count{endpoint="/v1/retrieve"' in text
+    assert 'tatry_cache_lookups_total{cache="source",result="miss"} 0' in text
+    assert 'tatry_cache_hit_ratio{cache="source"} 0' in text
+    assert "tatry_pool_connections_max" in text
+
+
+def test_shared_registry_ratios():
+    """Test that ratios are computed from counts summed over clients."""
+    registry = MetricsRegistry()
+    clients = [
+        TatryRetriever(api_key="test_key", metrics=registry, source_cache=cache)
+        for cache in (SourceResultCache(), SourceResultCache())
+    ]
+    clients[0].source_cache.hits, clients[0].source_cache.misses = 3, 1
+    clients[1].source_cache.hits, clients[1].source_cache.misses = 1, 3
+
+    assert registry.value("tatry_cache_lookups_total", cache="source") == 8
+    assert registry.value("tatry_cache_hit_ratio", cache="source") == 0.5
+    assert 0 <= registry.value("tatry_pool_utilization") <= 1
+
+
+def test_concurrency_limiter_gauges():
+    """Test that the limiter's limit and slots in use are exported."""
+    registry = MetricsRegistry()
+    assert registry.value("tatry_concurrency_limit") == 0
+    limiter = AdaptiveConcurrencyLimiter(initial_limit=6)
+    client = TatryRetriever(
+        api_key="test_key", metrics=registry, concurrency_limiter=limiter
+    )
+
+    with limiter.slot():
+        assert registry.value("tatry_concurrency_limit") == 6
+        assert registry.value("tatry_concurrency_in_flight") == 1
+        assert "tatry_concurrency_in_flight 1" in registry.export()
+    assert registry.value("tatry_concurrency_in_flight") == 0
+    # The registry holds clients weakly; keep this one alive until here.
+    assert client.concurrency_limiter is limiter
+
+
+def test_finished_thread_shards_folded():
+    """Test that shards of finished threads are merged, keeping their counts."""
+    registry = MetricsRegistry()
+    for _ in range(20):
+        thread = threading.Thread(
+            target=registry.observe, args=("tatry_request_duration_seconds", 0.2)
+        )
+        thread.start()
+        thread.join()
+    registry.inc("tatry_retries_total")
+
+    assert len(registry._shards) <= 3
+    _, histograms = registry.snapshot()
+    assert sum(histograms[("tatry_request_duration_seconds", ())].counts) == 20
+    assert registry.value("tatry_retries_total") == 1
+
+
+def test_registry_does_not_keep_clients_alive():
+    """Test that a client's collector is dropped with the client."""
+    registry = MetricsRegistry()
+    client = TatryRetriever(
+        api_key="test_key", metrics=registry, source_cache=SourceResultCache()
+    )
+    assert "tatry_cache_lookups_total" in registry.export()
+
+    del client
+    gc.collect()
+
+    assert "tatry_cache_lookups_total" not in registry.export()
+    assert registry._collectors == []
+
+
+def test_retries_and_timeouts(mock_responses, monkeypatch):
+    """Test that retries and timeouts are counted."""
+    monkeypatch.setattr("tenacity.nap.time.sleep", lambda seconds: None)
+    registry = MetricsRegistry()
+    client = TatryRetriever(api_key="test_key", max_retries=3, metrics=registry)
+    mock_responses.add(
+        mock_responses.POST, RETRIEVE_URL, body=requests.exceptions.ReadTimeout()
+    )
+
+    try:
+        client.retrieve("test")
+    except RetrieverTimeoutError:
+        pass
+
+    assert registry.value("tatry_retries_total", endpoint="/v1/retrieve") == 2
+    assert registry.value("tatry_timeouts_total") == 3
+    assert registry.value("tatry_requests_total", status="timeout") == 3
+
+
+def test_disabled_by_default():
+    """Test that clients record nothing without a registry."""
+    assert TatryRetriever(api_key="test_key").metrics is None
@@ -0,0 +1,139 @@
+import json
+
+import responses
+from helpers import BATCH_URL, RETRIEVE_URL, make_document
+
+from tatry.retrievers.tatry import (
+    QueryCanonicalizer,
+    SourceResultCache,
+    TatryRetriever,
+    measure_hit_rate,
+)
+from tatry.retrievers.tatry.normalization import collapse_whitespace, lowercase
+
+
+def test_trivial_variations_share_a_key():
+    """Test that case, whitespace, punctuation and source order are ignored."""
+    canonicalizer = QueryCanonicalizer()
+
+    first = canonicalizer.canonicalize("What is RAG?", 5, ["b", "a"])
+    second = canonicalizer.canonicalize("  what   is rag ", 5, ["a", "b", "a"])
+
+    assert first == second
+    assert first.query == "what is rag"
+    assert first.sources == ("a", "b")
+
+
+def test_custom_normalizers():
+    """Test that only the configured normalizers are applied."""
+    canonicalizer = QueryCanonicalizer([lowercase], sort_sources=False)
+    key = canonicalizer.canonicalize("Hello,  World", sources=["b", "a"])
+    assert key.query == "hello,  world"
+    assert key.sources == ("b", "a")
+
+
+def test_canonicalize_request_extra_fields():
+    """Test that batch query dicts keep extra fields in the key."""
+    key = QueryCanonicalizer().canonicalize_request(
+        {"query": "Test", "max_results": 3, "filter": {"lang": "en"}}
+    )
+    assert key.query == "test"
+    assert key.sources == ()
+    assert key.max_results == 3
+    assert json.loads(key.extra) == {"filter": {"lang": "en"}}
+
+
+def test_measure_hit_rate():
+    """Test that the report shows the gain of each normalizer."""
+    log = [
+        {"query": "Paris", "sources": ["a", "b"]},
+        {"query": "paris", "sources": ["b", "a"]},
+        {"query": "paris ", "sources": ["a", "b"]},
+        {"query": "London"},
+    ]
+    report = measure_hit_rate(log, QueryCanonicalizer([lowercase, collapse_whitespace]))
+
+    assert report.total == 4
+    assert report.raw_hit_rate == 0.0
+    assert report.normalized_hit_rate == 0.5
+    assert report.by_normalizer == [
+        ("sources", 0.0),
+        ("lowercase", 0.25),
+        ("collapse_whitespace", 0.5),
+    ]
+    assert report.improvement == 0.5
+
+
+def test_retrieve_sends_original_query(mock_responses):
+    """Test that retrieve sends the query as written, not its canonical form."""
+    client = TatryRetriever(api_key="test_key", canonicalizer=QueryCanonicalizer())
+    mock_responses.add(
+        mock_responses.POST,
+        RETRIEVE_URL,
+        match=[
+            responses.matchers.json_params_matcher(
+                {"query": "Hello,  World!", "max_results": 5, "sources": ["b", "a"]}
+            )
+        ],
+        json={"documents": [], "total": 0},
+    )
+
+    client.retrieve("Hello,  World!", sources=["b", "a"])
+
+
+def test_source_cache_keyed_by_canonical_query(mock_responses):
+    """Test that equivalent spellings share per-source cache entries."""
+    client = TatryRetriever(
+        api_key="test_key",
+        canonicalizer=QueryCanonicalizer(),
+        source_cache=SourceResultCache(),
+    )
+    mock_responses.add(
+        mock_responses.POST,
+        BATCH_URL,
+        json={"results": [{"query_id": 0, "documents": [make_document("a")]}]},
+    )
+
+    client.retrieve("Hello,  World!", sources=["a"])
+    response = client.retrieve("hello world", sources=["a"])
+
+    sent = json.loads(mock_responses.calls[0].request.body)["queries"][0]
+    assert sent["query"] == "Hello,  World!"
+    assert len(mock_responses.calls) == 1
+    assert response.documents[0].id == "a"
+
+
+def test_batch_retrieve_deduplicates_queries(mock_responses):
+    """Test that equivalent batch queries are sent once and fanned out."""
+    client = TatryRetriever(api_key="test_key", canonicalizer=QueryCanonicalizer())
+    mock_responses.add(
+        mock_responses.POST,
+        BATCH_URL,
+        match=[
+            responses.matchers.json_params_matcher(
+                {
+                    "queries": [
+                        {"query": "Paris", "max_results": 1},
+                        {"query": "London", "max_results": 1},
+                    ]
+                }
+            )
+        ],
+        json={
+            "results": [
+                {"query_id": 0, "documents": [make_document("p")]},
+                {"query_id": 1, "documents": [make_document("l")]},
+            ]
+        },
+    )
+
+    results = client.batch_retrieve(
+        [
+            {"query": "Paris", "max_results": 1},
+            {"query": "London", "max_results": 1},
+            {"query": "paris!", "max_results": 1},
+        ]
+    )
+
+    assert [result.query_id for result in results] == [0, 1, 2]
+    assert [result.documents[0].id for result in results] == ["p", "l", "p"]
@@ -0,0 +1,133 @@
+import itertools
+import json
+import time
+from itertools import islice
+
+import pytest
+from helpers import BATCH_URL, RETRIEVE_URL, make_document
+
+from tatry.exceptions import RetrieverAPIError
+from tatry.retrievers.tatry import PriorityScheduler, TatryRetriever, priority
+
+
+def batch_callback(request):
+    queries = json.loads(request.body)["queries"]
+    results = [
+        {"query_id": i, "documents": [make_document(f"doc-{q['query']}")]}
+        for i, q in enumerate(queries)
+    ]
+    return 200, {}, json.dumps({"results": results})
+
+
+def retrieve_callback(request):
+    query = json.loads(request.body)["query"]
+    if query == "slow":
+        time.sleep(0.2)
+    return (
+        200,
+        {},
+        json.dumps({"documents": [make_document(f"doc-{query}")], "total": 1}),
+    )
+
+
+def test_results_in_input_order(mock_responses, tatry_client):
+    """Test batching and ordered results for mixed string and dict input."""
+    mock_responses.add_callback(mock_responses.POST, BATCH_URL, callback=batch_callback)
+    queries = ["a", {"query": "b", "max_results": 1}, "c", "d", "e"]
+
+    results = list(tatry_client.retrieve_many(queries, batch_size=2, concurrency=3))
+
+    assert [r.index for r in results] == [0, 1, 2, 3, 4]
+    assert [r.documents[0].id for r in results] == [f"doc-{q}" for q in "abcde"]
+    assert results[1].request == {"query": "b", "max_results": 1}
+    assert all(r.error is None and r.latency >= 0 for r in results)
+    assert len(mock_responses.calls) == 3
+
+
+def test_completion_order(mock_responses, tatry_client):
+    """Test that unordered mode yields fast results before slow ones."""
+    mock_responses.add_callback(
+        mock_responses.POST, RETRIEVE_URL, callback=retrieve_callback
+    )
+
+    results = tatry_client.retrieve_many(
+        ["slow", "fast"], batch_size=1, concurrency=2, ordered=False
+    )
+
+    assert [r.request["query"] for r in results] == ["fast", "slow"]
+
+
+def test_input_consumed_lazily(mock_responses, tatry_client):
+    """Test that an endless input is only read a bounded distance ahead."""
+    mock_responses.add_callback(mock_responses.POST, BATCH_URL, callback=batch_callback)
+    pulled = itertools.count()
+    queries = (f"q{next(pulled)}" for _ in itertools.count())
+
+    results = tatry_client.retrieve_many(queries, batch_size=3, concurrency=2)
+    assert [r.index for r in islice(results, 4)] == [0, 1, 2, 3]
+    results.close()
+
+    # The window of 2 workers * 2 batches, plus one refill, of 3 queries each.
+    assert next(pulled) == (2 * 2 + 1) * 3
+
+
+def test_errors_raised_or_returned(mock_responses):
+    """Test that failures raise by default and are yielded on request."""
+    client = TatryRetriever(api_key="test_key", max_retries=1)
+    mock_responses.add(mock_responses.POST, RETRIEVE_URL, json={}, status=400)
+    mock_responses.add(mock_responses.POST, RETRIEVE_URL, json={}, status=400)
+
+    with pytest.raises(RetrieverAPIError):
+        list(client.retrieve_many(["bad"], batch_size=1))
+
+    (result,) = client.retrieve_many(["bad"], batch_size=1, return_exceptions=True)
+    assert result.documents is None
+    assert isinstance(result.error, RetrieverAPIError)
+
+
+def test_calling_context_applies(mock_responses):
+    """Test that the caller's priority class reaches the worker threads."""
+    scheduler = PriorityScheduler(capacity=4)
+    client = TatryRetriever(api_key="test_key", scheduler=scheduler)
+    seen = []
+
+    def callback(request):
+        seen.append(scheduler.in_flight["interactive"])
+        return batch_callback(request)
+
+    mock_responses.add_callback(mock_responses.POST, BATCH_URL, callback=callback)
+
+    with priority("interactive"):
+        list(client.retrieve_many(["a", "b"], batch_size=2))
+    assert seen == [1]
+
+
+def test_single_queries_run_as_bulk(mock_responses):
+    """Test that batch_size=1 retrieves use the bulk priority class."""
+    scheduler = PriorityScheduler(capacity=4)
+    client = TatryRetriever(api_key="test_key", scheduler=scheduler)
+    seen = []
+
+    def callback(request):
+        seen.append(dict(scheduler.in_flight))
+        return retrieve_callback(request)
+
+    mock_responses.add_callback(mock_responses.POST, RETRIEVE_URL, callback=callback)
+
+    list(client.retrieve_many(["a"], batch_size=1))
+    assert seen[0]["bulk"] == 1
+    assert seen[0].get("interactive", 0) == 0
+
+
+def test_unexpected_errors_returned(tatry_client, monkeypatch):
+    """Test that return_exceptions also covers errors other than API errors."""
+
+    def broken(*args, **kwargs):
+        raise TypeError("not JSON serializable")
+
+    monkeypatch.setattr(tatry_client, "retrieve", broken)
+    (result,) = tatry_client.retrieve_many(["a"], batch_size=1, return_exceptions=True)
+    assert isinstance(result.error, TypeError)
+
+    with pytest.raises(TypeError):
+        list(tatry_client.retrieve_many(["a"], batch_size=1))
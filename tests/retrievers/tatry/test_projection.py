@@ -0,0 +1,110 @@
+import json
+
+import pytest
+from helpers import BATCH_URL, RETRIEVE_URL, make_document
+
+from tatry.exceptions import RetrieverConfigError
+from tatry.models.projection import normalize_fields, projection
+from tatry.retrievers.tatry import QueryCanonicalizer, TatryRetriever, UsageMeter
+
+
+def retrieve_callback(request):
+    """Ignore the projection and return full documents, as an older API would."""
+    count = json.loads(request.body)["max_results"]
+    documents = [make_document(f"doc-{i}", 1 - i / 100) for i in range(count)]
+    return 200, {}, json.dumps({"documents": documents, "total": count})
+
+
+def batch_callback(request):
+    queries = json.loads(request.body)["queries"]
+    results = [
+        {"query_id": i, "documents": [make_document(f"{q['query']}-0")]}
+        for i, q in enumerate(queries)
+    ]
+    return 200, {}, json.dumps({"results": results})
+
+
+def test_normalize_fields():
+    """Test that field lists are validated and canonicalized."""
+    assert normalize_fields(["metadata.citation", "relevance_score"]) == (
+        "id",
+        "relevance_score",
+        "metadata.citation",
+    )
+    assert "metadata.source" in normalize_fields(["metadata"])
+    with pytest.raises(RetrieverConfigError):
+        normalize_fields(["body"])
+    fields = normalize_fields(["content"])
+    assert projection(fields) is projection(fields)
+
+
+@pytest.mark.parametrize("stream_threshold", [None, 0])
+def test_projected_retrieve(mock_responses, stream_threshold):
+    """Test that only the projected fields are requested and kept."""
+    meter = UsageMeter()
+    client = TatryRetriever(
+        api_key="test_key", stream_threshold=stream_threshold, usage_meter=meter
+    )
+    mock_responses.add_callback(
+        mock_responses.POST, RETRIEVE_URL, callback=retrieve_callback
+    )
+
+    response = client.retrieve(
+        "test", max_results=3, fields=["relevance_score", "metadata.citation"]
+    )
+
+    sent = json.loads(mock_responses.calls[0].request.body)
+    assert sent["fields"] == ["id", "relevance_score", "metadata.citation"]
+    first = response.documents[0]
+    assert (first.id, first.relevance_score) == ("doc-0", 1.0)
+    assert first.metadata.citation == "Document doc-0"
+    assert not hasattr(first, "content")
+    assert not hasattr(first.metadata, "source")
+    assert meter.snapshot().documents.total == 3
+
+
+def test_fetch_content(mock_responses):
+    """Test that full documents are fetched for the kept IDs."""
+    client = TatryRetriever(api_key="test_key")
+    mock_responses.add_callback(
+        mock_responses.POST, RETRIEVE_URL, callback=retrieve_callback
+    )
+
+    response = client.retrieve("test", max_results=5, fields=["relevance_score"])
+    full = client.fetch_content(response, ids=["doc-3", "doc-1", "missing"])
+
+    assert [d.id for d in full] == ["doc-3", "doc-1"]
+    assert full[0].content == "content doc-3"
+    assert "fields" not in json.loads(mock_responses.calls[1].request.body)
+    assert len(client.fetch_content(response)) == 5
+
+    with pytest.raises(RetrieverConfigError):
+        client.fetch_content(client.retrieve("test"))
+
+
+def test_projected_batch(mock_responses):
+    """Test projected batches, including canonicalizer fan-out."""
+    client = TatryRetriever(api_key="test_key", canonicalizer=QueryCanonicalizer())
+    mock_responses.add_callback(mock_responses.POST, BATCH_URL, callback=batch_callback)
+    mock_responses.add_callback(
+        mock_responses.POST, RETRIEVE_URL, callback=retrieve_callback
+    )
+
+    queries = [
+        {"query": "a", "max_results": 1},
+        {"query": "A!", "max_results": 1},
+        {"query": "b", "max_results": 1},
+    ]
+    results = client.batch_retrieve(queries, fields=["metadata.citation"])
+
+    sent = json.loads(mock_responses.calls[0].request.body)
+    assert sent["fields"] == ["id", "metadata.citation"]
+    assert len(sent["queries"]) == 2
+    assert [r.query_id for r in results] == [0, 1, 2]
+    assert results[1].documents[0].metadata.citation == "Document a-0"
+    assert not hasattr(results[1].documents[0], "relevance_score")
+    assert results[1]._request == queries[1]
+
+    # The unprojected retrieve reuses the original query of that position.
+    client.fetch_content(results[1])
+    assert json.loads(mock_responses.calls[1].request.body)["query"] == "A!"
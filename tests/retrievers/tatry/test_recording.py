@@ -0,0 +1,101 @@
+import gzip
+import json
+
+import pytest
+import requests
+
+from tatry.exceptions import RetrieverConfigError
+from tatry.models.retrieve import DocumentResponse
+from tatry.retrievers.tatry import RecordingAdapter, ReplayAdapter, TatryRetriever
+
+RETRIEVE_RESPONSE = {
+    "documents": [
+        {
+            "id": "doc1",
+            "content": "Test content",
+            "metadata": {
+                "source": "test",
+                "published_date": "2024-01-01",
+                "citation": "Test Document",
+            },
+            "relevance_score": 0.95,
+        }
+    ],
+    "total": 1,
+}
+
+
+@pytest.fixture
+def recording(tmp_path, mock_responses):
+    """Fixture recording one retrieve exchange and returning the file path."""
+    path = str(tmp_path / "exchanges.jsonl.gz")
+    mock_responses.add(
+        mock_responses.POST,
+        "https://api.tatry.dev/v1/retrieve",
+        json=RETRIEVE_RESPONSE,
+    )
+    adapter = RecordingAdapter(path)
+    client = TatryRetriever(api_key="test_key", adapter=adapter)
+    client.retrieve("test query", sources=["test"])
+    adapter.close()
+    return path
+
+
+def test_recording_writes_exchange(recording):
+    """Test that the exchange is written as one compact JSON line."""
+    with gzip.open(recording, "rt") as f:
+        records = [json.loads(line) for line in f]
+
+    assert len(records) == 1
+    assert records[0]["method"] == "POST"
+    assert records[0]["url"] == "/v1/retrieve"
+    assert records[0]["request"]["query"] == "test query"
+    assert records[0]["response"] == RETRIEVE_RESPONSE
+    assert records[0]["elapsed"] >= 0
+
+
+def test_replay_serves_recorded_response(recording):
+    """Test that a replayed client returns the recorded documents offline."""
+    client = TatryRetriever(
+        api_key="test_key",
+        base_url="http://offline.invalid",
+        adapter=ReplayAdapter(recording),
+    )
+
+    response = client.retrieve("test query", sources=["test"])
+    assert isinstance(response, DocumentResponse)
+    assert response.documents[0].id == "doc1"
+
+
+def test_replay_latency_respects_read_timeout(tmp_path):
+    """Test that injected latency beyond the read timeout raises a timeout."""
+    path = tmp_path / "slow.jsonl"
+    path.write_text(
+        json.dumps(
+            {
+                "method": "GET",
+                "url": "/v1/health",
+                "request": None,
+                "status": 200,
+                "response": {"status": "ok", "data": {}},
+                "elapsed": 10.0,
+            }
+        )
+    )
+    adapter = ReplayAdapter(str(path), latency_scale=0.001)
+    client = TatryRetriever(api_key="test_key", adapter=adapter)
+    assert client.check_health().status == "ok"
+
+    adapter.latency_scale = 1.0
+    session = requests.Session()
+    session.mount("https://", adapter)
+    with pytest.raises(requests.exceptions.ReadTimeout):
+        session.get("https://api.tatry.dev/v1/health", timeout=0.01)
+
+
+def test_replay_requires_recordings(tmp_path):
+    """Test that an empty recording is rejected."""
+    path = tmp_path / "empty.jsonl"
+    path.write_text("")
+    with pytest.raises(RetrieverConfigError):
+        ReplayAdapter(str(path))
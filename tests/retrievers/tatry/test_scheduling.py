@@ -0,0 +1,147 @@
+import json
+import threading
+import time
+
+import pytest
+from helpers import BATCH_URL
+
+from tatry.exceptions import RetrieverConfigError, RetrieverTimeoutError
+from tatry.retrievers.tatry import (
+    PriorityClass,
+    PriorityScheduler,
+    TatryRetriever,
+    priority,
+)
+
+
+def drain(scheduler, names):
+    """Queue one waiter per name behind a held slot and return grant order."""
+    order = []
+
+    def worker(name):
+        with scheduler.slot(name):
+            order.append(name)
+
+    assert scheduler.acquire("hold")
+    threads = []
+    for name in names:
+        thread = threading.Thread(target=worker, args=(name,))
+        thread.start()
+        threads.append(thread)
+        # Queue waiters one at a time so FIFO order within a class is fixed.
+        while sum(scheduler.waiting.values()) < len(threads):
+            time.sleep(0.001)
+    scheduler.release("hold")
+    for thread in threads:
+        thread.join()
+    return order
+
+
+def test_interactive_goes_first():
+    """Test that waiting interactive requests overtake queued bulk ones."""
+    scheduler = PriorityScheduler(
+        capacity=1,
+        classes={
+            "hold": PriorityClass(),
+            "interactive": PriorityClass(weight=8),
+            "bulk": PriorityClass(weight=1),
+        },
+    )
+    order = drain(scheduler, ["bulk", "bulk", "interactive", "interactive"])
+    assert order == ["interactive", "interactive", "bulk", "bulk"]
+
+
+def test_weighted_fair_share():
+    """Test that backlogged classes share capacity by weight."""
+    scheduler = PriorityScheduler(
+        capacity=1,
+        classes={
+            "hold": PriorityClass(),
+            "interactive": PriorityClass(weight=2),
+            "bulk": PriorityClass(weight=1),
+        },
+    )
+    order = drain(scheduler, ["bulk"] * 3 + ["interactive"] * 6)
+    assert order[:6].count("bulk") == 2
+    assert sorted(order) == sorted(["bulk"] * 3 + ["interactive"] * 6)
+
+
+def test_class_cap_leaves_room_for_interactive():
+    """Test that a class cap keeps bulk traffic from filling the pool."""
+    scheduler = PriorityScheduler(capacity=4)
+    assert scheduler.classes["bulk"].max_concurrency == 2
+    for _ in range(2):
+        assert scheduler.acquire("bulk", timeout=0)
+    assert not scheduler.acquire("bulk", timeout=0.01)
+    assert scheduler.acquire("interactive", timeout=0)
+    assert scheduler.in_flight == {"interactive": 1, "bulk": 2}
+    assert scheduler.waiting == {"interactive": 0, "bulk": 0}
+
+    with pytest.raises(RetrieverTimeoutError):
+        with scheduler.slot("bulk", timeout=0.01):
+            pass
+
+
+def test_unknown_class():
+    """Test that an unknown priority class is a configuration error."""
+    scheduler = PriorityScheduler()
+    with pytest.raises(RetrieverConfigError):
+        with priority("urgent"):
+            scheduler.acquire(timeout=0)
+
+
+def test_client_classifies_requests(mock_responses):
+    """Test that batches run as bulk traffic and retrieve as interactive."""
+    scheduler = PriorityScheduler(capacity=4)
+    client = TatryRetriever(api_key="test_key", scheduler=scheduler)
+    seen = []
+
+    def callback(request):
+        seen.append(scheduler.in_flight)
+        return 200, {}, '{"documents": [], "total": 0, "results": []}'
+
+    mock_responses.add_callback(
+        mock_responses.POST, "https://api.tatry.dev/v1/retrieve", callback=callback
+    )
+    mock_responses.add_callback(
+        mock_responses.POST,
+        "https://api.tatry.dev/v1/retrieve/batch",
+        callback=callback,
+    )
+
+    client.retrieve("test")
+    client.batch_retrieve([{"query": "test"}])
+    with priority("interactive"):
+        client.batch_retrieve([{"query": "test"}])
+
+    assert seen == [
+        {"interactive": 1, "bulk": 0},
+        {"interactive": 0, "bulk": 1},
+        {"interactive": 1, "bulk": 0},
+    ]
+    assert scheduler.in_flight == {"interactive": 0, "bulk": 0}
+
+
+def test_custom_class_names(mock_responses):
+    """Test that bulk work runs in the scheduler's bulk class when renamed."""
+    classes = {"high": PriorityClass(weight=8.0), "low": PriorityClass(weight=1.0)}
+    scheduler = PriorityScheduler(capacity=4, classes=classes, default="high")
+    assert scheduler.bulk == "high"
+    scheduler = PriorityScheduler(
+        capacity=4, classes=classes, default="high", bulk="low"
+    )
+    client = TatryRetriever(api_key="test_key", scheduler=scheduler)
+    seen = []
+
+    def callback(request):
+        seen.append(scheduler.in_flight)
+        return 200, {}, json.dumps({"results": [{"query_id": 0, "documents": []}]})
+
+    mock_responses.add_callback(mock_responses.POST, BATCH_URL, callback=callback)
+
+    client.batch_retrieve([{"query": "test"}])
+    assert len(list(client.retrieve_many(["test"]))) == 1
+
+    assert seen == [{"high": 0, "low": 1}, {"high": 0, "low": 1}]
+    with pytest.raises(RetrieverConfigError):
+        PriorityScheduler(classes=classes, default="high", bulk="bulk")
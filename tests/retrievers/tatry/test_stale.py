@@ -0,0 +1,207 @@
+import threading
+
+import pytest
+
+from tatry.exceptions import (
+    RetrieverAPIError,
+    RetrieverAuthError,
+    RetrieverConfigError,
+    RetrieverTimeoutError,
+)
+from tatry.retrievers.tatry import (
+    QueryCanonicalizer,
+    StaleWhileRevalidateCache,
+    TatryRetriever,
+)
+from tatry.retrievers.tatry import cache as cache_module
+from tatry.retrievers.tatry.scheduling import current_priority
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(cache_module, "time", clock)
+    return clock
+
+
+def settle(cache):
+    """Wait for background refreshes to finish."""
+    for future in list(cache._pending.values()):
+        try:
+            future.result(timeout=5)
+        except Exception:
+            pass
+
+
+def test_stale_entries_served_while_refreshing(clock):
+    """Test that stale values return at once and are refreshed once."""
+    cache = StaleWhileRevalidateCache(soft_ttl=10, hard_ttl=100)
+    release = threading.Event()
+    calls = []
+
+    def fetch():
+        calls.append(current_priority())
+        if len(calls) > 1:
+            release.wait(5)
+        return len(calls)
+
+    assert cache.get_or_fetch("k", fetch) == 1
+    assert cache.get_or_fetch("k", fetch) == 1
+    assert (cache.hits, cache.misses) == (1, 1)
+
+    clock.now += 50
+    # Every stale read returns immediately; only one refresh is started.
+    assert [cache.get_or_fetch("k", fetch) for _ in range(5)] == [1] * 5
+    release.set()
+    settle(cache)
+    assert calls == [None, "bulk"]
+    assert cache.stale_hits == 5
+
+    assert cache.get_or_fetch("k", fetch) == 2
+
+
+def test_concurrent_misses_fetch_once(clock):
+    """Test that callers of a missing key share one fetch."""
+    cache = StaleWhileRevalidateCache()
+    started = threading.Event()
+    release = threading.Event()
+    calls = []
+
+    def fetch():
+        calls.append(1)
+        started.set()
+        release.wait(5)
+        return "value"
+
+    results = []
+    first = threading.Thread(
+        target=lambda: results.append(cache.get_or_fetch("k", fetch))
+    )
+    first.start()
+    started.wait(5)
+    second = threading.Thread(
+        target=lambda: results.append(cache.get_or_fetch("k", fetch))
+    )
+    second.start()
+    release.set()
+    first.join(5)
+    second.join(5)
+
+    assert results == ["value", "value"]
+    assert len(calls) == 1
+
+
+def test_stale_if_error(clock):
+    """Test that expired entries mask transient errors within the window."""
+    cache = StaleWhileRevalidateCache(soft_ttl=10, hard_ttl=100, stale_if_error=50)
+    cache.get_or_fetch("k", lambda: "old")
+
+    def fail(error):
+        def fetch():
+            raise error
+
+        return fetch
+
+    clock.now += 120
+    assert cache.get_or_fetch("k", fail(RetrieverTimeoutError("slow"))) == "old"
+    assert cache.get_or_fetch("k", fail(RetrieverAPIError("down", 503))) == "old"
+    assert cache.errors_masked == 2
+    with pytest.raises(RetrieverAuthError):
+        cache.get_or_fetch("k", fail(RetrieverAuthError("bad key", 401)))
+    with pytest.raises(RetrieverAPIError):
+        cache.get_or_fetch("k", fail(RetrieverAPIError("bad request", 400)))
+
+    clock.now += 40
+    with pytest.raises(RetrieverTimeoutError):
+        cache.get_or_fetch("k", fail(RetrieverTimeoutError("slow")))
+    assert len(cache) == 0
+
+
+def test_failed_refresh_keeps_entry(clock):
+    """Test that a failed background refresh leaves the stale value."""
+    cache = StaleWhileRevalidateCache(soft_ttl=10, hard_ttl=100)
+    cache.get_or_fetch("k", lambda: "old")
+    clock.now += 20
+
+    def fetch():
+        raise RetrieverTimeoutError("slow")
+
+    assert cache.get_or_fetch("k", fetch) == "old"
+    settle(cache)
+    assert cache.refresh_errors == 1
+    assert cache.get_or_fetch("k", fetch) == "old"
+    settle(cache)
+
+
+def test_invalid_ttls():
+    """Test that inconsistent TTLs are rejected."""
+    with pytest.raises(RetrieverConfigError):
+        StaleWhileRevalidateCache(soft_ttl=100, hard_ttl=10)
+
+
+def test_client_serves_retrieve_and_get_source(clock, mock_responses):
+    """Test that retrieve and get_source go through the cache."""
+    client = TatryRetriever(
+        api_key="test_key",
+        stale_cache=StaleWhileRevalidateCache(soft_ttl=10, hard_ttl=100),
+    )
+    mock_responses.add(
+        mock_responses.POST,
+        "https://api.tatry.dev/v1/retrieve",
+        json={"documents": [], "total": 0},
+    )
+    mock_responses.add(
+        mock_responses.GET,
+        "https://api.tatry.dev/v1/sources/arxiv",
+        json={
+            "status": "success",
+            "data": {
+                "id": "arxiv",
+                "name": "arXiv",
+                "description": "Preprints",
+                "type": "academic",
+                "status": "active",
+                "coverage": ["physics"],
+                "update_frequency": "daily",
+            },
+        },
+    )
+
+    first = client.retrieve("test", sources=["a"])
+    assert client.retrieve("test", sources=["a"]) is first
+    assert client.retrieve("test", sources=["b"]) is not first
+    assert client.get_source("arxiv") is client.get_source("arxiv")
+    assert len(mock_responses.calls) == 3
+
+    clock.now += 20
+    assert client.retrieve("test", sources=["a"]) is first
+    settle(client.stale_cache)
+    assert len(mock_responses.calls) == 4
+    assert client.retrieve("test", sources=["a"]) is not first
+
+
+def test_client_keys_retrieve_canonically(clock, mock_responses):
+    """Test that equivalent spellings share one cache entry."""
+    client = TatryRetriever(
+        api_key="test_key",
+        stale_cache=StaleWhileRevalidateCache(soft_ttl=10, hard_ttl=100),
+        canonicalizer=QueryCanonicalizer(),
+    )
+    mock_responses.add(
+        mock_responses.POST,
+        "https://api.tatry.dev/v1/retrieve",
+        json={"documents": [], "total": 0},
+    )
+
+    first = client.retrieve("Hello,  World", sources=["b", "a"])
+    assert client.retrieve("hello world!", sources=["a", "b", "a"]) is first
+    assert client.retrieve("hello world", sources=["a"]) is not first
+    assert len(mock_responses.calls) == 2
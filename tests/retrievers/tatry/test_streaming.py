@@ -0,0 +1,101 @@
+import json
+
+import pytest
+
+from tatry.models.retrieve import DocumentResponse
+from tatry.retrievers.tatry import TatryRetriever
+from tatry.retrievers.tatry.streaming import JSONArrayStream
+
+DOCUMENTS = [
+    {
+        "id": f"doc{i}",
+        "content": 'Tricky "content" with {braces} and [brackets] \\ ' * i,
+        "metadata": {
+            "source": "test",
+            "published_date": "2024-01-01",
+            "citation": "Doc }]",
+        },
+        "relevance_score": 0.5,
+    }
+    for i in range(5)
+]
+BODY = json.dumps({"documents": DOCUMENTS, "total": 5}).encode()
+
+
+def chunked(data, size):
+    return (data[i : i + size] for i in range(0, len(data), size))
+
+
+@pytest.mark.parametrize("chunk_size", [1, 7, 64, len(BODY)])
+def test_stream_splits_array_items(chunk_size):
+    """Test that array items and the skeleton survive any chunking."""
+    stream = JSONArrayStream(chunked(BODY, chunk_size), "documents")
+
+    items = [json.loads(item) for item in stream]
+
+    assert items == DOCUMENTS
+    assert json.loads(stream.skeleton) == {"documents": [], "total": 5}
+
+
+def test_stream_ignores_other_arrays():
+    """Test that only the array under the requested key is split."""
+    body = b'{"tags": [{"a": 1}], "results": [{"b": 2}, {"c": 3}]}'
+    stream = JSONArrayStream([body], "results")
+
+    assert list(stream) == [b'{"b": 2}', b'{"c": 3}']
+    assert json.loads(stream.skeleton) == {"tags": [{"a": 1}], "results": []}
+
+
+def test_stream_rejects_truncated_body():
+    """Test that a truncated body is reported."""
+    with pytest.raises(ValueError):
+        list(JSONArrayStream([BODY[:-10]], "documents"))
+
+
+def test_skeleton_requires_full_iteration():
+    """Test that the skeleton is only available after iteration."""
+    with pytest.raises(ValueError):
+        JSONArrayStream([BODY], "documents").skeleton
+
+
+def test_client_streams_large_responses(mock_responses):
+    """Test that retrieve parses streamed responses into models."""
+    client = TatryRetriever(api_key="test_key", stream_threshold=0)
+    mock_responses.add(
+        mock_responses.POST,
+        "https://api.tatry.dev/v1/retrieve",
+        body=BODY,
+        content_type="application/json",
+    )
+
+    response = client.retrieve("test")
+
+    assert isinstance(response, DocumentResponse)
+    assert response.total == 5
+    assert [doc.id for doc in response.documents] == [d["id"] for d in DOCUMENTS]
+    assert response.documents[3].content == DOCUMENTS[3]["content"]
+
+
+@pytest.mark.parametrize("threshold", [len(BODY), 100])
+def test_client_buffers_bodies_without_length(mock_responses, threshold):
+    """Test small and large chunked responses under the threshold check."""
+    client = TatryRetriever(api_key="test_key", stream_threshold=threshold)
+    mock_responses.add(
+        mock_responses.POST,
+        "https://api.tatry.dev/v1/retrieve",
+        body=BODY,
+        content_type="application/json",
+        auto_calculate_content_length=False,
+    )
+
+    response = client.retrieve("test")
+
+    assert "Content-Length" not in mock_responses.calls[0].response.headers
+    assert [doc.id for doc in response.documents] == [d["id"] for d in DOCUMENTS]
+
+
+def test_streaming_enabled_by_default():
+    """Test that large responses stream unless disabled."""
+    assert TatryRetriever(api_key="test_key").config.stream_threshold == 8 << 20
+    disabled = TatryRetriever(api_key="test_key", stream_threshold=None)
+    assert disabled.config.stream_threshold is None
@@ -0,0 +1,108 @@
+import pytest
+from helpers import RETRIEVE_URL, document
+
+from tatry.exceptions import RetrieverConnectionError
+from tatry.models.utils import UsageResponse
+from tatry.retrievers.tatry import TatryRetriever, UsageMeter
+
+
+def make_usage(queries, documents):
+    return UsageResponse.model_validate(
+        {
+            "status": "success",
+            "data": {
+                "time_range": {"month": "2024-01"},
+                "usage": {
+                    "queries": {"total": queries, "by_source": {"a": queries}},
+                    "documents": {"total": documents, "by_source": {"a": documents}},
+                },
+            },
+        }
+    )
+
+
+def test_record_counts_per_source():
+    """Test that queries and documents are counted per source."""
+    meter = UsageMeter()
+    meter.record(
+        ["a", "b"],
+        [
+            document("1", source="a"),
+            document("2", source="b"),
+        ],
+    )
+    meter.record(["a"], [document("3", source="a")])
+
+    usage = meter.snapshot()
+    assert usage.queries.total == 2
+    assert usage.queries.by_source == {"a": 2, "b": 1}
+    assert usage.documents.total == 3
+    assert usage.documents.by_source == {"a": 2, "b": 1}
+
+
+def test_reconcile_replaces_baseline():
+    """Test that reconciling adopts server numbers and drops local deltas."""
+    meter = UsageMeter()
+    meter.record(["a"], [document("1", source="a")])
+
+    assert meter.reconcile(lambda: make_usage(10, 40))
+    meter.record(["a"], [document("2", source="a")])
+
+    usage = meter.snapshot()
+    assert usage.queries.total == 11
+    assert usage.documents.by_source == {"a": 41}
+
+
+def test_reconcile_failure_keeps_local_counts():
+    """Test that a failed reconciliation does not lose counts."""
+    meter = UsageMeter()
+    meter.record(["a"], [document("1", source="a")])
+
+    def fail():
+        raise RetrieverConnectionError("down")
+
+    assert not meter.reconcile(fail)
+    assert meter.snapshot().queries.total == 1
+
+
+def test_reconcile_unexpected_error_releases_claim():
+    """Test that any failure merges counts back and allows a later reconcile."""
+    meter = UsageMeter()
+    meter.record(["a"], [document("1", source="a")])
+
+    def fail():
+        raise ValueError("bad payload")
+
+    with pytest.raises(ValueError):
+        meter.reconcile(fail)
+    assert meter.snapshot().queries.by_source == {"a": 1}
+    assert meter.reconcile(lambda: make_usage(5, 20))
+    assert meter.snapshot().queries.total == 5
+
+
+def test_maybe_reconcile_respects_interval():
+    """Test that automatic reconciliation only runs when enabled and due."""
+    assert not UsageMeter().maybe_reconcile(lambda: make_usage(1, 1))
+    assert not UsageMeter(reconcile_interval=60).maybe_reconcile(
+        lambda: make_usage(1, 1)
+    )
+
+
+def test_client_records_retrieve_usage(mock_responses):
+    """Test that the client feeds retrieve responses into the meter."""
+    meter = UsageMeter()
+    client = TatryRetriever(api_key="test_key", usage_meter=meter)
+    mock_responses.add(
+        mock_responses.POST,
+        RETRIEVE_URL,
+        json={
+            "documents": [document("1", source="a").model_dump()],
+            "total": 1,
+        },
+    )
+
+    client.retrieve("test", sources=["a"])
+
+    usage = meter.snapshot()
+    assert usage.queries.by_source == {"a": 1}
+    assert usage.documents.by_source == {"a": 1}
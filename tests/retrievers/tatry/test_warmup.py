@@ -0,0 +1,156 @@
+import gzip
+import json
+import time
+
+import pytest
+from helpers import BATCH_URL, make_document
+
+from tatry.exceptions import RetrieverConfigError
+from tatry.retrievers.tatry import (
+    QueryCanonicalizer,
+    SourceResultCache,
+    StaleWhileRevalidateCache,
+    TatryRetriever,
+    read_query_log,
+)
+
+
+def echo_callback(status=200):
+    """Answer each batch query with one document named after it."""
+
+    def callback(request):
+        queries = json.loads(request.body)["queries"]
+        results = [
+            {
+                "query_id": i,
+                "documents": [make_document(f"{q['query']}:{','.join(q['sources'])}")],
+            }
+            for i, q in enumerate(queries)
+        ]
+        return status, {}, json.dumps({"results": results})
+
+    return callback
+
+
+def sent_queries(mock_responses):
+    return [
+        q["query"]
+        for call in mock_responses.calls
+        for q in json.loads(call.request.body)["queries"]
+    ]
+
+
+def test_frequency_ranking_fills_stale_cache(mock_responses):
+    """Test that the most frequent queries are fetched and then served locally."""
+    client = TatryRetriever(
+        api_key="test_key", stale_cache=StaleWhileRevalidateCache(maxsize=100)
+    )
+    mock_responses.add_callback(
+        mock_responses.POST, BATCH_URL, callback=echo_callback()
+    )
+    log = ["a", "b", "a", {"query": "c", "max_results": 5}, "c", "a", "d"]
+
+    report = client.warm_cache(log, top_n=2, batch_size=1)
+
+    assert sorted(sent_queries(mock_responses)) == ["a", "c"]
+    assert (report.logged, report.distinct, report.selected) == (7, 4, 2)
+    assert (report.warmed, report.failed) == (2, 0)
+    assert report.coverage == pytest.approx(5 / 7)
+    assert report.entries == 2 and report.fill == pytest.approx(0.02)
+
+    calls = len(mock_responses.calls)
+    assert client.retrieve("a").documents[0].id == "a:"
+    assert len(mock_responses.calls) == calls
+
+
+def test_recency_ranking(mock_responses):
+    """Test that recency ranking picks the last distinct queries."""
+    client = TatryRetriever(api_key="test_key", stale_cache=StaleWhileRevalidateCache())
+    mock_responses.add_callback(
+        mock_responses.POST, BATCH_URL, callback=echo_callback()
+    )
+
+    client.warm_cache(["a", "a", "a", "b", "c", "b"], top_n=2, rank="recency")
+
+    assert sent_queries(mock_responses) == ["b", "c"]
+
+
+def test_source_cache_warmed_per_source(mock_responses):
+    """Test that per-source entries are fetched once per source."""
+    client = TatryRetriever(api_key="test_key", source_cache=SourceResultCache())
+    mock_responses.add_callback(
+        mock_responses.POST, BATCH_URL, callback=echo_callback()
+    )
+    log = [
+        {"query": "q", "sources": ["x", "y"]},
+        {"query": "q", "sources": ["y", "z"]},
+        {"query": "no sources"},
+    ]
+
+    report = client.warm_cache(log)
+
+    sent = json.loads(mock_responses.calls[0].request.body)["queries"]
+    assert sorted(q["sources"] for q in sent) == [["x"], ["y"], ["z"]]
+    assert report.entries == 3
+
+    response = client.retrieve("q", sources=["x", "z"])
+    assert len(mock_responses.calls) == 1
+    assert {d.id for d in response.documents} == {"q:x", "q:z"}
+
+
+def test_every_warmed_variant_served_locally(mock_responses):
+    """Test that all spellings counted in the coverage hit the warmed caches."""
+    client = TatryRetriever(
+        api_key="test_key",
+        canonicalizer=QueryCanonicalizer(),
+        stale_cache=StaleWhileRevalidateCache(),
+        source_cache=SourceResultCache(),
+    )
+    mock_responses.add_callback(
+        mock_responses.POST, BATCH_URL, callback=echo_callback()
+    )
+    log = [{"query": "Hello", "sources": ["x", "y"]}] * 5 + [
+        {"query": "hello!", "sources": ["y", "x"]}
+    ] * 5
+
+    report = client.warm_cache(log)
+
+    assert (report.distinct, report.coverage) == (1, 1.0)
+    sent = json.loads(mock_responses.calls[0].request.body)["queries"]
+    assert {q["query"] for q in sent} == {"Hello"}
+    calls = len(mock_responses.calls)
+    for entry in log[::5]:
+        client.retrieve(entry["query"], sources=entry["sources"])
+        client.retrieve(entry["query"], sources=entry["sources"][:1])
+    assert len(mock_responses.calls) == calls
+
+
+def test_failures_and_pacing(mock_responses):
+    """Test that failed batches are reported and requests are paced."""
+    client = TatryRetriever(
+        api_key="test_key", max_retries=1, stale_cache=StaleWhileRevalidateCache()
+    )
+    mock_responses.add_callback(
+        mock_responses.POST, BATCH_URL, callback=echo_callback(status=400)
+    )
+
+    started = time.monotonic()
+    report = client.warm_cache(["a", "b", "c", "d"], batch_size=1, max_qps=20)
+
+    assert time.monotonic() - started >= 0.15
+    assert (report.warmed, report.failed, report.coverage) == (0, 4, 0.0)
+
+    with pytest.raises(RetrieverConfigError):
+        TatryRetriever(api_key="test_key").warm_cache(["a"])
+
+
+def test_read_query_log(tmp_path):
+    """Test reading a compressed JSONL log."""
+    path = str(tmp_path / "queries.jsonl.gz")
+    with gzip.open(path, "wt") as f:
+        f.write('"plain"\n\n{"query": "q", "sources": ["x"]}\n')
+
+    assert list(read_query_log(path)) == [
+        {"query": "plain"},
+        {"query": "q", "sources": ["x"]},
+    ]
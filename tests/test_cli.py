@@ -0,0 +1,84 @@
+import io
+import json
+
+from helpers import BATCH_URL, RETRIEVE_URL, make_document
+
+from tatry.cli import completed_records, main, read_queries
+
+
+def batch_callback(request):
+    queries = json.loads(request.body)["queries"]
+    results = [
+        {"query_id": i, "documents": [make_document(f"doc-{q['query']}")]}
+        for i, q in enumerate(queries)
+    ]
+    return 200, {}, json.dumps({"results": results})
+
+
+def test_read_queries_jsonl_and_csv():
+    """Test parsing of JSONL and CSV input."""
+    jsonl = io.StringIO('"plain"\n\n{"query": "obj", "max_results": 2}\n')
+    assert list(read_queries(jsonl)) == [
+        {"query": "plain"},
+        {"query": "obj", "max_results": 2},
+    ]
+
+    rows = io.StringIO("query,sources,max_results\nai,a;b,3\nml,,\n")
+    assert list(read_queries(rows, "csv")) == [
+        {"query": "ai", "sources": ["a", "b"], "max_results": 3},
+        {"query": "ml"},
+    ]
+
+
+def test_batches_written_in_input_order(mock_responses, tmp_path, capsys):
+    """Test that results stream to stdout as JSONL in input order."""
+    mock_responses.add_callback(mock_responses.POST, BATCH_URL, callback=batch_callback)
+    queries = tmp_path / "queries.jsonl"
+    queries.write_text("".join(json.dumps(f"q{i}") + "\n" for i in range(5)))
+
+    code = main(
+        [str(queries), "--api-key", "test_key", "--batch-size", "2"]
+        + ["--concurrency", "2", "--progress-interval", "0"]
+    )
+
+    assert code == 0
+    records = [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+    assert [r["index"] for r in records] == list(range(5))
+    assert [r["documents"][0]["id"] for r in records] == [f"doc-q{i}" for i in range(5)]
+    assert len(mock_responses.calls) == 3
+
+
+def test_failed_queries_reported(mock_responses, tmp_path, capsys):
+    """Test that failures become error records and a non-zero exit code."""
+    mock_responses.add(mock_responses.POST, RETRIEVE_URL, json={}, status=400)
+    queries = tmp_path / "queries.csv"
+    queries.write_text("query\nbroken\n")
+
+    code = main([str(queries), "--api-key", "test_key", "--max-retries", "1"])
+
+    assert code == 1
+    captured = capsys.readouterr()
+    record = json.loads(captured.out)
+    assert record["query"] == "broken" and "error" in record
+    assert "1 queries, 1 errors" in captured.err
+
+
+def test_resume_skips_completed(mock_responses, tmp_path):
+    """Test that a resumed run appends only the queries still missing."""
+    mock_responses.add_callback(mock_responses.POST, BATCH_URL, callback=batch_callback)
+    queries = tmp_path / "queries.jsonl"
+    queries.write_text("".join(json.dumps(f"q{i}") + "\n" for i in range(4)))
+    output = tmp_path / "out.jsonl"
+    output.write_text('{"index": 0}\n{"index": 1}\n{"ind')
+
+    assert completed_records(str(output)) == 2
+    code = main(
+        [str(queries), "--api-key", "test_key", "-o", str(output), "--resume"]
+        + ["--batch-size", "2", "--progress-interval", "0"]
+    )
+
+    assert code == 0
+    records = [json.loads(line) for line in output.read_text().splitlines()]
+    assert [r["index"] for r in records] == [0, 1, 2, 3]
+    sent = json.loads(mock_responses.calls[0].request.body)["queries"]
+    assert [q["query"] for q in sent] == ["q2", "q3"]
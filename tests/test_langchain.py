@@ -0,0 +1,88 @@
+import asyncio
+import json
+
+import pytest
+from helpers import RETRIEVE_URL, document, make_document
+
+from tatry.retrievers.tatry import deadline
+
+integration = pytest.importorskip("tatry.integrations.langchain")
+to_langchain_documents = integration.to_langchain_documents
+
+
+def test_conversion_matches_validated_documents():
+    """Test that converted documents equal ones built by the constructor."""
+    source = document("a", 0.9)
+    (converted,) = to_langchain_documents([source])
+
+    expected = type(converted)(
+        page_content="content a",
+        metadata={
+            "source": "test",
+            "published_date": "2024-01-01",
+            "citation": "Document a",
+            "relevance_score": 0.9,
+            "id": "a",
+        },
+    )
+    assert converted == expected
+    assert converted.model_dump() == expected.model_dump()
+    assert converted.page_content is source.content
+
+
+def test_score_cutoff_and_limit_before_conversion():
+    """Test that skipped and truncated documents are never converted."""
+    documents = [document(str(i), 1 - i / 10) for i in range(10)]
+    seen = []
+
+    def source():
+        for doc in documents:
+            seen.append(doc.id)
+            yield doc
+
+    converted = list(to_langchain_documents(source(), min_score=0.45, limit=3))
+    assert [d.metadata["id"] for d in converted] == ["0", "1", "2"]
+    assert seen == ["0", "1", "2"]
+    assert [d.metadata["id"] for d in to_langchain_documents(documents, 0.75)] == [
+        "0",
+        "1",
+        "2",
+    ]
+    assert list(to_langchain_documents(documents, limit=0)) == []
+
+
+def test_retriever_lazy_documents(mock_responses):
+    """Test invoke and the lazy iterator of the LangChain retriever."""
+    body = {
+        "documents": [make_document(str(i), 1 - i / 10) for i in range(5)],
+        "total": 5,
+    }
+    mock_responses.add(mock_responses.POST, RETRIEVE_URL, json=body)
+    mock_responses.add(mock_responses.POST, RETRIEVE_URL, json=body)
+    retriever = integration.TatryRetriever(
+        api_key="test_key", max_results=5, min_score=0.5
+    )
+
+    assert len(retriever.invoke("test")) == 5
+    lazy = retriever.iter_relevant_documents("test", min_score=0.75, limit=2)
+
+    assert json.loads(mock_responses.calls[1].request.body)["min_score"] == 0.5
+    assert [d.metadata["id"] for d in lazy] == ["0", "1"]
+
+
+def test_ainvoke_inherits_deadline(mock_responses):
+    """Test that a deadline around ainvoke caps the request timeout."""
+    body = {"documents": [make_document("a", 0.9)], "total": 1}
+    mock_responses.add(mock_responses.POST, RETRIEVE_URL, json=body)
+    retriever = integration.TatryRetriever(api_key="test_key", timeout=30)
+
+    async def run():
+        with deadline(0.5):
+            return await retriever.ainvoke("test")
+
+    documents = asyncio.run(run())
+
+    assert [d.metadata["id"] for d in documents] == ["a"]
+    timeout = mock_responses.calls[0].request.req_kwargs["timeout"]
+    timeouts = timeout if isinstance(timeout, tuple) else (timeout,)
+    assert 0 < max(timeouts) <= 0.5
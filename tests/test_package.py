@@ -0,0 +1,11 @@
+import importlib
+
+import pytest
+
+
+@pytest.mark.parametrize("module", ["tatry", "tatry.retrievers.tatry"])
+def test_all_names_are_exported(module):
+    """Test that every name in __all__ is importable from the package."""
+    package = importlib.import_module(module)
+    missing = [name for name in package.__all__ if not hasattr(package, name)]
+    assert missing == []